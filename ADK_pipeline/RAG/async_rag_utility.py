@@ -0,0 +1,33 @@
+from RAG.rag_utility import offers_from_nodes, retrieve_offer_nodes, retrieve_offers
+from RAG.resources import get_response_synthesizer
+from tools.executor import run_blocking
+
+
+# -------------------------------------------------------
+# FUNCTION TOOL (async): RAG Query Engine
+# -------------------------------------------------------
+async def query_promotional_offers(query: str, top_k: int = 5, synthesize: bool = False):
+    """
+    Retrieves relevant promotional offers using the RAG index.
+    - query: natural language question (e.g., "offers available for groceries in October")
+    - top_k: number of top matches to retrieve
+    - synthesize: False (default) → return the matching offers with scores and metadata, no LLM call;
+                  True → also return an LLM-written "response" summarising them
+    """
+    try:
+        # Cache lookups, embedding and vector search run on the bounded executor
+        if not synthesize:
+            offers = await run_blocking(retrieve_offers, query, top_k)
+            return {"query": query, "top_k": top_k, "offers": offers}
+
+        nodes = await run_blocking(retrieve_offer_nodes, query, top_k)
+        # Optional Groq summary, awaited natively
+        synthesizer = await run_blocking(get_response_synthesizer)
+        return {
+            "query": query,
+            "top_k": top_k,
+            "offers": offers_from_nodes(nodes),
+            "response": str(await synthesizer.asynthesize(query, nodes=nodes))
+        }
+    except Exception as e:
+        return {"error": str(e)}
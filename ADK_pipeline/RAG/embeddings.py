@@ -0,0 +1,114 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from pydantic import PrivateAttr
+
+from RAG.vector_store import EMBED_MODEL_NAME, EMBEDDING_BACKENDS, get_embedding_backend_name
+
+
+# -------------------------------------------------------
+# Embedding providers for CPU-only hosts (EMBEDDING_BACKEND, see RAG/vector_store.py).
+# EMBED_BATCH_SIZE → texts per model call (default 32)
+# EMBED_WORKERS    → batches embedded concurrently at ingest time (default min(4, cores))
+# EMBED_THREADS    → total PyTorch threads shared by the workers (default all cores;
+#                    ONNX Runtime sizes its own intra-op pool)
+# ONNX backends need `pip install "sentence-transformers[onnx]"`.
+# -------------------------------------------------------
+# int8 weights published with sentence-transformers/all-mpnet-base-v2 (override with EMBED_ONNX_FILE)
+DEFAULT_ONNX_INT8_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return max(int(os.environ.get(name, "").strip() or default), 1)
+    except ValueError:
+        return default
+
+
+def embedding_settings() -> dict:
+    cores = os.cpu_count() or 1
+    threads = _int_env("EMBED_THREADS", cores)
+    workers = min(_int_env("EMBED_WORKERS", min(4, cores)), threads)
+    return {
+        "batch_size": _int_env("EMBED_BATCH_SIZE", 32),
+        "workers": workers,
+        "threads": threads,
+    }
+
+
+class PooledEmbedding(BaseEmbedding):
+    """
+    Wraps a llama-index embedding model: queries go straight to it, while
+    get_text_embedding_batch is split into batch_size slices embedded on a thread pool
+    (the model releases the GIL inside PyTorch / ONNX Runtime kernels).
+    """
+
+    _inner: BaseEmbedding = PrivateAttr()
+    _batch_size: int = PrivateAttr()
+    _pool: Any = PrivateAttr(default=None)
+
+    def __init__(self, inner: BaseEmbedding, batch_size: int = 32, workers: int = 1, **kwargs: Any):
+        # The outer batch feeds every worker at once; _get_text_embeddings re-splits it
+        super().__init__(model_name=inner.model_name, embed_batch_size=batch_size * max(workers, 1), **kwargs)
+        self._inner = inner
+        self._batch_size = batch_size
+        if workers > 1:
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed")
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "PooledEmbedding"
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._inner.get_query_embedding(query)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return await self._inner.aget_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._inner.get_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        batches = [texts[start:start + self._batch_size] for start in range(0, len(texts), self._batch_size)]
+        if self._pool is None or len(batches) < 2:
+            results = [self._inner.get_text_embedding_batch(batch) for batch in batches]
+        else:
+            results = list(self._pool.map(self._inner.get_text_embedding_batch, batches))
+        return [vector for batch in results for vector in batch]
+
+
+def _set_torch_threads(threads: int):
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def create_embed_model(backend: str = "", batch_size: int = 0, workers: int = 0):
+    """Embedding model for the configured backend, wrapped for batched / pooled ingest."""
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+    backend = backend or get_embedding_backend_name()
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}' (use {', '.join(EMBEDDING_BACKENDS)})")
+    settings = embedding_settings()
+    batch_size = batch_size or settings["batch_size"]
+    workers = workers or settings["workers"]
+    # Each worker gets an equal share of the cores, so intra-op threads don't oversubscribe
+    threads_per_worker = max(settings["threads"] // workers, 1)
+
+    kwargs = {"model_name": EMBED_MODEL_NAME, "embed_batch_size": batch_size, "device": "cpu"}
+    if backend == "hf":
+        _set_torch_threads(threads_per_worker)
+    else:
+        kwargs["backend"] = "onnx"
+        if backend == "onnx-int8":
+            kwargs["model_kwargs"] = {
+                "file_name": os.environ.get("EMBED_ONNX_FILE", "").strip() or DEFAULT_ONNX_INT8_FILE
+            }
+    inner = HuggingFaceEmbedding(**kwargs)
+    return PooledEmbedding(inner, batch_size=batch_size, workers=workers)
@@ -0,0 +1,290 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from RAG.vector_store import (
+    PINECONE_INDEX_NAME,
+    LocalVectorIndex,
+    embedding_model_key,
+    get_offers_index_dir,
+    get_offers_source,
+    normalise_rows,
+    source_files,
+    source_sha256,
+)
+
+
+# -------------------------------------------------------
+# Incremental, content-hashed offers ingestion.
+# Every chunk / offer is identified by the hash of its text, so a re-index only
+# embeds what is new or changed and deletes what disappeared:
+# - local index + offer catalogue → the persisted records are the manifest
+# - Pinecone                      → pinecone_manifest.json next to the local index
+# Run from ADK_pipeline/:
+#   python -m RAG.ingest_offers [--source store_offers_data] [--target all] [--batch-size 256] [--full] [--dry-run]
+# -------------------------------------------------------
+PINECONE_MANIFEST_FILE = "pinecone_manifest.json"
+DEFAULT_BATCH_SIZE = 256
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def chunk_offers(source_file: str = "") -> list:
+    """
+    Brochure chunks ({id, text, metadata}) split exactly like the original index
+    (SentenceSplitter defaults); ids are content hashes, suffixed when a text repeats.
+    """
+    from llama_index.core import SimpleDirectoryReader
+    from llama_index.core.node_parser import SentenceSplitter
+
+    documents = SimpleDirectoryReader(input_files=source_files(source_file or get_offers_source())).load_data()
+    chunks, seen = [], {}
+    for node in SentenceSplitter().get_nodes_from_documents(documents):
+        text = node.get_content()
+        chunk_id = content_hash(text)
+        seen[chunk_id] = seen.get(chunk_id, 0) + 1
+        if seen[chunk_id] > 1:
+            chunk_id = f"{chunk_id}-{seen[chunk_id]}"
+        chunks.append({"id": chunk_id, "text": text, "metadata": node.metadata})
+    return chunks
+
+
+def embed_in_batches(embed_model, texts: list, batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+    """Normalised float32 embeddings, batch_size texts per model call."""
+    batches = [
+        embed_model.get_text_embedding_batch(texts[start:start + batch_size])
+        for start in range(0, len(texts), max(batch_size, 1))
+    ]
+    if not batches:
+        return np.zeros((0, 0), np.float32)
+    return normalise_rows([vector for batch in batches for vector in batch])
+
+
+def _sync_vectors(embed_model, texts: list, previous, model_name: str, batch_size: int, dry_run: bool = False):
+    """
+    Vectors for texts, reusing the previous index's rows whose text hash is unchanged
+    (only when it was built with the same model). Returns (vectors, stats).
+    """
+    reusable = {}
+    if previous is not None and previous.info.get("model") == model_name:
+        reusable = {content_hash(record["text"]): row for row, record in enumerate(previous.records)}
+
+    hashes = [content_hash(text) for text in texts]
+    missing = [i for i, text_hash in enumerate(hashes) if text_hash not in reusable]
+    stats = {
+        "total": len(texts),
+        "kept": len(texts) - len(missing),
+        "embedded": len(missing),
+        "removed": len(set(reusable) - set(hashes)),
+    }
+    if dry_run:
+        return None, stats
+
+    fresh = embed_in_batches(embed_model, [texts[i] for i in missing], batch_size)
+    dimension = fresh.shape[1] if fresh.size else (previous.vectors.shape[1] if reusable else 0)
+    vectors = np.zeros((len(texts), dimension), dtype=np.float32)
+    for row, i in enumerate(missing):
+        vectors[i] = fresh[row]
+    for i, text_hash in enumerate(hashes):
+        if text_hash in reusable:
+            vectors[i] = previous.vectors[reusable[text_hash]]
+    return vectors, stats
+
+
+def _index_info(source_file: str, model_name: str, vectors: np.ndarray, count: int) -> dict:
+    return {
+        "source_sha256": source_sha256(source_file),
+        "model": model_name,
+        "dimension": int(vectors.shape[1]) if vectors.size else 0,
+        "count": count,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def _load_previous(index_dir: str):
+    try:
+        return LocalVectorIndex.load(index_dir)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+# -------------------------------------------------------
+# Targets
+# -------------------------------------------------------
+def sync_local_index(embed_model, model_name: str = "", source_file: str = "", index_dir: str = "",
+                     previous=None, reuse: bool = True, batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False):
+    """
+    Brings the local chunk index in line with the brochure. Returns (index, stats).
+    previous defaults to the persisted index; reuse=False re-embeds everything.
+    """
+    started = time.perf_counter()
+    model_name = model_name or embedding_model_key()
+    source_file = source_file or get_offers_source()
+    index_dir = index_dir or get_offers_index_dir()
+    if not reuse:
+        previous = None
+    elif previous is None:
+        previous = _load_previous(index_dir)
+
+    chunks = chunk_offers(source_file)
+    vectors, stats = _sync_vectors(embed_model, [c["text"] for c in chunks], previous, model_name, batch_size, dry_run)
+    index = previous
+    if not dry_run:
+        index = LocalVectorIndex(vectors, chunks, _index_info(source_file, model_name, vectors, len(chunks)))
+        index.save(index_dir)
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    print(f"✅ Offers index synced ({index_dir}) → {stats}")
+    return index, stats
+
+
+def sync_offer_catalogue(embed_model, model_name: str = "", source_file: str = "",
+                         catalogue_dir: str = "", previous=None, reuse: bool = True,
+                         batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False):
+    """Brings the per-offer catalogue in line with the brochure. Returns (index, stats)."""
+    from RAG.offer_catalogue import get_catalogue_dir, load_offer_records
+
+    started = time.perf_counter()
+    model_name = model_name or embedding_model_key()
+    source_file = source_file or get_offers_source()
+    catalogue_dir = catalogue_dir or get_catalogue_dir()
+    if not reuse:
+        previous = None
+    elif previous is None:
+        previous = _load_previous(catalogue_dir)
+
+    records = load_offer_records(source_file)
+    vectors, stats = _sync_vectors(embed_model, [r["text"] for r in records], previous, model_name, batch_size, dry_run)
+    index = previous
+    if not dry_run:
+        index = LocalVectorIndex(vectors, records, _index_info(source_file, model_name, vectors, len(records)))
+        index.save(catalogue_dir)
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    print(f"✅ Offer catalogue synced ({catalogue_dir}) → {stats}")
+    return index, stats
+
+
+def _load_manifest(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(path: str, manifest: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def sync_pinecone(embed_model, model_name: str = "", source_file: str = "",
+                  batch_size: int = DEFAULT_BATCH_SIZE, full: bool = False, dry_run: bool = False):
+    """
+    Upserts new / changed chunks into the Pinecone index and deletes removed ones.
+    Without a manifest (first run, or the index was built by the notebook with random ids)
+    or after a model change, the index is cleared and fully rebuilt.
+    """
+    started = time.perf_counter()
+    model_name = model_name or embedding_model_key()
+    source_file = source_file or get_offers_source()
+    manifest_path = os.path.join(get_offers_index_dir(), PINECONE_MANIFEST_FILE)
+    manifest = _load_manifest(manifest_path)
+    if not full and (not manifest or manifest.get("model") != model_name):
+        print("⚠️ No matching Pinecone manifest → full rebuild")
+        full = True
+
+    chunks = chunk_offers(source_file)
+    known = set() if full else set(manifest.get("ids", []))
+    new_chunks = [chunk for chunk in chunks if chunk["id"] not in known]
+    removed = sorted(known - {chunk["id"] for chunk in chunks})
+    stats = {"total": len(chunks), "kept": len(chunks) - len(new_chunks), "embedded": len(new_chunks),
+             "removed": len(removed), "full": full}
+
+    if not dry_run:
+        from llama_index.core.schema import TextNode
+        from llama_index.vector_stores.pinecone import PineconeVectorStore
+        from pinecone import Pinecone
+
+        pinecone_index = Pinecone(api_key=os.environ["PINECONE_API_KEY"]).Index(PINECONE_INDEX_NAME)
+        if full:
+            try:
+                pinecone_index.delete(delete_all=True)
+            except Exception as e:
+                # Empty namespaces raise on some client versions
+                print(f"⚠️ Pinecone clear skipped: {e}")
+        for start in range(0, len(removed), 1000):
+            pinecone_index.delete(ids=removed[start:start + 1000])
+
+        vectors = embed_in_batches(embed_model, [chunk["text"] for chunk in new_chunks], batch_size)
+        nodes = [
+            TextNode(id_=chunk["id"], text=chunk["text"], metadata=chunk["metadata"], embedding=vector.tolist())
+            for chunk, vector in zip(new_chunks, vectors)
+        ]
+        vector_store = PineconeVectorStore(pinecone_index=pinecone_index)
+        for start in range(0, len(nodes), max(batch_size, 1)):
+            vector_store.add(nodes[start:start + batch_size])
+
+        _save_manifest(manifest_path, {
+            "index": PINECONE_INDEX_NAME,
+            "model": model_name,
+            "source_sha256": source_sha256(source_file),
+            "ids": sorted(chunk["id"] for chunk in chunks),
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        })
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    print(f"✅ Pinecone index synced ({PINECONE_INDEX_NAME}) → {stats}")
+    return stats
+
+
+# -------------------------------------------------------
+# CLI
+# -------------------------------------------------------
+TARGETS = ("local", "catalogue", "pinecone")
+
+
+def run(source_file: str, targets: list, batch_size: int, full: bool, dry_run: bool):
+    from dotenv import load_dotenv
+
+    from RAG.resources import get_embed_model
+
+    load_dotenv()
+    embed_model = get_embed_model()
+    results = {}
+    if "local" in targets:
+        results["local"] = sync_local_index(embed_model, embedding_model_key(), source_file, reuse=not full,
+                                            batch_size=batch_size, dry_run=dry_run)[1]
+    if "catalogue" in targets:
+        results["catalogue"] = sync_offer_catalogue(embed_model, embedding_model_key(), source_file, reuse=not full,
+                                                    batch_size=batch_size, dry_run=dry_run)[1]
+    if "pinecone" in targets:
+        results["pinecone"] = sync_pinecone(embed_model, embedding_model_key(), source_file, batch_size, full, dry_run)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally re-index the promotional offers.")
+    parser.add_argument("--source", default="", help="Brochure file or directory of .txt brochures "
+                                                     "(default OFFERS_SOURCE_FILE / data/Holiday_ads.txt)")
+    parser.add_argument("--target", choices=TARGETS + ("all",), action="append",
+                        help="What to sync (repeatable; default: local + catalogue)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Texts per embedding call (split into EMBED_BATCH_SIZE batches across EMBED_WORKERS)")
+    parser.add_argument("--full", action="store_true", help="Ignore existing vectors and re-embed everything")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be embedded / removed")
+    args = parser.parse_args()
+
+    targets = args.target or ["local", "catalogue"]
+    if "all" in targets:
+        targets = list(TARGETS)
+    if args.source:
+        # Serving code reads the same variable → keeps the synced index / catalogue "fresh" for this source
+        os.environ["OFFERS_SOURCE_FILE"] = os.path.abspath(args.source)
+    run(get_offers_source(), targets, args.batch_size, args.full, args.dry_run)
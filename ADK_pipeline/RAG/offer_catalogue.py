@@ -0,0 +1,309 @@
+import os
+import re
+import time
+from datetime import date
+
+import numpy as np
+
+from RAG.vector_store import LocalVectorIndex, get_offers_source, normalise_rows, source_files, source_sha256
+
+
+# -------------------------------------------------------
+# Structured offer catalogue parsed from the holiday brochure:
+# one record per offer with date window, categories, products and discount,
+# plus interval / category indexes so queries filter exactly before vector ranking.
+# -------------------------------------------------------
+_PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OFFERS_CATEGORY_FILE = os.path.join(_PIPELINE_DIR, "data", "final_categ_ads_products_data.xlsx")
+DEFAULT_CATALOGUE_DIR = os.path.join(_PIPELINE_DIR, "data", "offers_catalogue")
+
+MONTH_ABBREVIATIONS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+
+# Offer windows carry no year → days are numbered in a leap reference year (Feb 29 exists)
+_REFERENCE_YEAR = 2024
+_DAYS_IN_YEAR = 366
+
+_OFFER_HEADER = re.compile(r"^\*\*(?P<title>.+?)\*\*\s+(?P<window>.+?)\s*$", re.MULTILINE)
+_WINDOW = re.compile(r"(?P<m1>[A-Za-z]{3})\w*\s+(?P<d1>\d{1,2})\s*[–—-]\s*(?P<m2>[A-Za-z]{3})\w*\s+(?P<d2>\d{1,2})")
+_DISCOUNT = re.compile(r"(\d{1,3})\s*%")
+_PRODUCT = re.compile(r"\b(?:[Tt]he|[Oo]ur)\s+((?:[A-Z][\w'’-]*\s+)+[A-Z][\w'’-]*)")
+_CAMEL_CASE = re.compile(r"[a-z][A-Z]")
+
+# Query vocabulary → catalogue categories. These become hard filters, so only words that name the
+# category unambiguously belong here ("table", "kids", "games", "tech", "produce" are left to the vectors)
+CATEGORY_SYNONYMS = {
+    "Clothing": ["clothing", "clothes", "apparel", "fashion", "wardrobe", "outfit"],
+    "Electronics": ["electronics", "electronic", "gadget", "speaker", "headphone"],
+    "Furniture": ["furniture", "home decor", "sofa"],
+    "Groceries": ["groceries", "grocery", "food", "snack"],
+    "Toys": ["toys", "toy"],
+}
+
+# Holidays → ((month, day), (month, day)) window searched when a query names them
+HOLIDAY_WINDOWS = {
+    "christmas": ((12, 20), (12, 26)),
+    "new year": ((12, 27), (1, 10)),
+    "valentine": ((2, 10), (2, 15)),
+    "easter": ((3, 20), (4, 10)),
+    "thanksgiving": ((11, 20), (11, 28)),
+    "black friday": ((11, 24), (11, 30)),
+    "earth day": ((4, 20), (4, 25)),
+    "back to school": ((7, 1), (7, 31)),
+}
+
+_MONTH_NAMES = [date(2000, month, 1).strftime("%B").lower() for month in range(1, 13)]
+# Full names or 3-letter abbreviations; "may" is resolved by _mentions_may
+_QUERY_MONTH = re.compile(
+    r"\b(" + "|".join([m for m in _MONTH_NAMES + MONTH_ABBREVIATIONS if m != "may"] + ["sept"]) + r")\b"
+)
+# "in May", "early May", "May 5", "5th of May" → the month, whatever the case
+_MAY_IN_CONTEXT = re.compile(
+    r"\b(?:in|during|for|from|to|until|till|through|by|before|after|since|early|mid|late|next|last)\s+may\b"
+    r"|\bmay\s+\d{1,2}(?:st|nd|rd|th)?\b"
+    r"|\b\d{1,2}(?:st|nd|rd|th)?\s+(?:of\s+)?may\b"
+)
+
+
+def day_of_year(month: int, day: int) -> int:
+    """0-based day index in the reference year."""
+    return date(_REFERENCE_YEAR, month, day).timetuple().tm_yday - 1
+
+
+def _window_days(start: tuple, end: tuple) -> list:
+    """Day indexes covered by a (month, day) → (month, day) window; wraps over New Year."""
+    first, last = day_of_year(*start), day_of_year(*end)
+    if first <= last:
+        return list(range(first, last + 1))
+    return list(range(first, _DAYS_IN_YEAR)) + list(range(0, last + 1))
+
+
+def _month_days(month: int) -> list:
+    start = day_of_year(month, 1)
+    end = day_of_year(month + 1, 1) if month < 12 else _DAYS_IN_YEAR
+    return list(range(start, end))
+
+
+# -------------------------------------------------------
+# Brochure parsing
+# -------------------------------------------------------
+def _extract_products(title: str, body: str) -> list:
+    """Product names: capitalised phrases after 'the' / 'our' that look like brand names."""
+    products = []
+    for match in _PRODUCT.finditer(body):
+        phrase = match.group(1).strip()
+        words = phrase.split()
+        if phrase == title or not (_CAMEL_CASE.search(phrase) or words[0] == "Luxe" or len(words) >= 4):
+            continue
+        if phrase not in products:
+            products.append(phrase)
+    return products
+
+
+def parse_brochure(text: str, categories_by_offer: dict = None) -> list:
+    """
+    Splits the brochure into offer records:
+    {id, title, date_range, start, end, categories, products, discount_pct, text}.
+    categories_by_offer maps the normalised ad body (or (title, date_range)) → [categories].
+    """
+    categories_by_offer = categories_by_offer or {}
+    headers = list(_OFFER_HEADER.finditer(text))
+    records = []
+    for i, header in enumerate(headers):
+        body_end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        body = text[header.end():body_end].strip()
+        title, window = header.group("title").strip(), header.group("window").strip()
+
+        parsed = _WINDOW.search(window)
+        if not parsed:
+            print(f"⚠️ Skipping offer with unreadable date window: {title} ({window})")
+            continue
+        start = (MONTH_ABBREVIATIONS.index(parsed.group("m1").lower()) + 1, int(parsed.group("d1")))
+        end = (MONTH_ABBREVIATIONS.index(parsed.group("m2").lower()) + 1, int(parsed.group("d2")))
+
+        discounts = [int(value) for value in _DISCOUNT.findall(body)]
+        records.append({
+            "id": f"offer-{i:03d}",
+            "title": title,
+            "date_range": window,
+            "start": list(start),
+            "end": list(end),
+            "categories": categories_by_offer.get(_offer_key(body))
+            or categories_by_offer.get((title, _normalise_window(window)), []),
+            "products": _extract_products(title, body),
+            "discount_pct": max(discounts) if discounts else None,
+            "text": f"{title}\t{window}\n{body}",
+        })
+    return records
+
+
+def _offer_key(body: str) -> str:
+    """Join key tolerant of quote / whitespace differences between the brochure and the spreadsheet."""
+    return re.sub(r"[^a-z0-9]", "", str(body).lower())[:120]
+
+
+def _normalise_window(window: str) -> str:
+    return re.sub(r"\s+", " ", window.replace("—", "–").replace("-", "–")).strip()
+
+
+def load_offer_categories(path: str = "") -> dict:
+    """Ad body key and (title, date window) → [categories] from the campaign spreadsheet; {} if unavailable."""
+    path = path or os.environ.get("OFFERS_CATEGORY_FILE", "").strip() or DEFAULT_OFFERS_CATEGORY_FILE
+    try:
+        import pandas as pd
+
+        df = pd.read_excel(path, usecols=["Category", "Campaign", "Date Range", "Advertisement"])
+    except Exception as e:
+        print(f"⚠️ Offer categories unavailable ({path}): {e}")
+        return {}
+
+    categories = {}
+    for category, campaign, window, advert in zip(df["Category"], df["Campaign"], df["Date Range"], df["Advertisement"]):
+        for key in (_offer_key(advert), (str(campaign).strip().strip("*").strip(), _normalise_window(str(window)))):
+            categories.setdefault(key, [])
+            if category not in categories[key]:
+                categories[key].append(category)
+    return categories
+
+
+# -------------------------------------------------------
+# Query → exact filters
+# -------------------------------------------------------
+def _mentions_may(query: str) -> bool:
+    """
+    True when "May" names the month: next to a preposition or day number, or a capitalised
+    "May" that does not open a sentence ("May I see toy offers?" is a request, not a month).
+    """
+    if _MAY_IN_CONTEXT.search(query.lower()):
+        return True
+    for match in re.finditer(r"\bMay\b", query):
+        before = query[:match.start()].rstrip()
+        if before and before[-1] not in ".!?":
+            return True
+    return False
+
+
+def parse_query_filters(query: str) -> dict:
+    """
+    {"categories": [...], "days": [...]} recognised in a natural-language query;
+    keys are only present when the query constrains them.
+    """
+    lowered = query.lower()
+    filters = {}
+
+    categories = [
+        category for category, words in CATEGORY_SYNONYMS.items()
+        if any(re.search(rf"\b{re.escape(word)}\b", lowered) for word in words)
+    ]
+    if categories:
+        filters["categories"] = categories
+
+    days = set()
+    for token in _QUERY_MONTH.findall(lowered):
+        days.update(_month_days(MONTH_ABBREVIATIONS.index(token[:3]) + 1))
+    if _mentions_may(query):
+        days.update(_month_days(5))
+    for holiday, (start, end) in HOLIDAY_WINDOWS.items():
+        if holiday in lowered:
+            days.update(_window_days(start, end))
+    if days:
+        filters["days"] = sorted(days)
+    return filters
+
+
+# -------------------------------------------------------
+# Catalogue with interval + category indexes and per-offer vectors
+# -------------------------------------------------------
+class OfferCatalogue:
+    """
+    records  → parsed offers
+    vectors  → one normalised embedding per offer (memory-mapped when loaded from disk)
+    day_index[d]        → boolean mask of offers running on reference day d
+    category_index[c]   → offer positions tagged with category c
+    """
+
+    name = "catalogue"
+
+    def __init__(self, index: LocalVectorIndex):
+        self.index = index
+        self.version = index.version
+        self.records = index.records
+        self.day_index = np.zeros((_DAYS_IN_YEAR, len(self.records)), dtype=bool)
+        self.category_index = {}
+        for position, record in enumerate(self.records):
+            self.day_index[_window_days(tuple(record["start"]), tuple(record["end"])), position] = True
+            for category in record["categories"]:
+                self.category_index.setdefault(category, []).append(position)
+        self.category_index = {k: np.asarray(v, dtype=np.int32) for k, v in self.category_index.items()}
+
+    def filter(self, categories=None, days=None) -> np.ndarray:
+        """Positions of offers matching every given constraint."""
+        mask = np.ones(len(self.records), dtype=bool)
+        if categories:
+            tagged = np.zeros(len(self.records), dtype=bool)
+            for category in categories:
+                tagged[self.category_index.get(category, [])] = True
+            mask &= tagged
+        if days:
+            mask &= self.day_index[days].any(axis=0)
+        return np.flatnonzero(mask)
+
+    def search(self, query_embedding, filters: dict, top_k: int = 5):
+        """[(score, record), ...] among the offers surviving the filters, best first."""
+        candidates = self.filter(filters.get("categories"), filters.get("days"))
+        return self.index.search(query_embedding, top_k, candidates=candidates)
+
+    def retrieve(self, query_embedding, filters: dict, top_k: int = 5):
+        from llama_index.core.schema import NodeWithScore, TextNode
+
+        return [
+            NodeWithScore(
+                node=TextNode(
+                    id_=record["id"],
+                    text=record["text"],
+                    metadata={
+                        "title": record["title"],
+                        "date_range": record["date_range"],
+                        "categories": ", ".join(record["categories"]),
+                        "discount_pct": record["discount_pct"],
+                    }
+                ),
+                score=score
+            )
+            for score, record in self.search(query_embedding, filters, top_k)
+        ]
+
+
+def get_catalogue_dir() -> str:
+    return os.environ.get("OFFERS_CATALOGUE_DIR", "").strip() or DEFAULT_CATALOGUE_DIR
+
+
+def load_offer_records(source_file: str = "") -> list:
+    """Parsed offers from the brochure (or every brochure in a directory), ids numbered across files."""
+    categories_by_offer = load_offer_categories()
+    records = []
+    for path in source_files(source_file or get_offers_source()):
+        with open(path, encoding="utf-8") as f:
+            records.extend(parse_brochure(f.read(), categories_by_offer))
+    for i, record in enumerate(records):
+        record["id"] = f"offer-{i:03d}"
+    return records
+
+
+def load_offer_catalogue(load_embed_model, model_name: str = ""):
+    """
+    Loads the persisted catalogue; when the brochure or embedding model changed it is re-synced,
+    embedding only new / changed offers (RAG/ingest_offers.py). load_embed_model() is only
+    called for that re-sync.
+    """
+    from RAG.ingest_offers import sync_offer_catalogue
+
+    source_file, catalogue_dir = get_offers_source(), get_catalogue_dir()
+    index = None
+    try:
+        index = LocalVectorIndex.load(catalogue_dir)
+        if index.info.get("source_sha256") == source_sha256(source_file) and index.info.get("model") == model_name:
+            return OfferCatalogue(index)
+    except (OSError, ValueError, KeyError):
+        pass
+    index, _ = sync_offer_catalogue(load_embed_model(), model_name, source_file, catalogue_dir, previous=index)
+    return OfferCatalogue(index)
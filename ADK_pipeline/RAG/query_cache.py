@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+
+# -------------------------------------------------------
+# Persistent RAG caches in one small SQLite file:
+# - embeddings → query vector per (embedding model, normalised query text)
+# - results    → retrieved offers per (normalised query, filters, top_k), tagged with the source
+#                (vector store / catalogue) and its index version; rows from an older version of a
+#                source are dropped as soon as a new version is seen.
+# Both tables are LRU-bounded (last_used) and survive restarts.
+# -------------------------------------------------------
+_PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_PATH = os.path.join(_PIPELINE_DIR, "data", "rag_cache.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    index_version TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used);
+CREATE INDEX IF NOT EXISTS ix_results_last_used ON results (last_used);
+"""
+
+
+def normalise_query(query: str) -> str:
+    """Case / whitespace-insensitive cache key text (the mpnet tokenizer lower-cases anyway)."""
+    return " ".join(str(query).lower().split())
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class QueryCache:
+    """Thread-safe, size-bounded embedding + result cache backed by SQLite."""
+
+    def __init__(self, path: str, max_embeddings: int = 10000, max_results: int = 2000):
+        self.path = path
+        self.max_embeddings = max_embeddings
+        self.max_results = max_results
+        self.hits = {"embeddings": 0, "results": 0}
+        self.misses = {"embeddings": 0, "results": 0}
+        self._lock = threading.Lock()
+        self._index_versions = {}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    # ---------------- embeddings ----------------
+    def get_embedding(self, model: str, query: str):
+        key = _digest(model, normalise_query(query))
+        with self._lock:
+            row = self._conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses["embeddings"] += 1
+                return None
+            self._conn.execute("UPDATE embeddings SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits["embeddings"] += 1
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def put_embedding(self, model: str, query: str, vector):
+        key = _digest(model, normalise_query(query))
+        blob = np.asarray(vector, dtype=np.float32).tobytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector, last_used) VALUES (?, ?, ?, ?)",
+                (key, model, blob, time.time())
+            )
+            self._prune("embeddings", self.max_embeddings)
+
+    # ---------------- results ----------------
+    def get_result(self, source: str, index_version: str, *key_parts):
+        key = _digest(source, *key_parts)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM results WHERE key = ? AND index_version = ?", (key, index_version)
+            ).fetchone()
+            if row is None:
+                self.misses["results"] += 1
+                return None
+            self._conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits["results"] += 1
+        return json.loads(row[0])
+
+    def put_result(self, source: str, index_version: str, value, *key_parts):
+        key = _digest(source, *key_parts)
+        with self._lock:
+            if self._index_versions.get(source) != index_version:
+                # Source re-indexed (or first write this process) → drop its results from other versions
+                self._conn.execute(
+                    "DELETE FROM results WHERE source = ? AND index_version != ?", (source, index_version)
+                )
+                self._index_versions[source] = index_version
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, source, index_version, payload, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, source, index_version, json.dumps(value, default=str), time.time())
+            )
+            self._prune("results", self.max_results)
+
+    # ---------------- maintenance ----------------
+    def _prune(self, table: str, limit: int):
+        """Keeps the `limit` most recently used rows (caller holds the lock)."""
+        self._conn.execute(
+            f"DELETE FROM {table} WHERE key IN "
+            f"(SELECT key FROM {table} ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (max(limit, 0),)
+        )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.execute("DELETE FROM results")
+            self._index_versions = {}
+
+    def stats(self) -> dict:
+        with self._lock:
+            sizes = {
+                table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("embeddings", "results")
+            }
+        return {"path": self.path, "size": sizes, "hits": dict(self.hits), "misses": dict(self.misses)}
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, "").strip() or default)
+    except ValueError:
+        return default
+
+
+def create_query_cache():
+    """
+    RAG_CACHE_PATH            → SQLite file (default data/rag_cache.sqlite; "off" disables caching)
+    RAG_CACHE_MAX_EMBEDDINGS  → max cached query embeddings (default 10000)
+    RAG_CACHE_MAX_RESULTS     → max cached retrieval results (default 2000)
+    """
+    path = os.environ.get("RAG_CACHE_PATH", "").strip() or DEFAULT_CACHE_PATH
+    if path.lower() == "off":
+        return None
+    try:
+        return QueryCache(
+            path,
+            max_embeddings=_int_env("RAG_CACHE_MAX_EMBEDDINGS", 10000),
+            max_results=_int_env("RAG_CACHE_MAX_RESULTS", 2000)
+        )
+    except sqlite3.Error as e:
+        print(f"❌ RAG cache unavailable ({path}): {e}")
+        return None
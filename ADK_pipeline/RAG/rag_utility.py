@@ -1,54 +1,116 @@
-
-from llama_index.core import Settings, VectorStoreIndex, StorageContext
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-from llama_index.llms.groq import Groq
-from llama_index.vector_stores.pinecone import PineconeVectorStore
-from pinecone import Pinecone
 from dotenv import load_dotenv
-import os
+
+from RAG.offer_catalogue import parse_query_filters
+from RAG.query_cache import normalise_query
+from RAG.resources import (
+    get_embed_model,
+    get_offer_catalogue,
+    get_offers_store,
+    get_query_cache,
+    get_response_synthesizer,
+)
+from RAG.vector_store import embedding_model_key
 
 
-#   Load API keys
+#   Load API keys (Groq / embedding / vector store are built lazily by RAG/resources.py)
 load_dotenv()
-GROQ_API_KEY = os.environ["GROQ_API_KEY"]
-PINECONE_API_KEY = os.environ["PINECONE_API_KEY"]
-
-#   Initialize Groq + Embedding
-llm = Groq(model="llama-3.1-8b-instant", api_key=GROQ_API_KEY)
-embed_model = HuggingFaceEmbedding(model_name="sentence-transformers/all-mpnet-base-v2")
-
-Settings.llm = llm
-Settings.embed_model = embed_model
-
-#   Connect to Pinecone
-index_name = "holiday-ads-llama3-groq"
-pc = Pinecone(api_key=PINECONE_API_KEY)
-pinecone_index = pc.Index(index_name)
-vector_store = PineconeVectorStore(pinecone_index=pinecone_index)
-storage_context = StorageContext.from_defaults(vector_store=vector_store)
-
-#   Load existing index
-index = VectorStoreIndex.from_vector_store(
-    vector_store=vector_store,
-    storage_context=storage_context
-)
+
+
+def embed_query(query: str):
+    """Query embedding from the persistent cache; the embedding model is only loaded on a miss."""
+    cache, model_key = get_query_cache(), embedding_model_key()
+    if cache is not None:
+        cached = cache.get_embedding(model_key, query)
+        if cached is not None:
+            return cached
+    embedding = get_embed_model().get_query_embedding(normalise_query(query))
+    if cache is not None:
+        cache.put_embedding(model_key, query, embedding)
+    return embedding
+
+
+def _offer_source(query: str):
+    """
+    (filters, source): catalogue when the query names a category / month / holiday and at least
+    one offer survives those filters, else the vector store (unfiltered).
+    """
+    filters = parse_query_filters(query)
+    if filters:
+        catalogue = get_offer_catalogue()
+        if len(catalogue.filter(filters.get("categories"), filters.get("days"))):
+            return filters, catalogue
+        print(f"⚠️ No catalogue offer matches the filters of {query!r}, using the vector store")
+    return {}, get_offers_store()
+
+
+def _retrieve_from(source, query: str, filters: dict, top_k: int):
+    if filters:
+        return source.retrieve(embed_query(query), filters, top_k)
+    return source.retrieve(query, embed_query(query), top_k)
+
+
+def retrieve_offer_nodes(query: str, top_k: int = 5):
+    """
+    Embeds the query once and returns the top_k offers.
+    - Query names a category / month / holiday → exact filter on the offer catalogue,
+      then vector ranking of the surviving offers only (no survivors → vector store below).
+    - Otherwise → top_k chunks from the configured vector store.
+    """
+    filters, source = _offer_source(query)
+    return _retrieve_from(source, query, filters, top_k)
+
+
+def retrieve_offers(query: str, top_k: int = 5) -> list:
+    """
+    Offer dicts for the query, served from the result cache when the same
+    (normalised query, filters, top_k) was answered against the current index version.
+    """
+    filters, source = _offer_source(query)
+    cache = get_query_cache()
+    key = (normalise_query(query), filters, top_k)
+    if cache is not None:
+        cached = cache.get_result(source.name, source.version, *key)
+        if cached is not None:
+            return cached
+    offers = offers_from_nodes(_retrieve_from(source, query, filters, top_k))
+    if cache is not None:
+        cache.put_result(source.name, source.version, offers, *key)
+    return offers
+
+
+def offers_from_nodes(nodes) -> list:
+    """Retrieved nodes → plain offer dicts (text, score and whatever offer metadata the backend has)."""
+    offers = []
+    for node in nodes:
+        offer = {"score": round(float(node.score or 0.0), 4), "text": node.node.get_content()}
+        for key in ("title", "date_range", "categories", "discount_pct"):
+            if node.node.metadata.get(key) not in (None, ""):
+                offer[key] = node.node.metadata[key]
+        offers.append(offer)
+    return offers
+
 
 # -------------------------------------------------------
 # FUNCTION TOOL: RAG Query Engine
 # -------------------------------------------------------
-def query_promotional_offers(query: str, top_k: int = 5):
+def query_promotional_offers(query: str, top_k: int = 5, synthesize: bool = False):
     """
     Retrieves relevant promotional offers using the RAG index.
     - query: natural language question (e.g., "offers available for groceries in October")
     - top_k: number of top matches to retrieve
+    - synthesize: False (default) → return the matching offers with scores and metadata, no LLM call;
+                  True → also return an LLM-written "response" summarising them
     """
     try:
-        query_engine = index.as_query_engine(similarity_top_k=top_k)
-        response = query_engine.query(query)
+        if not synthesize:
+            return {"query": query, "top_k": top_k, "offers": retrieve_offers(query, top_k)}
+
+        nodes = retrieve_offer_nodes(query, top_k)
         return {
             "query": query,
-            "response": str(response),
-            "top_k": top_k
+            "top_k": top_k,
+            "offers": offers_from_nodes(nodes),
+            "response": str(get_response_synthesizer().synthesize(query, nodes=nodes))
         }
     except Exception as e:
         return {"error": str(e)}
@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+
+
+# -------------------------------------------------------
+# Lazy resource registry: heavy RAG objects (LLM client, embedding model,
+# vector store, offer catalogue, response synthesizer, query cache) are built on first use,
+# or warmed in a background thread, instead of at import time.
+# -------------------------------------------------------
+class ResourceRegistry:
+    """Named factories built at most once each, with per-resource locks and build timings."""
+
+    def __init__(self):
+        self._factories = {}
+        self._values = {}
+        self._locks = {}
+        self._registry_lock = threading.Lock()
+        self.build_seconds = {}
+
+    def register(self, name: str, factory):
+        with self._registry_lock:
+            self._factories[name] = factory
+            self._locks[name] = threading.Lock()
+
+    def get(self, name: str):
+        if name in self._values:
+            return self._values[name]
+        with self._locks[name]:
+            if name not in self._values:
+                started = time.perf_counter()
+                self._values[name] = self._factories[name]()
+                self.build_seconds[name] = round(time.perf_counter() - started, 3)
+        return self._values[name]
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._values
+
+    def reset(self, name: str = ""):
+        with self._registry_lock:
+            for key in [name] if name else list(self._values):
+                self._values.pop(key, None)
+
+    def warm(self, names=None, background: bool = True):
+        """Builds the given resources (all by default); returns the thread when run in the background."""
+        names = list(names or self._factories)
+
+        def build_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"❌ Warm-up failed for {name}: {e}")
+            print(f"✅ RAG resources ready → {self.build_seconds}")
+
+        if not background:
+            build_all()
+            return None
+        thread = threading.Thread(target=build_all, name="rag-warmup", daemon=True)
+        thread.start()
+        return thread
+
+
+registry = ResourceRegistry()
+
+
+# -------------------------------------------------------
+# Factories (heavy imports stay inside them)
+# -------------------------------------------------------
+def _build_llm():
+    from llama_index.core import Settings
+    from llama_index.llms.groq import Groq
+
+    llm = Groq(model="llama-3.1-8b-instant", api_key=os.environ["GROQ_API_KEY"])
+    Settings.llm = llm
+    return llm
+
+
+def _build_embed_model():
+    from llama_index.core import Settings
+
+    from RAG.embeddings import create_embed_model
+
+    embed_model = create_embed_model()
+    Settings.embed_model = embed_model
+    return embed_model
+
+
+def _build_offers_store():
+    from RAG.vector_store import embedding_model_key, get_offers_store
+
+    # The model is only loaded if the index has to be (re)embedded
+    return get_offers_store(get_embed_model, embedding_model_key())
+
+
+def _build_offer_catalogue():
+    from RAG.offer_catalogue import load_offer_catalogue
+    from RAG.vector_store import embedding_model_key
+
+    return load_offer_catalogue(get_embed_model, embedding_model_key())
+
+
+def _build_query_cache():
+    from RAG.query_cache import create_query_cache
+
+    return create_query_cache()
+
+
+def _build_response_synthesizer():
+    from llama_index.core import get_response_synthesizer
+
+    return get_response_synthesizer(llm=registry.get("llm"))
+
+
+registry.register("llm", _build_llm)
+registry.register("embed_model", _build_embed_model)
+registry.register("offers_store", _build_offers_store)
+registry.register("offer_catalogue", _build_offer_catalogue)
+registry.register("response_synthesizer", _build_response_synthesizer)
+registry.register("query_cache", _build_query_cache)
+
+
+def get_llm():
+    return registry.get("llm")
+
+
+def get_embed_model():
+    return registry.get("embed_model")
+
+
+def get_offers_store():
+    return registry.get("offers_store")
+
+
+def get_offer_catalogue():
+    return registry.get("offer_catalogue")
+
+
+def get_response_synthesizer():
+    return registry.get("response_synthesizer")
+
+
+def get_query_cache():
+    """Persistent embedding / result cache, or None when RAG_CACHE_PATH=off."""
+    return registry.get("query_cache")
+
+
+def warm_up_rag():
+    """
+    RAG_WARMUP controls start-up behaviour:
+    - "background" (default) → build everything in a daemon thread; the server starts immediately
+    - "eager"                → build before returning
+    - "off"                  → build lazily on the first offers query
+    """
+    mode = os.environ.get("RAG_WARMUP", "").strip().lower() or "background"
+    if mode == "off":
+        return None
+    return registry.warm(background=mode != "eager")
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+
+# -------------------------------------------------------
+# Configuration
+# -------------------------------------------------------
+_PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OFFERS_SOURCE = os.path.join(_PIPELINE_DIR, "data", "Holiday_ads.txt")
+DEFAULT_OFFERS_INDEX_DIR = os.path.join(_PIPELINE_DIR, "data", "offers_index")
+PINECONE_INDEX_NAME = "holiday-ads-llama3-groq"
+EMBED_MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
+
+EMBEDDING_BACKENDS = ("hf", "onnx", "onnx-int8")
+
+VECTORS_FILE = "vectors.npy"
+METADATA_FILE = "metadata.json"
+
+
+def get_vector_backend_name() -> str:
+    """
+    OFFERS_VECTOR_BACKEND:
+    - "local"    → in-process flat index persisted under OFFERS_INDEX_DIR (default)
+    - "pinecone" → remote Pinecone index (needs PINECONE_API_KEY)
+    """
+    return os.environ.get("OFFERS_VECTOR_BACKEND", "").strip().lower() or "local"
+
+
+def get_embedding_backend_name() -> str:
+    """
+    EMBEDDING_BACKEND (built by RAG/embeddings.py):
+    - "hf"        → sentence-transformers on PyTorch (default)
+    - "onnx"      → the same model on ONNX Runtime
+    - "onnx-int8" → ONNX Runtime with the int8-quantised weights shipped in the model repo
+    """
+    return os.environ.get("EMBEDDING_BACKEND", "").strip().lower() or "hf"
+
+
+def embedding_model_key(backend: str = "") -> str:
+    """
+    Identifies the vector space: indexes, the catalogue and cached query embeddings are
+    tagged with it, so switching backends re-embeds instead of mixing vectors.
+    """
+    backend = backend or get_embedding_backend_name()
+    return EMBED_MODEL_NAME if backend == "hf" else f"{EMBED_MODEL_NAME}:{backend}"
+
+
+def get_offers_source() -> str:
+    return os.environ.get("OFFERS_SOURCE_FILE", "").strip() or DEFAULT_OFFERS_SOURCE
+
+
+def get_offers_index_dir() -> str:
+    return os.environ.get("OFFERS_INDEX_DIR", "").strip() or DEFAULT_OFFERS_INDEX_DIR
+
+
+def file_sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def source_files(source: str) -> list:
+    """The offers source is one brochure file or a directory of them (*.txt, e.g. store_offers_data/)."""
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(source, name) for name in os.listdir(source)
+            if name.lower().endswith(".txt") and os.path.isfile(os.path.join(source, name))
+        )
+    return [source]
+
+
+def source_sha256(source: str) -> str:
+    """Content hash of the offers source (file, or every brochure in the directory)."""
+    if not os.path.isdir(source):
+        return file_sha256(source)
+    digest = hashlib.sha256()
+    for path in source_files(source):
+        digest.update(os.path.basename(path).encode())
+        digest.update(file_sha256(path).encode())
+    return digest.hexdigest()
+
+
+# -------------------------------------------------------
+# Local flat index: normalised float32 vectors (memory-mapped .npy) + JSON metadata
+# -------------------------------------------------------
+class LocalVectorIndex:
+    """
+    Exact cosine search over a small corpus.
+    Vectors are L2-normalised at build time, so a query is one mat-vec product
+    plus an argpartition for the top k.
+    """
+
+    def __init__(self, vectors: np.ndarray, records: list, info: dict):
+        self.vectors = vectors
+        self.records = records
+        self.info = info
+
+    @property
+    def version(self) -> str:
+        """Changes whenever the index is rebuilt (source hash, model, build time…)."""
+        return hashlib.sha256(json.dumps(self.info, sort_keys=True).encode()).hexdigest()[:16]
+
+    @classmethod
+    def load(cls, index_dir: str):
+        with open(os.path.join(index_dir, METADATA_FILE), encoding="utf-8") as f:
+            metadata = json.load(f)
+        vectors = np.load(os.path.join(index_dir, VECTORS_FILE), mmap_mode="r")
+        return cls(vectors, metadata["records"], metadata["info"])
+
+    def save(self, index_dir: str):
+        """Writes both files next to each other, then swaps them in so readers never see a mix."""
+        os.makedirs(index_dir, exist_ok=True)
+        vectors_tmp = os.path.join(index_dir, VECTORS_FILE + ".tmp")
+        metadata_tmp = os.path.join(index_dir, METADATA_FILE + ".tmp")
+        with open(vectors_tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(self.vectors, dtype=np.float32))
+        with open(metadata_tmp, "w", encoding="utf-8") as f:
+            json.dump({"info": self.info, "records": self.records}, f, ensure_ascii=False)
+        os.replace(vectors_tmp, os.path.join(index_dir, VECTORS_FILE))
+        os.replace(metadata_tmp, os.path.join(index_dir, METADATA_FILE))
+
+    def search(self, query_vector, top_k: int = 5, candidates=None):
+        """[(score, record), ...] best first; candidates restricts scoring to those row positions."""
+        positions = np.arange(len(self.records)) if candidates is None else np.asarray(candidates, dtype=np.int64)
+        if not len(positions) or top_k <= 0:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = (self.vectors if candidates is None else self.vectors[positions]) @ query
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.records[positions[i]]) for i in top]
+
+
+def normalise_rows(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+# -------------------------------------------------------
+# Backends: retrieve(query, query_embedding, top_k) → [NodeWithScore]
+# .version identifies the indexed corpus (query-result cache key)
+# -------------------------------------------------------
+class LocalOffersStore:
+    """
+    In-process backend; when the brochure or model changed since the persisted index was built,
+    it is re-synced incrementally (only new / changed chunks are embedded, see RAG/ingest_offers.py).
+    load_embed_model() is only called for that re-sync, so opening a current index never loads the model.
+    """
+
+    name = "local"
+
+    def __init__(self, load_embed_model, model_name: str = ""):
+        from RAG.ingest_offers import sync_local_index
+
+        source_file, index_dir = get_offers_source(), get_offers_index_dir()
+        index = None
+        try:
+            index = LocalVectorIndex.load(index_dir)
+        except (OSError, ValueError, KeyError):
+            pass
+        if index is None or index.info.get("source_sha256") != source_sha256(source_file) \
+                or index.info.get("model") != model_name:
+            index, _ = sync_local_index(load_embed_model(), model_name, source_file, index_dir, previous=index)
+        self.index = index
+        self.version = index.version
+
+    def retrieve(self, query: str, query_embedding, top_k: int = 5):
+        from llama_index.core.schema import NodeWithScore, TextNode
+
+        return [
+            NodeWithScore(node=TextNode(id_=record["id"], text=record["text"], metadata=record["metadata"]), score=score)
+            for score, record in self.index.search(query_embedding, top_k)
+        ]
+
+
+class PineconeOffersStore:
+    """
+    Remote backend: the existing Pinecone index, queried with a precomputed embedding.
+    The connection (and the embedding model it is bound to) is opened on the first retrieve,
+    so result-cache hits only need .version.
+    """
+
+    name = "pinecone"
+
+    def __init__(self, load_embed_model, model_name: str = ""):
+        self._load_embed_model = load_embed_model
+        self._index = None
+        self._index_lock = threading.Lock()
+        # The remote index is (re)built from the brochure → its hash identifies the indexed corpus
+        self.version = f"{PINECONE_INDEX_NAME}:{source_sha256(get_offers_source())[:16]}"
+
+    @property
+    def index(self):
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    from llama_index.core import StorageContext, VectorStoreIndex
+                    from llama_index.vector_stores.pinecone import PineconeVectorStore
+                    from pinecone import Pinecone
+
+                    pc = Pinecone(api_key=os.environ["PINECONE_API_KEY"])
+                    vector_store = PineconeVectorStore(pinecone_index=pc.Index(PINECONE_INDEX_NAME))
+                    self._index = VectorStoreIndex.from_vector_store(
+                        vector_store=vector_store,
+                        storage_context=StorageContext.from_defaults(vector_store=vector_store),
+                        embed_model=self._load_embed_model()
+                    )
+        return self._index
+
+    def retrieve(self, query: str, query_embedding, top_k: int = 5):
+        from llama_index.core import QueryBundle
+
+        retriever = self.index.as_retriever(similarity_top_k=top_k)
+        return retriever.retrieve(QueryBundle(query_str=query, embedding=list(query_embedding)))
+
+
+VECTOR_BACKENDS = {
+    LocalOffersStore.name: LocalOffersStore,
+    PineconeOffersStore.name: PineconeOffersStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_offers_store(load_embed_model, model_name: str = ""):
+    """Process-wide offers vector store for the configured backend (load_embed_model: called only if needed)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                backend = get_vector_backend_name()
+                if backend not in VECTOR_BACKENDS:
+                    raise ValueError(f"Unknown OFFERS_VECTOR_BACKEND '{backend}' (use {', '.join(VECTOR_BACKENDS)})")
+                _store = VECTOR_BACKENDS[backend](load_embed_model, model_name)
+    return _store
+
+
+def reset_offers_store():
+    global _store
+    with _store_lock:
+        _store = None
+
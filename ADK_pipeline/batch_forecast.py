@@ -0,0 +1,343 @@
+# Offline demand forecasts for every (Product ID, Store ID) series × the next --horizon months.
+# Streams `inventory` in chunks into monthly aggregates, fits the tools/forecasting.py models
+# shard by shard on a process pool and writes each finished shard atomically, so an
+# interrupted run resumes where it stopped. Run from ADK_pipeline/:
+#   python batch_forecast.py [--output table|parquet] [--path data/forecasts] [--horizon 12]
+#                            [--chunk-size 100000] [--shard-size 500] [--workers N] [--fresh]
+# With FORECAST_SOURCE=precomputed the forecast_demand tool answers product × store asks
+# from the `forecasts` table instead of fitting live.
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from tools.data_version import read_data_version
+from tools.db_engine import create_db_engine, get_db_url, row_order_column
+from tools.forecasting import (
+    FORECASTS_TABLE,
+    MONTH_KEYS,
+    Panel,
+    SUM_COLUMNS,
+    aggregate_monthly_rows,
+    drop_partial_month,
+    finish_monthly_sums,
+    fit_panel,
+    forecast_frame,
+    load_monthly_sums,
+    monthly_series,
+    sql_month_end,
+)
+
+
+SERIES_KEYS = ["product_id", "store_id"]
+
+_INVENTORY_SQL = """
+    SELECT "Product ID" AS product_id, "Store ID" AS store_id, year, month, Date AS date, {row_order} AS row_order,
+           "Units Sold" AS units_sold, Price AS price, Discount AS discount,
+           "Competitor Pricing" AS comp_price, Seasonality AS season
+    FROM inventory
+"""
+
+FORECASTS_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {FORECASTS_TABLE} (
+        "Product ID" TEXT NOT NULL,
+        "Store ID" TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        horizon INTEGER NOT NULL,
+        forecast_units DOUBLE PRECISION,
+        low DOUBLE PRECISION,
+        high DOUBLE PRECISION,
+        model TEXT,
+        naive_units DOUBLE PRECISION,
+        ses_units DOUBLE PRECISION,
+        regression_units DOUBLE PRECISION,
+        naive_mae DOUBLE PRECISION,
+        ses_mae DOUBLE PRECISION,
+        regression_mae DOUBLE PRECISION,
+        same_month_units DOUBLE PRECISION,
+        last_year INTEGER,
+        last_month INTEGER,
+        last_units DOUBLE PRECISION,
+        data_version INTEGER NOT NULL,
+        PRIMARY KEY ("Product ID", "Store ID", year, month)
+    )
+    """,
+    # One row per committed shard → what a resumed run skips
+    """
+    CREATE TABLE IF NOT EXISTS forecast_progress (
+        run_key TEXT NOT NULL,
+        shard INTEGER NOT NULL,
+        series_count INTEGER NOT NULL,
+        row_count INTEGER NOT NULL,
+        PRIMARY KEY (run_key, shard)
+    )
+    """,
+    # Shard count of a run, recorded once it is split → a finished run is recognised before loading
+    """
+    CREATE TABLE IF NOT EXISTS forecast_runs (
+        run_key TEXT PRIMARY KEY,
+        shard_count INTEGER NOT NULL
+    )
+    """,
+]
+
+PARQUET_MANIFEST_FILE = "_manifest.json"
+
+
+# ----------------------------------------------------------------
+# 1️⃣ Stream inventory → monthly sums / Seasonality counts
+# ----------------------------------------------------------------
+def _combine(sums_parts: list, season_parts: list):
+    """Re-aggregates partial results (sums / counts add up, first_seen / first_row take the earliest)."""
+    sums = pd.concat(sums_parts, ignore_index=True).groupby(MONTH_KEYS, as_index=False).sum()
+    seasons = pd.concat(season_parts, ignore_index=True)
+    if len(seasons):
+        seasons = seasons.groupby(MONTH_KEYS + ["value"], as_index=False).agg(
+            cnt=("cnt", "sum"), first_seen=("first_seen", "min"), first_row=("first_row", "min")
+        )
+    return sums, seasons
+
+
+def stream_monthly_sums(engine, chunk_size: int):
+    """
+    (sums, seasons) in the load_monthly_sums() layout, built from `inventory` chunk by chunk,
+    so memory holds the monthly aggregates rather than the daily table. Also returns the row count.
+    """
+    started = time.perf_counter()
+    sums_parts, season_parts, rows = [], [], 0
+    with engine.connect() as conn:
+        # Server-side cursor on Postgres; SQLite steps through the result lazily anyway
+        stream = conn.execution_options(stream_results=True)
+        statement = text(_INVENTORY_SQL.format(row_order=row_order_column(engine.dialect.name) or "NULL"))
+        for chunk in pd.read_sql(statement, stream, chunksize=chunk_size):
+            sums, seasons = aggregate_monthly_rows(chunk)
+            sums_parts.append(sums)
+            season_parts.append(seasons)
+            rows += len(chunk)
+            # Keep the partials compact: fold them every 16 chunks
+            if len(sums_parts) >= 16:
+                sums, seasons = _combine(sums_parts, season_parts)
+                sums_parts, season_parts = [sums], [seasons]
+            elapsed = time.perf_counter() - started
+            print(f"   streamed {rows:,} rows ({rows / max(elapsed, 1e-9):,.0f} rows/s)", end="\r")
+    print()
+    if not sums_parts:
+        return pd.DataFrame(columns=MONTH_KEYS + SUM_COLUMNS), pd.DataFrame(), 0
+
+    sums, seasons = _combine(sums_parts, season_parts)
+    return finish_monthly_sums(sums), seasons, rows
+
+
+# ----------------------------------------------------------------
+# 2️⃣ Shards → fits → forecast rows (runs in worker processes)
+# ----------------------------------------------------------------
+def forecast_shard(shard: int, monthly: pd.DataFrame, season_labels: list, horizon: int):
+    """Fits every series in one shard and forecasts months 1..horizon after each series' last observation."""
+    panel = Panel(monthly, SERIES_KEYS, season_labels)
+    fitted = fit_panel(panel)
+    series = np.repeat(np.arange(len(panel.keys)), horizon)
+    target = panel.last_observed[series] + np.tile(np.arange(1, horizon + 1), len(panel.keys))
+    return shard, len(panel.keys), forecast_frame(panel, fitted, series, target)
+
+
+def split_shards(monthly: pd.DataFrame, shard_size: int) -> list:
+    """Contiguous, deterministic shards of shard_size series (sorted keys → same shards on resume)."""
+    monthly = monthly.sort_values(MONTH_KEYS, kind="stable")
+    codes = monthly.groupby(SERIES_KEYS, sort=True).ngroup().to_numpy() // max(shard_size, 1)
+    return [part for _, part in monthly.groupby(codes, sort=True)]
+
+
+# ----------------------------------------------------------------
+# 3️⃣ Writers: each shard is committed atomically, done shards are skipped on resume
+# ----------------------------------------------------------------
+class TableWriter:
+    """`forecasts` table + forecast_progress rows, one transaction per shard."""
+
+    def __init__(self, engine, run_key: str, data_version: int, fresh: bool):
+        self.engine = engine
+        self.run_key = run_key
+        self.data_version = data_version
+        with engine.begin() as conn:
+            for ddl in FORECASTS_DDL:
+                conn.execute(text(ddl))
+            done = conn.execute(text("SELECT shard FROM forecast_progress WHERE run_key = :run_key"),
+                                {"run_key": run_key}).scalars().all()
+            if fresh or not done:
+                # New data version / layout → previous forecasts are stale
+                conn.execute(text(f"DELETE FROM {FORECASTS_TABLE}"))
+                conn.execute(text("DELETE FROM forecast_progress"))
+                conn.execute(text("DELETE FROM forecast_runs"))
+                done = []
+            self.shard_count = conn.execute(text("SELECT shard_count FROM forecast_runs WHERE run_key = :run_key"),
+                                            {"run_key": run_key}).scalar()
+        self.done = set(done)
+
+    def set_shard_count(self, shard_count: int):
+        with self.engine.begin() as conn:
+            conn.execute(text("DELETE FROM forecast_runs WHERE run_key = :k"), {"k": self.run_key})
+            conn.execute(text("INSERT INTO forecast_runs (run_key, shard_count) VALUES (:k, :n)"),
+                         {"k": self.run_key, "n": shard_count})
+        self.shard_count = shard_count
+
+    def write(self, shard: int, series: int, frame: pd.DataFrame):
+        frame = frame.assign(data_version=self.data_version)
+        params = [f"p{i}" for i in range(len(frame.columns))]
+        columns = ", ".join('"' + column + '"' for column in frame.columns)
+        insert = text(f"INSERT INTO {FORECASTS_TABLE} ({columns}) VALUES ({', '.join(':' + p for p in params)})")
+        records = [
+            dict(zip(params, row))
+            for row in frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+        ]
+        series_keys = [{"p": p, "s": s} for p, s in frame[["Product ID", "Store ID"]].drop_duplicates().itertuples(index=False)]
+        with self.engine.begin() as conn:
+            # Idempotent per shard, even over rows left by an older writer
+            if series_keys:
+                conn.execute(text(f'DELETE FROM {FORECASTS_TABLE} WHERE "Product ID" = :p AND "Store ID" = :s'), series_keys)
+            if records:
+                conn.execute(insert, records)
+            conn.execute(text("INSERT INTO forecast_progress (run_key, shard, series_count, row_count) VALUES (:k, :s, :n, :r)"),
+                         {"k": self.run_key, "s": shard, "n": series, "r": len(frame)})
+
+
+class ParquetWriter:
+    """One part-NNNNN.parquet file per shard (written to .tmp, then renamed) + _manifest.json."""
+
+    def __init__(self, path: str, run_key: str, data_version: int, fresh: bool):
+        self.path = path
+        self.data_version = data_version
+        os.makedirs(path, exist_ok=True)
+        self.manifest_path = os.path.join(path, PARQUET_MANIFEST_FILE)
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+        if fresh or self.manifest.get("run_key") != run_key:
+            for stale in glob.glob(os.path.join(path, "part-*.parquet*")):
+                os.remove(stale)
+            self.manifest = {"run_key": run_key, "data_version": data_version}
+            self._save_manifest()
+        self.shard_count = self.manifest.get("shard_count")
+        self.done = {
+            int(os.path.basename(name)[5:10]) for name in glob.glob(os.path.join(path, "part-*.parquet"))
+        }
+
+    def _save_manifest(self):
+        with open(self.manifest_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(self.manifest_path + ".tmp", self.manifest_path)
+
+    def set_shard_count(self, shard_count: int):
+        self.manifest["shard_count"] = self.shard_count = shard_count
+        self._save_manifest()
+
+    def write(self, shard: int, series: int, frame: pd.DataFrame):
+        target = os.path.join(self.path, f"part-{shard:05d}.parquet")
+        frame.assign(data_version=self.data_version).to_parquet(target + ".tmp", index=False)
+        os.replace(target + ".tmp", target)
+
+
+# ----------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------
+def run_batch_forecast(output: str = "table", path: str = "data/forecasts", horizon: int = 12,
+                       chunk_size: int = 100_000, shard_size: int = 500, workers: int = 0,
+                       source: str = "inventory", fresh: bool = False) -> dict:
+    """Forecasts every (Product ID, Store ID) series; returns timing / throughput stats."""
+    started = time.perf_counter()
+    engine = create_db_engine(get_db_url(), read_only=False)
+    data_version = read_data_version(engine)
+
+    # Done shards first: a rerun of a finished run for the same data / layout never streams inventory
+    run_key = f"v{data_version}:h{horizon}:s{shard_size}"
+    if output == "parquet":
+        writer = ParquetWriter(path, run_key, data_version, fresh)
+    else:
+        writer = TableWriter(engine, run_key, data_version, fresh)
+    if writer.shard_count is not None and len(writer.done) >= writer.shard_count:
+        engine.dispose()
+        print(f"✅ All {writer.shard_count} shards of {run_key} already written, nothing to do (--fresh to redo)")
+        return {"data_version": data_version, "input_rows": 0, "series": 0, "forecast_rows": 0,
+                "pending_shards": 0, "total_seconds": round(time.perf_counter() - started, 3)}
+
+    # 1️⃣ Monthly history
+    print(f"📥 Loading monthly history from {source} …")
+    if source == "rollups":
+        sums, seasons = load_monthly_sums(engine)
+        input_rows = len(sums)
+    else:
+        sums, seasons, input_rows = stream_monthly_sums(engine, chunk_size)
+    load_seconds = time.perf_counter() - started
+    # Same base as the live forecaster: a partly loaded latest month is not an observation
+    sums, seasons = drop_partial_month(sums, seasons, sql_month_end(engine))
+    monthly = monthly_series(sums, seasons, SERIES_KEYS)
+    season_labels = sorted(monthly["season"].dropna().unique().tolist())
+
+    # 2️⃣ Shards, skipping what a previous run of the same data / layout already wrote
+    shards = split_shards(monthly, shard_size)
+    if writer.shard_count != len(shards):
+        writer.set_shard_count(len(shards))
+    pending = [shard for shard in range(len(shards)) if shard not in writer.done]
+    print(f"🧮 {monthly.groupby(SERIES_KEYS).ngroups:,} series in {len(shards)} shards "
+          f"({len(shards) - len(pending)} already done), horizon {horizon} months")
+
+    # 3️⃣ Fit on the process pool, write from this process as shards complete
+    fit_started = time.perf_counter()
+    series_done = rows_written = 0
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(forecast_shard, shard, shards[shard], season_labels, horizon) for shard in pending]
+        for future in as_completed(futures):
+            shard, series, frame = future.result()
+            writer.write(shard, series, frame)
+            series_done += series
+            rows_written += len(frame)
+            elapsed = time.perf_counter() - fit_started
+            print(f"   shard {shard}: {series} series → {len(frame)} rows "
+                  f"({rows_written / max(elapsed, 1e-9):,.0f} forecast rows/s)")
+
+    fit_seconds = time.perf_counter() - fit_started
+    engine.dispose()
+    stats = {
+        "data_version": data_version,
+        "input_rows": input_rows,
+        "load_seconds": round(load_seconds, 3),
+        "input_rows_per_s": round(input_rows / max(load_seconds, 1e-9)),
+        "pending_shards": len(pending),
+        "series": series_done,
+        "forecast_rows": rows_written,
+        "fit_seconds": round(fit_seconds, 3),
+        "series_per_s": round(series_done / max(fit_seconds, 1e-9)),
+        "forecast_rows_per_s": round(rows_written / max(fit_seconds, 1e-9)),
+        "total_seconds": round(time.perf_counter() - started, 3),
+    }
+    print(f"✅ Batch forecast done → {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Precompute demand forecasts for every product × store series.")
+    parser.add_argument("--output", choices=["table", "parquet"], default="table",
+                        help=f"`{FORECASTS_TABLE}` table in INVENTORY_DB_URL, or Parquet files under --path")
+    parser.add_argument("--path", default="data/forecasts", help="Parquet output directory")
+    parser.add_argument("--horizon", type=int, default=12, help="Months forecast per series")
+    parser.add_argument("--source", choices=["inventory", "rollups"], default="inventory",
+                        help="Stream the daily table, or read the monthly_product_store rollup")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Inventory rows per streamed chunk")
+    parser.add_argument("--shard-size", type=int, default=500, help="Series per worker task / committed shard")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: all cores)")
+    parser.add_argument("--fresh", action="store_true", help="Discard previous progress and start over")
+    args = parser.parse_args()
+    run_batch_forecast(args.output, args.path, args.horizon, args.chunk_size, args.shard_size,
+                       args.workers, args.source, args.fresh)
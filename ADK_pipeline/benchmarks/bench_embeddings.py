@@ -0,0 +1,98 @@
+# Embedding throughput / latency per backend (RAG/embeddings.py).
+# Corpus = offers from data/Holiday_ads.txt, repeated up to --sentences.
+# Run from ADK_pipeline/:
+#   python -m benchmarks.bench_embeddings [--backends hf onnx onnx-int8] [--sentences 1024]
+#                                         [--batch-size 32] [--workers 4] [--queries 200]
+import argparse
+import time
+
+import numpy as np
+
+from RAG.embeddings import create_embed_model, embedding_settings
+from RAG.offer_catalogue import parse_brochure
+from RAG.vector_store import EMBEDDING_BACKENDS, get_offers_source, normalise_rows, source_files
+
+
+QUERIES = [
+    "New Year offers",
+    "Toys December promotions",
+    "offers for groceries in October",
+    "any discounts on electronics for Black Friday",
+    "what furniture deals run in spring",
+    "Valentine's day clothing sale",
+]
+
+
+def load_corpus(size: int) -> list:
+    texts = []
+    for path in source_files(get_offers_source()):
+        with open(path, encoding="utf-8") as f:
+            texts.extend(record["text"] for record in parse_brochure(f.read()))
+    texts = texts or QUERIES
+    return [texts[i % len(texts)] for i in range(size)]
+
+
+def bench_backend(backend: str, corpus: list, queries: int, batch_size: int, workers: int, repeat: int):
+    started = time.perf_counter()
+    model = create_embed_model(backend, batch_size=batch_size, workers=workers)
+    model.get_query_embedding("warm up")
+    load_seconds = time.perf_counter() - started
+
+    latencies = []
+    for i in range(queries):
+        # Vary the text so no layer can serve a repeat from a cache
+        query = f"{QUERIES[i % len(QUERIES)]} #{i}"
+        t = time.perf_counter()
+        model.get_query_embedding(query)
+        latencies.append((time.perf_counter() - t) * 1e3)
+
+    best, vectors = None, None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        vectors = model.get_text_embedding_batch(corpus)
+        elapsed = time.perf_counter() - t
+        best = elapsed if best is None else min(best, elapsed)
+
+    return {
+        "load_s": load_seconds,
+        "sentences_per_s": len(corpus) / best,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "vectors": normalise_rows(vectors),
+    }
+
+
+def run(backends: list, sentences: int, queries: int, batch_size: int, workers: int, repeat: int):
+    corpus = load_corpus(sentences)
+    settings = embedding_settings()
+    batch_size = batch_size or settings["batch_size"]
+    workers = workers or settings["workers"]
+    print(f"{len(corpus)} sentences, {queries} single queries, batch_size={batch_size}, workers={workers}\n")
+    print(f"{'backend':<12} {'load s':>8} {'sent/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'cos vs first':>13}")
+
+    reference = None
+    for backend in backends:
+        try:
+            result = bench_backend(backend, corpus, queries, batch_size, workers, repeat)
+        except Exception as e:
+            print(f"{backend:<12} {'skipped':>8}  ({type(e).__name__}: {e})")
+            continue
+        # Agreement with the first backend that ran (int8 drift check)
+        if reference is None:
+            reference, agreement = result["vectors"], 1.0
+        else:
+            agreement = float(np.mean(np.sum(reference * result["vectors"], axis=1)))
+        print(f"{backend:<12} {result['load_s']:>8.2f} {result['sentences_per_s']:>10.1f} "
+              f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} {agreement:>13.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sentences/sec and query latency per embedding backend.")
+    parser.add_argument("--backends", nargs="+", choices=EMBEDDING_BACKENDS, default=list(EMBEDDING_BACKENDS))
+    parser.add_argument("--sentences", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=0, help="Default EMBED_BATCH_SIZE")
+    parser.add_argument("--workers", type=int, default=0, help="Default EMBED_WORKERS")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.backends, args.sentences, args.queries, args.batch_size, args.workers, args.repeat)
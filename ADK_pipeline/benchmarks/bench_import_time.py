@@ -0,0 +1,67 @@
+# Cold-start benchmark for the lazy RAG stack (RAG/resources.py).
+# Each measurement runs in a fresh interpreter so module caches don't leak between runs.
+# Run from ADK_pipeline/:
+#   python -m benchmarks.bench_import_time [--repeat 5] [--skip-build]
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+# (label, code timed inside the child interpreter, runs)
+SCENARIOS = [
+    ("import RAG.rag_utility (lazy)", "import RAG.rag_utility", None),
+    ("import RAG.async_rag_utility (lazy)", "import RAG.async_rag_utility", None),
+    ("import inventory_agent.agent", "import inventory_agent.agent", None),
+]
+
+# What importing RAG/rag_utility.py used to cost: every resource built before the first request
+EAGER_BUILD = ("import + build all RAG resources (old eager import)",
+               "import RAG.rag_utility\nfrom RAG.resources import registry\n"
+               "for name in ('llm', 'embed_model', 'offers_store', 'offer_catalogue', 'response_synthesizer'):\n"
+               "    registry.get(name)", 1)
+
+_CHILD_TEMPLATE = """
+import time
+_start = time.perf_counter()
+{code}
+print(f"__elapsed__ {{time.perf_counter() - _start:.6f}}")
+"""
+
+
+def _time_in_child(code: str):
+    """Seconds taken by code in a fresh interpreter, or the error tail if it failed."""
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD_TEMPLATE.format(code=code)],
+        capture_output=True, text=True, cwd=os.getcwd(), env={**os.environ, "RAG_WARMUP": "off"},
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("__elapsed__ "):
+            return float(line.split()[1]), None
+    error = (result.stderr.strip().splitlines() or ["unknown error"])[-1]
+    return None, error
+
+
+def run(repeat: int, skip_build: bool):
+    scenarios = SCENARIOS + ([] if skip_build else [EAGER_BUILD])
+    print(f"{'scenario':<55} {'median s':>10} {'min s':>8}")
+    for label, code, runs in scenarios:
+        timings, error = [], None
+        for _ in range(runs or repeat):
+            elapsed, error = _time_in_child(code)
+            if elapsed is None:
+                break
+            timings.append(elapsed)
+        if not timings:
+            print(f"{label:<55} {'skipped':>10}  ({error})")
+            continue
+        print(f"{label:<55} {statistics.median(timings):>10.3f} {min(timings):>8.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import / cold-start timings for the lazy RAG stack.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-build", action="store_true", help="Don't time the full eager resource build")
+    args = parser.parse_args()
+    run(args.repeat, args.skip_build)
@@ -0,0 +1,94 @@
+# Before/after benchmark for the typed date columns + composite indexes built by rds_sim/local_db.py.
+# Run from ADK_pipeline/:
+#   python -m benchmarks.bench_inventory_indexes [--days 730] [--stores 5] [--repeat 20]
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import text
+
+from benchmarks.synthetic_inventory import make_inventory_frame
+from rds_sim.local_db import create_inventory_indexes, prepare_inventory_frame
+from tools.db_engine import create_db_engine
+
+
+# Representative lookups issued by tools/db_tools.py (before: text Date range, after: year/month)
+QUERIES = {
+    "product month (store)": (
+        """SELECT SUM("Units Sold"), AVG(Price) FROM inventory
+           WHERE "Product ID" = :pid AND Date >= :start AND Date < :end AND "Store ID" = :sid""",
+        """SELECT SUM("Units Sold"), AVG(Price) FROM inventory
+           WHERE "Product ID" = :pid AND year = :year AND month = :month AND "Store ID" = :sid""",
+    ),
+    "category month": (
+        """SELECT COUNT(DISTINCT "Product ID"), SUM("Units Sold") FROM inventory
+           WHERE Category = :cat AND Date >= :start AND Date < :end""",
+        """SELECT COUNT(DISTINCT "Product ID"), SUM("Units Sold") FROM inventory
+           WHERE Category = :cat AND year = :year AND month = :month""",
+    ),
+    "overall month by category": (
+        """SELECT Category, SUM("Units Sold") FROM inventory
+           WHERE Date >= :start AND Date < :end GROUP BY Category""",
+        """SELECT Category, SUM("Units Sold") FROM inventory
+           WHERE year = :year AND month = :month GROUP BY Category""",
+    ),
+}
+
+PARAMS = {
+    "pid": "T0002", "sid": "S001", "cat": "Toys",
+    "start": "2023-01-01", "end": "2023-02-01", "year": 2023, "month": 1,
+}
+
+
+def _time_query(conn, sql: str, repeat: int) -> float:
+    """Median wall time of a query in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(text(sql), PARAMS).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _query_plan(conn, sql: str) -> str:
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), PARAMS).all()
+    return "; ".join(row[-1] for row in rows)
+
+
+def run(days: int, stores: int, repeat: int):
+    raw_df = make_inventory_frame(n_days=days, n_stores=stores)
+    print(f"Synthetic inventory: {len(raw_df):,} rows")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Before: plain to_sql dump (text timestamps, no indexes)
+        before_engine = create_db_engine(f"sqlite:///{os.path.join(tmp_dir, 'before.db')}", read_only=False)
+        raw_df.to_sql("inventory", before_engine, index=False, if_exists="replace")
+
+        # After: local_db build step (ISO date, year/month, indexes, ANALYZE)
+        after_engine = create_db_engine(f"sqlite:///{os.path.join(tmp_dir, 'after.db')}", read_only=False)
+        prepare_inventory_frame(raw_df).to_sql("inventory", after_engine, index=False, if_exists="replace")
+        with after_engine.begin() as conn:
+            create_inventory_indexes(conn)
+
+        with before_engine.connect() as before_conn, after_engine.connect() as after_conn:
+            for name, (before_sql, after_sql) in QUERIES.items():
+                before_ms = _time_query(before_conn, before_sql, repeat)
+                after_ms = _time_query(after_conn, after_sql, repeat)
+                print(f"\n=== {name} ===")
+                print(f"  before: {before_ms:8.3f} ms | plan: {_query_plan(before_conn, before_sql)}")
+                print(f"  after : {after_ms:8.3f} ms | plan: {_query_plan(after_conn, after_sql)}")
+                print(f"  speedup: {before_ms / after_ms:.1f}x")
+
+        before_engine.dispose()
+        after_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark inventory lookups before/after indexing.")
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--stores", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.days, args.stores, args.repeat)
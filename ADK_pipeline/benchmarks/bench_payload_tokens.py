@@ -0,0 +1,105 @@
+# Tokens per tool response, full vs compact payloads (tools/compact_payloads.py).
+# Counts the JSON each response serialises to with tiktoken when installed
+# (an approximation of Gemini's tokenizer), else chars / 4.
+# Run from ADK_pipeline/:
+#   python -m benchmarks.bench_payload_tokens [--product T0002] [--category Toys] [--store S001]
+#                                             [--month January] [--batch-size 5] [--encoding cl100k_base]
+import argparse
+import json
+import os
+
+from sqlalchemy import text
+
+from tools.compact_payloads import COMPACT_LEGEND, PAYLOAD_FORMATS
+from tools.db_engine import get_engine
+from tools.db_tools import (
+    get_category_context_with_month,
+    get_overall_category_summary,
+    get_product_context_with_month,
+    get_products_context_batch,
+)
+
+
+def make_counter(encoding: str):
+    """(name, count(text)) using tiktoken if available, else the chars / 4 rule of thumb."""
+    try:
+        import tiktoken
+
+        encoder = tiktoken.get_encoding(encoding)
+        return f"tiktoken {encoding}", lambda payload: len(encoder.encode(payload))
+    except ImportError:
+        reason = "pip install tiktoken for exact counts"
+    except Exception as e:
+        # The encoding file is downloaded on first use
+        reason = f"tiktoken unavailable: {type(e).__name__}"
+    return f"chars / 4 ({reason})", lambda payload: (len(payload) + 3) // 4
+
+
+def sample_arguments(product_id: str, category: str, store_id: str, batch_size: int):
+    """Fills unspecified IDs from the rollups so the benchmark runs against any DB."""
+    with get_engine().connect() as conn:
+        products = conn.execute(text(
+            'SELECT DISTINCT "Product ID" FROM monthly_product_store ORDER BY "Product ID" LIMIT :n'
+        ), {"n": max(batch_size, 1)}).scalars().all()
+        if not category:
+            category = conn.execute(text("SELECT MIN(Category) FROM monthly_category")).scalar() or ""
+        if not store_id:
+            store_id = conn.execute(text('SELECT MIN("Store ID") FROM monthly_product_store')).scalar() or ""
+    return product_id or (products[0] if products else ""), category, store_id, products
+
+
+def tool_calls(product_id: str, category: str, store_id: str, month_name: str, batch_products: list):
+    return [
+        ("get_product_context", get_product_context_with_month, (product_id, month_name, "")),
+        ("get_product_context @store", get_product_context_with_month, (product_id, month_name, store_id)),
+        ("get_category_context", get_category_context_with_month, (category, month_name, "")),
+        ("get_overall_category_summary", get_overall_category_summary, (month_name, "")),
+        ("get_overall_category_summary @store", get_overall_category_summary, (month_name, store_id)),
+        (f"get_products_context_batch ×{len(batch_products)}", get_products_context_batch,
+         (batch_products, [store_id], month_name)),
+    ]
+
+
+def run(product_id: str, category: str, store_id: str, month_name: str, batch_size: int, encoding: str):
+    counter_name, count = make_counter(encoding)
+    product_id, category, store_id, batch_products = sample_arguments(product_id, category, store_id, batch_size)
+    print(f"Token counter: {counter_name}")
+    print(f"Product {product_id}, category {category}, store {store_id}, month {month_name or 'latest'}\n")
+
+    previous_format = os.environ.get("TOOL_RESPONSE_FORMAT")
+    tokens = {}
+    try:
+        for payload_format in PAYLOAD_FORMATS:
+            os.environ["TOOL_RESPONSE_FORMAT"] = payload_format
+            for name, tool, arguments in tool_calls(product_id, category, store_id, month_name, batch_products):
+                # ADK sends the returned dict to the model as JSON
+                tokens[(name, payload_format)] = count(json.dumps(tool(*arguments), ensure_ascii=False))
+    finally:
+        if previous_format is None:
+            os.environ.pop("TOOL_RESPONSE_FORMAT", None)
+        else:
+            os.environ["TOOL_RESPONSE_FORMAT"] = previous_format
+
+    print(f"{'tool':<40} {'full':>8} {'compact':>8} {'saved':>7}")
+    totals = {payload_format: 0 for payload_format in PAYLOAD_FORMATS}
+    for name, _, _ in tool_calls(product_id, category, store_id, month_name, batch_products):
+        full, compact = tokens[(name, "full")], tokens[(name, "compact")]
+        totals["full"] += full
+        totals["compact"] += compact
+        print(f"{name:<40} {full:>8} {compact:>8} {1 - compact / max(full, 1):>7.1%}")
+    print(f"{'total':<40} {totals['full']:>8} {totals['compact']:>8} "
+          f"{1 - totals['compact'] / max(totals['full'], 1):>7.1%}")
+    # Paid once per model call in compact mode (part of the demand predictor instruction)
+    print(f"\nLegend in the instruction: {count(COMPACT_LEGEND)} tokens per model call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tokens per tool response in full vs compact format.")
+    parser.add_argument("--product", default="", help="Default: first product in the rollups")
+    parser.add_argument("--category", default="", help="Default: first category in the rollups")
+    parser.add_argument("--store", default="", help="Default: first store in the rollups")
+    parser.add_argument("--month", default="", help="Default: latest available month")
+    parser.add_argument("--batch-size", type=int, default=5, help="Products in the batch call")
+    parser.add_argument("--encoding", default="cl100k_base", help="tiktoken encoding")
+    args = parser.parse_args()
+    run(args.product, args.category, args.store, args.month, args.batch_size, args.encoding)
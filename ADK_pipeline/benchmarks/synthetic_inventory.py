@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+
+CATEGORIES = ["Clothing", "Electronics", "Furniture", "Groceries", "Toys"]
+REGIONS = ["East", "North", "South", "West"]
+WEATHER = ["Cloudy", "Rainy", "Snowy", "Sunny"]
+SEASONS = ["Autumn", "Spring", "Summer", "Winter"]
+
+
+def make_inventory_frame(n_days: int = 730, n_stores: int = 5, products_per_category: int = 20,
+                         start_date: str = "2022-01-01", seed: int = 42) -> pd.DataFrame:
+    """
+    Builds a synthetic daily inventory sheet with the same columns as
+    data/op_prod_name_ref_data.xlsx (one row per date × store × product).
+    """
+    rng = np.random.default_rng(seed)
+
+    product_ids = [f"{cat[0]}{i:04d}" for cat in CATEGORIES for i in range(1, products_per_category + 1)]
+    product_cats = [cat for cat in CATEGORIES for _ in range(products_per_category)]
+    store_ids = [f"S{i:03d}" for i in range(1, n_stores + 1)]
+    dates = pd.date_range(start_date, periods=n_days, freq="D")
+
+    grid = pd.MultiIndex.from_product(
+        [dates, store_ids, range(len(product_ids))], names=["Date", "Store ID", "product_idx"]
+    ).to_frame(index=False)
+    n = len(grid)
+    product_idx = grid["product_idx"].to_numpy()
+
+    df = pd.DataFrame({
+        "Date": grid["Date"],
+        "Store ID": grid["Store ID"],
+        "Product ID": np.array(product_ids)[product_idx],
+        "Category": np.array(product_cats)[product_idx],
+        "Region": rng.choice(REGIONS, n),
+        "Inventory Level": rng.integers(50, 500, n),
+        "Units Sold": rng.integers(0, 200, n),
+        "Units Ordered": rng.integers(0, 200, n),
+        "Demand Forecast": rng.uniform(0, 200, n).round(2),
+        "Price": rng.uniform(5, 100, n).round(2),
+        "Discount": rng.choice([0, 5, 10, 15, 20], n),
+        "Weather Condition": rng.choice(WEATHER, n),
+        "Holiday/Promotion": rng.integers(0, 2, n),
+        "Competitor Pricing": rng.uniform(5, 100, n).round(2),
+        "Seasonality": rng.choice(SEASONS, n),
+    })
+    df["Product Name"] = df["Product ID"].map(lambda pid: f"Synthetic Item {pid}")
+    return df
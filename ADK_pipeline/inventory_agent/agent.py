@@ -8,9 +8,14 @@ from google.adk.tools import FunctionTool
 from google.adk.tools.agent_tool import AgentTool
 
 from google.genai import types
+from inventory_agent.router import make_fast_path_router
 from prompts.prompts import *
-from RAG.rag_utility import query_promotional_offers
+from tools.compact_payloads import compact_legend_prompt
+from RAG.async_rag_utility import query_promotional_offers
+from tools import async_db_tools
 from tools.db_tools import *
+from tools.forecasting import normalise_forecast_arguments
+from tools.tool_cache import cached_tool
 from sqlalchemy import create_engine, text
 from collections import Counter
 from datetime import datetime
@@ -19,13 +24,30 @@ from datetime import datetime
 load_dotenv()
 
 
-get_product_context_tool = FunctionTool(get_product_context_with_month)
+# Tools are async (tools/async_db_tools.py, RAG/async_rag_utility.py) so parallel function calls overlap.
+# Context tools are served through a TTL + LRU cache keyed on normalised arguments
+get_product_context_tool = FunctionTool(
+    cached_tool(async_db_tools.get_product_context_with_month, normalise_tool_arguments)
+)
+
+get_category_context_tool = FunctionTool(
+    cached_tool(async_db_tools.get_category_context_with_month, normalise_tool_arguments)
+)
+
+get_overall_summary_tool = FunctionTool(
+    cached_tool(async_db_tools.get_overall_category_summary, normalise_tool_arguments)
+)
 
-get_category_context_tool = FunctionTool(get_category_context_with_month)
+get_products_batch_tool = FunctionTool(
+    cached_tool(async_db_tools.get_products_context_batch, normalise_tool_arguments)
+)
 
-get_overall_summary_tool = FunctionTool(get_overall_category_summary)
+# Baseline forecast computed by tools/forecasting.py (empty month means "next month", so it keeps its own key)
+forecast_demand_tool = FunctionTool(
+    cached_tool(async_db_tools.forecast_demand, normalise_forecast_arguments)
+)
 
-query_inventory_tool = FunctionTool(query_inventory)
+query_inventory_tool = FunctionTool(async_db_tools.query_inventory)
 
 rag_offer_tool = FunctionTool(query_promotional_offers)
 
@@ -59,11 +81,14 @@ offers_agent = Agent(
 demand_predictor_agent = Agent(
     model="gemini-2.0-flash-001",
     name="demand_predictor_agent",
-    instruction=demand_predictor_prompt,
+    # TOOL_RESPONSE_FORMAT=compact → the short-key legend is sent once here instead of in every payload
+    instruction=demand_predictor_prompt + compact_legend_prompt(),
     description="Predicts demand using inventory context, categories, and RAG offers. Must be used only when demand of inventory, products etc is asked",
     tools=[
+        forecast_demand_tool,
         query_inventory_tool,
         get_product_context_tool,
+        get_products_batch_tool,
         get_category_context_tool,
         get_overall_summary_tool,
         rag_offer_tool
@@ -88,7 +113,13 @@ root_agent = Agent(
         closing_tool,
         offers_agent_tool,
         demand_predictor_tool
-    ]
+    ],
+    # Greetings / closings answered from templates, clear offer / demand asks dispatched
+    # without the routing LLM call (inventory_agent/router.py); the rest goes to Gemini
+    before_model_callback=make_fast_path_router({
+        "offers": offers_agent.name,
+        "demand": demand_predictor_agent.name
+    })
 )
 
 APP_NAME = "inventory_conversation_system"
@@ -0,0 +1,217 @@
+import os
+import re
+from collections import Counter
+
+import numpy as np
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+
+# ----------------------------------------------------------------
+# Deterministic fast path in front of root_conversation_agent (before_model_callback).
+# - greeting / closing            → templated reply, no LLM call at all
+# - clear offers / demand message → function call to that sub-agent emitted directly,
+#                                   and its answer returned as-is (no routing / relay LLM call)
+# - anything else                 → None → the Gemini router decides as before
+# ROUTER_MODE=off disables it. ROUTER_EMBEDDINGS=on adds an embedding-similarity fallback
+# (only when the RAG embedding model is already loaded, so routing never waits for it).
+# ----------------------------------------------------------------
+GREETING_REPLY = (
+    "Hello! 👋 I can help with product and category demand predictions, inventory insights "
+    "and current promotional offers. What would you like to know?"
+)
+CLOSING_REPLY = "You're welcome! Glad I could help. Have a great day! 👋"
+
+_GREETING = re.compile(
+    r"^(hi+|hello+|hey+|hiya|howdy|greetings|yo|good\s+(morning|afternoon|evening|day)|"
+    r"how\s+are\s+you(\s+doing)?|how's\s+it\s+going|what's\s+up)"
+    r"(\s+(there|team|all|everyone|agent|bot))?[\s!.,?]*$"
+)
+_CLOSING = re.compile(
+    r"^((ok(ay)?|great|cool|perfect|awesome)[\s,!.]+)?"
+    r"(bye+|goodbye|good\s*bye|see\s+(you|ya)(\s+later)?|thanks?(\s+you)?(\s+(so\s+much|a\s+lot))?|thank\s+you"
+    r"(\s+(so\s+much|very\s+much))?|thx|cheers|that's\s+all|that\s+is\s+all|that's\s+it|end|done|no\s+more\s+questions)"
+    r"([\s,!.]+(bye|goodbye|for\s+(now|the\s+help|your\s+help)))?[\s!.,]*$"
+)
+_LEADING_GREETING = re.compile(r"^(hi+|hello+|hey+|good\s+(morning|afternoon|evening))[\s,!.]+")
+
+_DEMAND = re.compile(
+    r"\b(demand|forecast\w*|predict\w*|inventory|stock|units?\s+(sold|ordered)|"
+    r"category\s+(summary|insights?|context)|trend\w*|yoy|year[-\s]over[-\s]year|"
+    r"reorder|restock)\b"
+)
+# Words used in both kinds of question ("holiday sales", "sales summary"): never route on their own
+_DEMAND_WEAK = re.compile(r"\b(sales|sold|summary)\b")
+# Product / store IDs such as T0002, P0015, S001
+_ENTITY_ID = re.compile(r"\b[A-Z]\d{3,5}\b")
+_OFFERS = re.compile(r"\b(offers?|promotions?|promos?|discounts?|deals?|sales?|coupons?|campaigns?)\b")
+
+# Keyword confidences; a route is dispatched only at or above ROUTER_MIN_CONFIDENCE (default 0.8)
+DEFAULT_MIN_CONFIDENCE = 0.8
+_STRONG_CONFIDENCE = 0.9
+_ENTITY_CONFIDENCE = 0.85
+_WEAK_CONFIDENCE = 0.5
+# Offer and demand signals in one message → the Gemini router decides
+_AMBIGUOUS_CONFIDENCE = 0.3
+
+# Prototype utterances for the optional embedding fallback
+ROUTE_EXAMPLES = {
+    "offers": [
+        "what promotions are running for christmas",
+        "any deals on electronics this month",
+        "show me the holiday offers",
+    ],
+    "demand": [
+        "how many units will we sell next month",
+        "predict demand for this product in january",
+        "give me the category summary for toys",
+    ],
+}
+
+ROUTER_STATS = Counter()
+_DISPATCH_STATE_KEY = "fast_path_dispatch"
+
+
+def classify_message(message: str):
+    """
+    (route, confidence) with route in greeting / closing / offers / demand, or None when no
+    keyword matched or offer and demand signals both did. Callers dispatch offers / demand
+    only at or above ROUTER_MIN_CONFIDENCE.
+    """
+    text = " ".join(message.split())
+    lowered = text.lower()
+    if not lowered:
+        return None, 0.0
+    if _GREETING.match(lowered):
+        return "greeting", 1.0
+    if _CLOSING.match(lowered):
+        return "closing", 1.0
+
+    # "Hi, what's the demand for T0002?" → route the question, not the greeting
+    body = _LEADING_GREETING.sub("", lowered)
+    offers = _OFFERS.search(body)
+    demand = max(
+        _STRONG_CONFIDENCE if _DEMAND.search(body) else 0.0,
+        _ENTITY_CONFIDENCE if _ENTITY_ID.search(text) else 0.0,
+        _WEAK_CONFIDENCE if _DEMAND_WEAK.search(body) else 0.0,
+    )
+    if offers and demand:
+        # "offers for T0002", "promotions that boosted sales" → let the Gemini router read it
+        return None, _AMBIGUOUS_CONFIDENCE
+    if demand:
+        return "demand", demand
+    if offers:
+        return "offers", _STRONG_CONFIDENCE
+    return None, 0.0
+
+
+class _EmbeddingRouter:
+    """Nearest route centroid over ROUTE_EXAMPLES, using the RAG embedding model."""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._centroids = None
+
+    def classify(self, message: str):
+        from RAG.resources import registry
+
+        if not registry.is_ready("embed_model"):
+            return None, 0.0
+        from RAG.rag_utility import embed_query
+
+        if self._centroids is None:
+            self._centroids = {
+                route: _unit(np.mean([_unit(embed_query(example)) for example in examples], axis=0))
+                for route, examples in ROUTE_EXAMPLES.items()
+            }
+        query = _unit(embed_query(message))
+        route, score = max(((r, float(c @ query)) for r, c in self._centroids.items()), key=lambda item: item[1])
+        return (route, score) if score >= self.threshold else (None, score)
+
+
+def _unit(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / (np.linalg.norm(vector) or 1.0)
+
+
+def _text_response(text: str) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+def _last_user_text(llm_request) -> str:
+    """Text of the newest user message, or "" when the newest content is a tool result."""
+    if not llm_request.contents:
+        return ""
+    last = llm_request.contents[-1]
+    if last.role != "user" or any(part.function_response for part in last.parts or []):
+        return ""
+    return " ".join(part.text for part in last.parts or [] if part.text).strip()
+
+
+def _dispatched_result(llm_request, agent_name: str):
+    """The sub-agent's answer when the newest content is its function response."""
+    if not llm_request.contents:
+        return None
+    for part in llm_request.contents[-1].parts or []:
+        response = part.function_response
+        if response and response.name == agent_name:
+            result = response.response or {}
+            return str(result.get("result", result)) if isinstance(result, dict) else str(result)
+    return None
+
+
+def make_fast_path_router(dispatch: dict):
+    """
+    before_model_callback for the root agent.
+    dispatch maps route → sub-agent tool name, e.g. {"offers": "offers_agent", "demand": "demand_predictor_agent"}.
+    """
+    mode = os.environ.get("ROUTER_MODE", "").strip().lower() or "fast"
+    min_confidence = float(os.environ.get("ROUTER_MIN_CONFIDENCE", "") or DEFAULT_MIN_CONFIDENCE)
+    embedding_router = None
+    if os.environ.get("ROUTER_EMBEDDINGS", "").strip().lower() in ("1", "on", "true"):
+        embedding_router = _EmbeddingRouter(float(os.environ.get("ROUTER_EMBED_THRESHOLD", "0.6")))
+
+    def fast_path_router(callback_context, llm_request):
+        if mode == "off":
+            return None
+
+        # 1️⃣ Second model call of a fast-routed turn → hand back the sub-agent's answer verbatim
+        dispatched = callback_context.state.get(_DISPATCH_STATE_KEY, "")
+        if dispatched:
+            result = _dispatched_result(llm_request, dispatched)
+            callback_context.state[_DISPATCH_STATE_KEY] = ""
+            if result is not None:
+                return _text_response(result)
+
+        # 2️⃣ New user message → classify
+        message = _last_user_text(llm_request)
+        if not message:
+            return None
+        route, confidence = classify_message(message)
+        if route in dispatch and confidence < min_confidence:
+            route = None
+        if route is None and embedding_router is not None:
+            try:
+                route, confidence = embedding_router.classify(message)
+            except Exception as e:
+                print(f"❌ Embedding router failed: {e}")
+                route = None
+
+        if route == "greeting":
+            ROUTER_STATS[route] += 1
+            return _text_response(GREETING_REPLY)
+        if route == "closing":
+            ROUTER_STATS[route] += 1
+            return _text_response(CLOSING_REPLY)
+        if route in dispatch:
+            ROUTER_STATS[route] += 1
+            callback_context.state[_DISPATCH_STATE_KEY] = dispatch[route]
+            return LlmResponse(content=types.Content(role="model", parts=[
+                types.Part(function_call=types.FunctionCall(name=dispatch[route], args={"request": message}))
+            ]))
+
+        # 3️⃣ Low confidence → Gemini router
+        ROUTER_STATS["llm"] += 1
+        return None
+
+    return fast_path_router
@@ -1,12 +1,21 @@
 from google.adk.runners import WebRunner
 from inventory_agent.agent import root_agent
 from google.adk.sessions import InMemorySessionService
+from RAG.resources import warm_up_rag
+from tools.db_tools import warm_up_backend
+from tools.forecasting import get_demand_forecaster
 
 APP_NAME = "inventory_conversation_system"
 USER_ID = "dp01"
 SESSION_ID = "001"
 
 if __name__ == "__main__":
+    # Load the DB pool / resident snapshot before accepting traffic
+    warm_up_backend()
+    # Fit the baseline forecasting models for the current data version
+    get_demand_forecaster()
+    # Embedding model / LLM / offers index load in the background (RAG_WARMUP)
+    warm_up_rag()
     session_service = InMemorySessionService()
     runner = WebRunner(agent=root_agent, app_name=APP_NAME, session_service=session_service)
     runner.run(host="0.0.0.0", port=8080)
@@ -0,0 +1,389 @@
+# Streaming, typed ingest of the inventory sheet into the DB. Run from ADK_pipeline/:
+#   python -m rds_sim.ingest data/op_prod_name_ref_data.xlsx [--sheet NAME] [--batch-size 50000] [--db-url URL]
+#                            [--mode replace|upsert]
+# Sources: .xlsx (openpyxl read-only), .csv, .parquet — read batch by batch, so memory
+# stays flat however large the file is. Rows are coerced to INVENTORY_SCHEMA and written
+# with executemany (COPY on Postgres) into a staging table, which replaces `inventory`
+# in one final transaction together with the indexes and rollups.
+# --mode upsert merges a daily file into the live table instead (see upsert_inventory).
+import argparse
+import csv
+import io
+import os
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+from rds_sim.rollups import refresh_rollups
+from tools.db_engine import create_db_engine, get_db_url
+
+
+# ----------------------------------------------------------------
+# Typed schema: column → (kind, SQL type)
+# kinds: date (ISO text + year / month), category / text (stripped strings), int, float
+# ----------------------------------------------------------------
+INVENTORY_SCHEMA = {
+    "Date": ("date", "TEXT NOT NULL"),
+    "Store ID": ("category", "TEXT NOT NULL"),
+    "Product ID": ("category", "TEXT NOT NULL"),
+    "Category": ("category", "TEXT"),
+    "Region": ("category", "TEXT"),
+    "Inventory Level": ("int", "BIGINT"),
+    "Units Sold": ("int", "BIGINT"),
+    "Units Ordered": ("int", "BIGINT"),
+    "Demand Forecast": ("float", "DOUBLE PRECISION"),
+    "Price": ("float", "DOUBLE PRECISION"),
+    "Discount": ("int", "BIGINT"),
+    "Weather Condition": ("category", "TEXT"),
+    "Holiday/Promotion": ("int", "BIGINT"),
+    "Competitor Pricing": ("float", "DOUBLE PRECISION"),
+    "Seasonality": ("category", "TEXT"),
+    "Product Name": ("text", "TEXT"),
+    "year": ("int", "INTEGER NOT NULL"),
+    "month": ("int", "INTEGER NOT NULL"),
+}
+REQUIRED_COLUMNS = ["Date", "Store ID", "Product ID"]
+DERIVED_COLUMNS = ["year", "month"]
+SOURCE_FORMATS = ("xlsx", "csv", "parquet")
+DEFAULT_BATCH_SIZE = 50_000
+STAGING_TABLE = "inventory_staging"
+UPSERT_TABLE = "inventory_upsert"
+# One row per day × store × product → conflict target of the upsert mode
+ROW_KEY_COLUMNS = ["Date", "Store ID", "Product ID"]
+ROW_KEY_INDEX = "idx_inventory_row_key"
+
+
+def inventory_table_ddl(table: str = "inventory", temporary: bool = False) -> str:
+    columns = ",\n        ".join(f'"{name}" {sql_type}' for name, (_, sql_type) in INVENTORY_SCHEMA.items())
+    return f'CREATE {"TEMPORARY " if temporary else ""}TABLE "{table}" (\n        {columns}\n    )'
+
+
+# ----------------------------------------------------------------
+# Sources → DataFrame batches (raw values, header names as in the file)
+# ----------------------------------------------------------------
+def _xlsx_batches(path: str, batch_size: int, sheet: str = ""):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = [str(value).strip() if value is not None else "" for value in next(rows, ())]
+        batch = []
+        for row in rows:
+            if any(value is not None for value in row):
+                batch.append(row[:len(header)])
+            if len(batch) >= batch_size:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        # Read-only workbooks keep the file handle open until closed
+        workbook.close()
+
+
+def _csv_batches(path: str, batch_size: int, sheet: str = ""):
+    # Everything as text; coerce_batch applies the schema
+    yield from pd.read_csv(path, chunksize=batch_size, dtype=str, skipinitialspace=True)
+
+
+def _parquet_batches(path: str, batch_size: int, sheet: str = ""):
+    import pyarrow.parquet as pq
+
+    for record_batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+        yield record_batch.to_pandas()
+
+
+_READERS = {"xlsx": _xlsx_batches, "csv": _csv_batches, "parquet": _parquet_batches}
+
+
+def source_format(path: str, declared: str = "") -> str:
+    fmt = declared or os.path.splitext(path)[1].lower().lstrip(".")
+    fmt = {"xlsm": "xlsx", "pq": "parquet"}.get(fmt, fmt)
+    if fmt not in SOURCE_FORMATS:
+        raise ValueError(f"Unsupported source '{path}' (use {', '.join(SOURCE_FORMATS)})")
+    return fmt
+
+
+def read_source_batches(path: str, batch_size: int = DEFAULT_BATCH_SIZE, fmt: str = "", sheet: str = ""):
+    """Yields raw DataFrame batches of at most batch_size rows from an xlsx / csv / parquet file."""
+    yield from _READERS[source_format(path, fmt)](path, batch_size, sheet)
+
+
+# ----------------------------------------------------------------
+# Coercion to INVENTORY_SCHEMA
+# ----------------------------------------------------------------
+def coerce_batch(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the batch in INVENTORY_SCHEMA column order and types:
+    - Date parsed and stored as ISO 'YYYY-MM-DD', with integer year / month (unparseable dates dropped)
+    - categoricals / text stripped ('' → NULL), numerics coerced (non-numeric → NULL)
+    - source columns outside the schema are ignored, missing optional ones are NULL
+    """
+    raw = raw.rename(columns=lambda name: str(name).strip())
+    missing = [name for name in REQUIRED_COLUMNS if name not in raw.columns]
+    if missing:
+        raise ValueError(f"Source is missing required columns: {', '.join(missing)}")
+
+    dates = pd.to_datetime(raw["Date"], errors="coerce")
+    keep = dates.notna().to_numpy()
+    raw, dates = raw.loc[keep], dates[keep]
+
+    out = {}
+    for name, (kind, _) in INVENTORY_SCHEMA.items():
+        if name in DERIVED_COLUMNS:
+            continue
+        if name not in raw.columns:
+            out[name] = pd.Series(None, index=raw.index, dtype=object)
+        elif kind == "date":
+            out[name] = dates.dt.strftime("%Y-%m-%d")
+        elif kind in ("category", "text"):
+            values = raw[name].astype("string").str.strip()
+            out[name] = values.mask(values == "")
+            if kind == "category":
+                # Few distinct values per batch → dictionary-encoded while in memory
+                out[name] = out[name].astype("category")
+        elif kind == "int":
+            out[name] = pd.to_numeric(raw[name], errors="coerce").round().astype("Int64")
+        else:
+            out[name] = pd.to_numeric(raw[name], errors="coerce").astype("float64")
+    out["year"] = dates.dt.year.astype("int32")
+    out["month"] = dates.dt.month.astype("int32")
+
+    frame = pd.DataFrame(out, columns=list(INVENTORY_SCHEMA))
+    key_missing = frame[REQUIRED_COLUMNS].isna().any(axis=1)
+    return frame.loc[~key_missing.to_numpy()]
+
+
+def batch_records(frame: pd.DataFrame) -> list:
+    """Rows as tuples of native Python values, NULL-safe for every driver."""
+    return list(frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None))
+
+
+# ----------------------------------------------------------------
+# Writers
+# ----------------------------------------------------------------
+def _placeholders(conn, count: int) -> str:
+    style = conn.dialect.paramstyle
+    if style == "qmark":
+        return ", ".join("?" * count)
+    if style == "numeric":
+        return ", ".join(f":{i + 1}" for i in range(count))
+    return ", ".join(["%s"] * count)
+
+
+def insert_batch(conn, table: str, frame: pd.DataFrame):
+    """executemany INSERT of the batch (raw DBAPI parameters, no per-row SQLAlchemy overhead)."""
+    columns = ", ".join(f'"{name}"' for name in frame.columns)
+    sql = f'INSERT INTO "{table}" ({columns}) VALUES ({_placeholders(conn, len(frame.columns))})'
+    records = batch_records(frame)
+    if records:
+        conn.exec_driver_sql(sql, records)
+
+
+def copy_batch(conn, table: str, frame: pd.DataFrame):
+    """COPY … FROM STDIN (CSV) for Postgres; supports psycopg2 and psycopg 3."""
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False, na_rep="\\N", quoting=csv.QUOTE_MINIMAL)
+    columns = ", ".join(f'"{name}"' for name in frame.columns)
+    copy_sql = f'COPY "{table}" ({columns}) FROM STDIN WITH (FORMAT csv, NULL \'\\N\')'
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        buffer.seek(0)
+        if hasattr(cursor, "copy_expert"):
+            cursor.copy_expert(copy_sql, buffer)
+        else:
+            with cursor.copy(copy_sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def write_batch(conn, table: str, frame: pd.DataFrame):
+    if conn.dialect.name == "postgresql":
+        copy_batch(conn, table, frame)
+    else:
+        insert_batch(conn, table, frame)
+
+
+def _progress(label: str, rows: int, started: float, end: str = "\r"):
+    elapsed = time.perf_counter() - started
+    print(f"   {label} {rows:,} rows ({rows / max(elapsed, 1e-9):,.0f} rows/s)", end=end)
+
+
+# ----------------------------------------------------------------
+# Full load: staging table → swapped in with indexes and rollups
+# ----------------------------------------------------------------
+def ingest_inventory(source: str, db_url: str = "", batch_size: int = DEFAULT_BATCH_SIZE,
+                     fmt: str = "", sheet: str = "") -> dict:
+    """
+    Replaces `inventory` with the rows of source, streamed batch by batch.
+    Each batch is committed to a staging table in its own transaction; the swap,
+    indexes and full rollup refresh happen in one final transaction, so readers
+    keep seeing the previous table until the new one is complete.
+    """
+    from rds_sim.local_db import create_inventory_indexes
+
+    started = time.perf_counter()
+    engine = create_db_engine(db_url or get_db_url(), read_only=False)
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP TABLE IF EXISTS "{STAGING_TABLE}"'))
+        conn.execute(text(inventory_table_ddl(STAGING_TABLE)))
+
+    # 1️⃣ Stream → coerce → batched writes
+    rows_read = rows_written = 0
+    for raw in read_source_batches(source, batch_size, fmt, sheet):
+        batch = coerce_batch(raw)
+        rows_read += len(raw)
+        with engine.begin() as conn:
+            write_batch(conn, STAGING_TABLE, batch)
+        rows_written += len(batch)
+        _progress("loaded", rows_written, started)
+    print()
+    load_seconds = time.perf_counter() - started
+
+    # 2️⃣ Swap in + indexes + rollups (bumps the data version)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS inventory"))
+        conn.execute(text(f'ALTER TABLE "{STAGING_TABLE}" RENAME TO inventory'))
+        create_inventory_indexes(conn)
+        refresh_rollups(conn)
+    engine.dispose()
+
+    total_seconds = time.perf_counter() - started
+    stats = {
+        "rows_read": rows_read,
+        "rows_written": rows_written,
+        "rows_dropped": rows_read - rows_written,
+        "load_seconds": round(load_seconds, 3),
+        "rows_per_s": round(rows_written / max(load_seconds, 1e-9)),
+        "total_seconds": round(total_seconds, 3),
+    }
+    print(f"✅ Inventory ingested from {source} → {stats}")
+    return stats
+
+
+# ----------------------------------------------------------------
+# Incremental load: upsert on (Date, Store ID, Product ID)
+# ----------------------------------------------------------------
+def _quoted(columns) -> str:
+    return ", ".join(f'"{name}"' for name in columns)
+
+
+def _changed_condition(conn, left: str, right: str) -> str:
+    """SQL true when any non-key column differs between two row aliases (NULL-safe)."""
+    distinct = "IS NOT" if conn.dialect.name == "sqlite" else "IS DISTINCT FROM"
+    return " OR ".join(
+        f'{left}."{name}" {distinct} {right}."{name}"' for name in INVENTORY_SCHEMA if name not in ROW_KEY_COLUMNS
+    )
+
+
+def _ensure_inventory_table(conn):
+    """Creates `inventory` (typed, indexed) on a fresh DB and the unique row-key index the upsert targets."""
+    from rds_sim.local_db import create_inventory_indexes
+
+    if not conn.dialect.has_table(conn, "inventory"):
+        conn.execute(text(inventory_table_ddl("inventory")))
+        create_inventory_indexes(conn)
+    try:
+        conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {ROW_KEY_INDEX} ON inventory ({_quoted(ROW_KEY_COLUMNS)})"))
+    except Exception as e:
+        raise ValueError(f"inventory has duplicate (Date, Store ID, Product ID) rows; run a full ingest first ({e})")
+
+
+def _upsert_staged(conn) -> list:
+    """
+    Applies the staged batch: new keys are inserted, existing keys updated only when a value changed.
+    Returns [(year, month, changed_rows, inserted_rows)] for the months that actually changed.
+    """
+    key_join = " AND ".join(f'i."{name}" = s."{name}"' for name in ROW_KEY_COLUMNS)
+    changed = conn.execute(text(f"""
+        SELECT s.year, s.month, COUNT(*), SUM(CASE WHEN i."Date" IS NULL THEN 1 ELSE 0 END)
+        FROM "{UPSERT_TABLE}" s
+        LEFT JOIN inventory i ON {key_join}
+        WHERE i."Date" IS NULL OR {_changed_condition(conn, "i", "s")}
+        GROUP BY s.year, s.month
+    """)).all()
+    if not changed:
+        return []
+
+    columns = list(INVENTORY_SCHEMA)
+    updates = ", ".join(f'"{name}" = excluded."{name}"' for name in columns if name not in ROW_KEY_COLUMNS)
+    # WHERE true: lets SQLite parse ON CONFLICT after INSERT … SELECT
+    conn.execute(text(f"""
+        INSERT INTO inventory ({_quoted(columns)})
+        SELECT {_quoted(columns)} FROM "{UPSERT_TABLE}" WHERE true
+        ON CONFLICT ({_quoted(ROW_KEY_COLUMNS)}) DO UPDATE SET {updates}
+        WHERE {_changed_condition(conn, "inventory", "excluded")}
+    """))
+    return [(int(year), int(month), int(rows), int(inserted or 0)) for year, month, rows, inserted in changed]
+
+
+def upsert_inventory(source: str, db_url: str = "", batch_size: int = DEFAULT_BATCH_SIZE,
+                     fmt: str = "", sheet: str = "") -> dict:
+    """
+    Merges the rows of source into `inventory` keyed on (Date, Store ID, Product ID):
+    unchanged rows are skipped, new / changed rows upserted, and only the months that
+    changed get their rollups refreshed (which bumps the data version).
+    Everything runs in one transaction, so readers keep the previous snapshot until
+    the commit and never see rows without their rollups.
+    """
+    started = time.perf_counter()
+    engine = create_db_engine(db_url or get_db_url(), read_only=False)
+    rows_read = rows_staged = inserted = updated = 0
+    periods = set()
+    with engine.begin() as conn:
+        _ensure_inventory_table(conn)
+        conn.execute(text(f'DROP TABLE IF EXISTS "{UPSERT_TABLE}"'))
+        conn.execute(text(inventory_table_ddl(UPSERT_TABLE, temporary=True)))
+
+        # 1️⃣ Stream → coerce → stage each batch → upsert what changed
+        for raw in read_source_batches(source, batch_size, fmt, sheet):
+            # Last occurrence of a key in the batch wins
+            batch = coerce_batch(raw).drop_duplicates(ROW_KEY_COLUMNS, keep="last")
+            rows_read += len(raw)
+            conn.execute(text(f'DELETE FROM "{UPSERT_TABLE}"'))
+            write_batch(conn, UPSERT_TABLE, batch)
+            for year, month, changed_rows, inserted_rows in _upsert_staged(conn):
+                periods.add((year, month))
+                inserted += inserted_rows
+                updated += changed_rows - inserted_rows
+            rows_staged += len(batch)
+            _progress("merged", rows_staged, started)
+        print()
+        conn.execute(text(f'DROP TABLE IF EXISTS "{UPSERT_TABLE}"'))
+        merge_seconds = time.perf_counter() - started
+
+        # 2️⃣ Rollups for the changed months only (+ data version bump); nothing changed → nothing to refresh
+        if periods:
+            refresh_rollups(conn, sorted(periods))
+    engine.dispose()
+
+    stats = {
+        "rows_read": rows_read,
+        "rows_inserted": inserted,
+        "rows_updated": updated,
+        "rows_unchanged": rows_staged - inserted - updated,
+        "months_refreshed": [f"{year}-{month:02d}" for year, month in sorted(periods)],
+        "merge_seconds": round(merge_seconds, 3),
+        "rows_per_s": round(rows_staged / max(merge_seconds, 1e-9)),
+        "total_seconds": round(time.perf_counter() - started, 3),
+    }
+    print(f"✅ Inventory upserted from {source} → {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream an inventory sheet (xlsx / csv / parquet) into the DB.")
+    parser.add_argument("source", help="Path to the .xlsx / .csv / .parquet file")
+    parser.add_argument("--format", choices=SOURCE_FORMATS, default="", help="Override the format from the extension")
+    parser.add_argument("--sheet", default="", help="Worksheet name (xlsx; default: first sheet)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per batch / transaction")
+    parser.add_argument("--db-url", default="", help="Database URL (defaults to INVENTORY_DB_URL / local SQLite)")
+    parser.add_argument("--mode", choices=["replace", "upsert"], default="replace",
+                        help="replace: rebuild the table; upsert: merge new / changed rows on (Date, Store ID, Product ID)")
+    args = parser.parse_args()
+    load = upsert_inventory if args.mode == "upsert" else ingest_inventory
+    load(args.source, args.db_url, args.batch_size, args.format, args.sheet)
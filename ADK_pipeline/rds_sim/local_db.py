@@ -1,22 +1,58 @@
+# Build the local SQLite DB (simulated RDS). Run from ADK_pipeline/:
+#   python -m rds_sim.local_db
 import pandas as pd
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import text
 
+from rds_sim.ingest import ingest_inventory
 
-# Ensure directory exists
-db_dir = "data/db_files"
-os.makedirs(db_dir, exist_ok=True)   # creates folder if not already there
 
-# Define database path & engine
-db_path = os.path.join(db_dir, "inventory.db")
-engine = create_engine(f"sqlite:///{db_path}", echo=False)
+# ----------------------------------------------------------------
+# Composite indexes used by the tools in tools/db_tools.py
+# ----------------------------------------------------------------
+INVENTORY_INDEXES = {
+    "idx_inventory_product_period": ['"Product ID"', "year", "month", '"Store ID"'],
+    "idx_inventory_category_period": ["Category", "year", "month", '"Store ID"'],
+    "idx_inventory_period": ["year", "month"],
+}
 
-# Load Excel and write to DB
-df = pd.read_excel("data/op_prod_name_ref_data.xlsx")
 
+def prepare_inventory_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalises the raw sheet before it is written to the DB:
+    - Date is stored as an ISO 'YYYY-MM-DD' string (rows with unparseable dates are dropped)
+    - integer year / month columns are added so lookups never re-parse Date
+    """
+    df = df.copy()
+    dates = pd.to_datetime(df["Date"], errors="coerce")
+    df = df[dates.notna()]
+    dates = dates[dates.notna()]
 
-# Create a local SQLite DB file:
-df.to_sql("inventory", engine, index=False, if_exists="replace")
+    df["Date"] = dates.dt.strftime("%Y-%m-%d")
+    df["year"] = dates.dt.year.astype("int32")
+    df["month"] = dates.dt.month.astype("int32")
+    return df
 
-print(f"Local DB created successfully at → {db_path}")
 
+def create_inventory_indexes(conn):
+    """Creates the lookup indexes and refreshes planner statistics."""
+    for index_name, columns in INVENTORY_INDEXES.items():
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON inventory ({', '.join(columns)})"))
+    conn.execute(text("ANALYZE"))
+
+
+def build_local_db(excel_path: str = "data/op_prod_name_ref_data.xlsx", db_dir: str = "data/db_files"):
+    """Loads the Excel sheet into a local SQLite DB (simulated RDS) with typed date columns, indexes and rollups."""
+    # Ensure directory exists
+    os.makedirs(db_dir, exist_ok=True)   # creates folder if not already there
+
+    # Stream the sheet in batches with the typed schema (rds_sim/ingest.py); indexes and rollups are
+    # built when the loaded table is swapped in
+    db_path = os.path.join(db_dir, "inventory.db")
+    ingest_inventory(excel_path, f"sqlite:///{db_path}")
+    print(f"Local DB created successfully at → {db_path}")
+    return db_path
+
+
+if __name__ == "__main__":
+    build_local_db()
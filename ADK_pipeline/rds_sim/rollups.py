@@ -0,0 +1,301 @@
+# Monthly rollup tables materialised from `inventory`. Run from ADK_pipeline/:
+#   python -m rds_sim.rollups                     → full rebuild (also upgrades a DB built before the rollups)
+#   python -m rds_sim.rollups --months 2024-01    → refresh only the listed months
+import argparse
+
+from sqlalchemy import inspect, text
+
+from tools.data_version import bump_data_version
+from tools.db_engine import create_db_engine, get_db_url, row_order_column
+
+
+# Attributes whose per-month value histograms are kept so modes / distinct lists can be derived
+HISTOGRAM_ATTRIBUTES = ["Weather Condition", "Seasonality", "Region"]
+
+# Means are stored as (sum, non-null count) pairs so any grain can be re-aggregated exactly
+_METRIC_COLUMNS_DDL = """
+    row_count INTEGER NOT NULL,
+    units_sold_sum NUMERIC,
+    units_ordered_sum NUMERIC,
+    inventory_sum NUMERIC,
+    price_sum DOUBLE PRECISION,
+    price_count INTEGER,
+    discount_sum DOUBLE PRECISION,
+    discount_count INTEGER,
+    comp_price_sum DOUBLE PRECISION,
+    comp_price_count INTEGER
+"""
+
+_METRIC_COLUMNS_SELECT = """
+    COUNT(*),
+    SUM("Units Sold"),
+    SUM("Units Ordered"),
+    SUM("Inventory Level"),
+    SUM(Price * 1.0),
+    COUNT(Price),
+    SUM(Discount * 1.0),
+    COUNT(Discount),
+    SUM("Competitor Pricing" * 1.0),
+    COUNT("Competitor Pricing")
+"""
+
+_METRIC_COLUMN_NAMES = """
+    row_count, units_sold_sum, units_ordered_sum, inventory_sum,
+    price_sum, price_count, discount_sum, discount_count, comp_price_sum, comp_price_count
+"""
+
+ROLLUP_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS monthly_product_store (
+        "Product ID" TEXT NOT NULL,
+        "Store ID" TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        Category TEXT,
+        "Product Name" TEXT,
+        {_METRIC_COLUMNS_DDL},
+        PRIMARY KEY ("Product ID", year, month, "Store ID")
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS monthly_category_store (
+        Category TEXT NOT NULL,
+        "Store ID" TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        product_count INTEGER NOT NULL,
+        store_count INTEGER NOT NULL,
+        {_METRIC_COLUMNS_DDL},
+        PRIMARY KEY (Category, year, month, "Store ID")
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS monthly_category (
+        Category TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        product_count INTEGER NOT NULL,
+        store_count INTEGER NOT NULL,
+        {_METRIC_COLUMNS_DDL},
+        PRIMARY KEY (Category, year, month)
+    )
+    """,
+    # Value histograms at product × store grain; first_row (table order) and first_seen break mode ties
+    """
+    CREATE TABLE IF NOT EXISTS monthly_value_counts (
+        "Product ID" TEXT NOT NULL,
+        "Store ID" TEXT NOT NULL,
+        Category TEXT,
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        attribute TEXT NOT NULL,
+        value TEXT NOT NULL,
+        cnt INTEGER NOT NULL,
+        first_seen TEXT,
+        first_row BIGINT,
+        PRIMARY KEY ("Product ID", year, month, "Store ID", attribute, value)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_monthly_product_store_period ON monthly_product_store (year, month, \"Store ID\")",
+    "CREATE INDEX IF NOT EXISTS idx_monthly_category_store_period ON monthly_category_store (year, month, \"Store ID\")",
+    "CREATE INDEX IF NOT EXISTS idx_monthly_category_period ON monthly_category (year, month)",
+    "CREATE INDEX IF NOT EXISTS idx_monthly_value_counts_category ON monthly_value_counts (Category, year, month, attribute)",
+]
+
+ROLLUP_TABLES = ["monthly_product_store", "monthly_category_store", "monthly_category", "monthly_value_counts"]
+
+# Columns added after the rollups first shipped → added in place on DBs built before them
+ADDED_COLUMNS = {"monthly_value_counts": {"first_row": "BIGINT"}}
+
+
+# ----------------------------------------------------------------
+# INSERT … SELECT statements (optionally scoped to one month)
+# ----------------------------------------------------------------
+def _rollup_inserts(period_filter: str, dialect_name: str = "sqlite"):
+    """Returns the INSERT statements rebuilding every rollup table for the rows matching period_filter."""
+    row_order = row_order_column(dialect_name)
+    first_row = f"MIN({row_order})" if row_order else "NULL"
+    inserts = [
+        f"""
+        INSERT INTO monthly_product_store
+            ("Product ID", "Store ID", year, month, Category, "Product Name", {_METRIC_COLUMN_NAMES})
+        SELECT "Product ID", "Store ID", year, month, MIN(Category), MIN("Product Name"), {_METRIC_COLUMNS_SELECT}
+        FROM inventory
+        WHERE {period_filter}
+        GROUP BY "Product ID", "Store ID", year, month
+        """,
+        f"""
+        INSERT INTO monthly_category_store
+            (Category, "Store ID", year, month, product_count, store_count, {_METRIC_COLUMN_NAMES})
+        SELECT Category, "Store ID", year, month, COUNT(DISTINCT "Product ID"), COUNT(DISTINCT "Store ID"),
+               {_METRIC_COLUMNS_SELECT}
+        FROM inventory
+        WHERE {period_filter}
+        GROUP BY Category, "Store ID", year, month
+        """,
+        f"""
+        INSERT INTO monthly_category
+            (Category, year, month, product_count, store_count, {_METRIC_COLUMN_NAMES})
+        SELECT Category, year, month, COUNT(DISTINCT "Product ID"), COUNT(DISTINCT "Store ID"),
+               {_METRIC_COLUMNS_SELECT}
+        FROM inventory
+        WHERE {period_filter}
+        GROUP BY Category, year, month
+        """,
+    ]
+    for attribute in HISTOGRAM_ATTRIBUTES:
+        inserts.append(f"""
+        INSERT INTO monthly_value_counts
+            ("Product ID", "Store ID", Category, year, month, attribute, value, cnt, first_seen, first_row)
+        SELECT "Product ID", "Store ID", MIN(Category), year, month, '{attribute}', "{attribute}",
+               COUNT(*), MIN(Date), {first_row}
+        FROM inventory
+        WHERE {period_filter} AND "{attribute}" IS NOT NULL
+        GROUP BY "Product ID", "Store ID", year, month, "{attribute}"
+        """)
+    return inserts
+
+
+def add_period_columns(conn) -> bool:
+    """
+    Adds the integer year / month columns to an `inventory` table loaded before they existed
+    (derived from Date, ISO text or timestamp). Returns True if they had to be added.
+    """
+    existing = {column["name"] for column in inspect(conn).get_columns("inventory")}
+    if {"year", "month"} <= existing:
+        return False
+    for name in ("year", "month"):
+        if name not in existing:
+            conn.execute(text(f"ALTER TABLE inventory ADD COLUMN {name} INTEGER"))
+    conn.execute(text("""
+        UPDATE inventory
+        SET year = CAST(SUBSTR(CAST("Date" AS TEXT), 1, 4) AS INTEGER),
+            month = CAST(SUBSTR(CAST("Date" AS TEXT), 6, 2) AS INTEGER)
+    """))
+    return True
+
+
+def create_rollup_tables(conn):
+    """Creates the rollup tables and their indexes if missing (and adds columns older builds lack)."""
+    for ddl in ROLLUP_DDL:
+        conn.execute(text(ddl))
+    for table, columns in ADDED_COLUMNS.items():
+        existing = {column["name"] for column in inspect(conn).get_columns(table)}
+        for name, sql_type in columns.items():
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}"))
+
+
+def refresh_rollups(conn, periods=None):
+    """
+    Rebuilds rollup rows from `inventory`.
+    - periods=None → full rebuild of every month.
+    - periods=[(year, month), ...] → only those months are deleted and recomputed,
+      so a new day of sales touches a single month instead of the whole table.
+    Run inside a transaction (engine.begin()) so readers never see a half-refreshed month.
+    Bumps the data version in the same transaction.
+    """
+    if periods is None:
+        add_period_columns(conn)
+    create_rollup_tables(conn)
+
+    if periods is None:
+        for table in ROLLUP_TABLES:
+            conn.execute(text(f"DELETE FROM {table}"))
+        for insert_sql in _rollup_inserts("1 = 1", conn.dialect.name):
+            conn.execute(text(insert_sql))
+    else:
+        for year, month in sorted(set(periods)):
+            params = {"year": int(year), "month": int(month)}
+            for table in ROLLUP_TABLES:
+                conn.execute(text(f"DELETE FROM {table} WHERE year = :year AND month = :month"), params)
+            for insert_sql in _rollup_inserts("year = :year AND month = :month", conn.dialect.name):
+                conn.execute(text(insert_sql), params)
+
+    if conn.dialect.name == "sqlite":
+        conn.execute(text("ANALYZE"))
+
+    # Served data changed → downstream caches watching the stamp invalidate
+    bump_data_version(conn)
+
+
+def missing_serving_schema(conn) -> list:
+    """What the tools need but a DB built before the rollup layer lacks ([] → up to date or no inventory yet)."""
+    inspector = inspect(conn)
+    if not inspector.has_table("inventory"):
+        return []
+    inventory_columns = {column["name"] for column in inspector.get_columns("inventory")}
+    missing = [f"inventory.{name}" for name in ("year", "month") if name not in inventory_columns]
+    for table in ROLLUP_TABLES:
+        if not inspector.has_table(table):
+            missing.append(table)
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        missing += [f"{table}.{name}" for name in ADDED_COLUMNS.get(table, {}) if name not in columns]
+    return missing
+
+
+def upgrade_serving_db(db_url: str = "", auto: bool = True) -> list:
+    """
+    Brings a DB built before the rollup layer up to date: year / month columns, lookup indexes,
+    a full rollup build and the data-version stamp, in one transaction. Returns what was missing.
+    auto=False (or a read-only DB user) → raises with the command to run instead.
+    """
+    from rds_sim.local_db import create_inventory_indexes
+
+    db_url = db_url or get_db_url()
+    engine = create_db_engine(db_url, read_only=True)
+    try:
+        with engine.connect() as conn:
+            missing = missing_serving_schema(conn)
+    finally:
+        engine.dispose()
+    if not missing:
+        return []
+
+    command = "python -m rds_sim.rollups (from ADK_pipeline/, with a writable INVENTORY_DB_URL)"
+    if not auto:
+        raise RuntimeError(f"Inventory DB predates the rollup tables (missing {', '.join(missing)}) → run {command}")
+
+    print(f"⚠️ Inventory DB predates the rollup tables (missing {', '.join(missing)}) → upgrading it once …")
+    engine = create_db_engine(db_url, read_only=False)
+    try:
+        with engine.begin() as conn:
+            add_period_columns(conn)
+            create_inventory_indexes(conn)
+            refresh_rollups(conn)
+    except Exception as e:
+        raise RuntimeError(f"Inventory DB upgrade failed ({e}) → run {command}") from e
+    finally:
+        engine.dispose()
+    print("✅ Inventory DB upgraded (rollups built)")
+    return missing
+
+
+def periods_for_dates(dates):
+    """Maps ISO dates / datetimes / Timestamps to the distinct (year, month) pairs they fall in."""
+    periods = set()
+    for value in dates:
+        value = str(value)
+        periods.add((int(value[0:4]), int(value[5:7])))
+    return sorted(periods)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or incrementally refresh the monthly rollup tables.")
+    parser.add_argument("--db-url", default="", help="Database URL (defaults to INVENTORY_DB_URL / local SQLite)")
+    parser.add_argument("--months", nargs="*", default=None,
+                        help="YYYY-MM months to refresh; omit for a full rebuild")
+    args = parser.parse_args()
+
+    engine = create_db_engine(args.db_url or get_db_url(), read_only=False)
+    periods = [(int(m[:4]), int(m[5:7])) for m in args.months] if args.months else None
+    with engine.begin() as conn:
+        if periods is None:
+            from rds_sim.local_db import create_inventory_indexes
+
+            add_period_columns(conn)
+            create_inventory_indexes(conn)
+        refresh_rollups(conn, periods)
+    engine.dispose()
+    print(f"Rollups refreshed for → {'all months' if periods is None else ', '.join(args.months)}")
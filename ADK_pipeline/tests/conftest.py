@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Tests import the pipeline modules the way the app does (from ADK_pipeline/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rds_sim.ingest import ingest_inventory
+from tools import data_version, date_bounds, db_engine
+
+
+# ----------------------------------------------------------------
+# Tiny inventory: 2 products × 2 stores × 3 days over January / February 2024
+# ----------------------------------------------------------------
+PRODUCTS = {"P0001": ("Toys", "Toy Robot"), "P0002": ("Electronics", "Headphones")}
+STORES = {"S001": "North", "S002": "South"}
+DATES = ["2024-01-15", "2024-01-16", "2024-02-15"]
+
+
+def inventory_rows(dates=DATES, units_sold: int = 10) -> list:
+    """One row per date × store × product in the shape of the inventory sheet."""
+    rows = []
+    for day, date in enumerate(dates):
+        for store_id, region in STORES.items():
+            for product_id, (category, name) in PRODUCTS.items():
+                rows.append({
+                    "Date": date, "Store ID": store_id, "Product ID": product_id, "Category": category,
+                    "Region": region, "Inventory Level": 100, "Units Sold": units_sold + day,
+                    "Units Ordered": 20, "Demand Forecast": 11.5, "Price": 25.0 + day, "Discount": 10,
+                    "Weather Condition": "Sunny", "Holiday/Promotion": 0, "Competitor Pricing": 24.5,
+                    "Seasonality": "Winter", "Product Name": name,
+                })
+    return rows
+
+
+def write_source(path, rows) -> str:
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def reset_serving_state(monkeypatch):
+    """Drops the process-wide engine, schema check, data version and date bounds between tests."""
+    db_engine.dispose_engine()
+    monkeypatch.setattr(db_engine, "_schema_checked", False)
+    monkeypatch.setattr(data_version, "_cached_version", None)
+    monkeypatch.setattr(date_bounds, "_bounds", None)
+
+
+@pytest.fixture
+def inventory_db(tmp_path, monkeypatch):
+    """SQLite DB built by the full ingest (indexes, rollups, data version 1), served as INVENTORY_DB_URL."""
+    db_url = f"sqlite:///{tmp_path / 'inventory.db'}"
+    ingest_inventory(write_source(tmp_path / "inventory.csv", inventory_rows()), db_url)
+
+    monkeypatch.setenv("INVENTORY_DB_URL", db_url)
+    monkeypatch.setenv("INVENTORY_BACKEND", "sql")
+    monkeypatch.setenv("DATA_VERSION_CHECK_SECONDS", "0")
+    monkeypatch.delenv("TOOL_RESPONSE_FORMAT", raising=False)
+    reset_serving_state(monkeypatch)
+    yield db_url
+    db_engine.dispose_engine()
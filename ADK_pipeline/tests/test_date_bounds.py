@@ -0,0 +1,37 @@
+from conftest import inventory_rows, write_source
+from rds_sim.ingest import upsert_inventory
+from tools.data_version import get_data_version
+from tools.date_bounds import DateBounds, get_date_bounds
+
+
+def test_resolve_latest_and_named_month():
+    bounds = DateBounds({"P0001": (202301, 202402)}, {"Toys": (202301, 202403)})
+
+    assert bounds.resolve(None, product_id="P0001") == (2024, 2)
+    assert bounds.resolve(7, product_id="P0001") == (2024, 7)
+    assert bounds.resolve(None, category="Toys") == (2024, 3)
+    assert bounds.resolve(None) == (2024, 3)
+    assert bounds.resolve(None, product_id="P9999") is None
+
+
+def test_bounds_built_from_rollups(inventory_db):
+    bounds = get_date_bounds()
+
+    assert bounds.bounds(product_id="P0001") == (202401, 202402)
+    assert bounds.bounds(category="Electronics") == (202401, 202402)
+    assert bounds.overall == (202401, 202402)
+    # Same data version → the cached object is reused
+    assert get_date_bounds() is bounds
+
+
+def test_bounds_reload_when_data_version_changes(inventory_db, tmp_path):
+    before = get_date_bounds()
+    version = get_data_version()
+
+    upsert_inventory(write_source(tmp_path / "march.csv", inventory_rows(["2024-03-01"])), inventory_db)
+
+    after = get_date_bounds()
+    assert get_data_version() == version + 1
+    assert after is not before
+    assert after.resolve(None, product_id="P0002") == (2024, 3)
+    assert after.resolve(None) == (2024, 3)
@@ -0,0 +1,122 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("google.adk.models.llm_response")
+types = pytest.importorskip("google.genai.types")
+
+from inventory_agent.router import (
+    CLOSING_REPLY,
+    DEFAULT_MIN_CONFIDENCE,
+    GREETING_REPLY,
+    ROUTER_STATS,
+    classify_message,
+    make_fast_path_router,
+)
+
+DISPATCH = {"offers": "offers_agent", "demand": "demand_predictor_agent"}
+
+
+# ----------------------------------------------------------------
+# classify_message: routes and confidences
+# ----------------------------------------------------------------
+@pytest.mark.parametrize("message, expected", [
+    ("Hello there!", ("greeting", 1.0)),
+    ("thanks so much, bye", ("closing", 1.0)),
+    ("What's the demand forecast for T0002 in January?", ("demand", 0.9)),
+    ("Hi, how many units sold did we restock last month?", ("demand", 0.9)),
+    ("Tell me about T0002 in store S001", ("demand", 0.85)),
+    ("Any Christmas promotions running?", ("offers", 0.9)),
+    ("", (None, 0.0)),
+    ("What is the weather like?", (None, 0.0)),
+])
+def test_classify_message(message, expected):
+    assert classify_message(message) == expected
+
+
+def test_weak_demand_words_stay_below_the_dispatch_threshold():
+    route, confidence = classify_message("give me a summary")
+    assert route == "demand"
+    assert confidence < DEFAULT_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize("message", [
+    "Any offers for T0002?",
+    "Which promotions boosted demand last December?",
+    "show discounts and the stock forecast for toys",
+])
+def test_mixed_offer_and_demand_is_left_to_the_llm(message):
+    route, confidence = classify_message(message)
+    assert route is None
+    assert confidence < DEFAULT_MIN_CONFIDENCE
+
+
+# ----------------------------------------------------------------
+# fast_path_router: before_model_callback behaviour
+# ----------------------------------------------------------------
+def _user_request(message: str):
+    return SimpleNamespace(contents=[types.Content(role="user", parts=[types.Part(text=message)])])
+
+
+def _tool_result_request(agent_name: str, result: str):
+    response = types.FunctionResponse(name=agent_name, response={"result": result})
+    return SimpleNamespace(contents=[types.Content(role="user", parts=[types.Part(function_response=response)])])
+
+
+@pytest.fixture
+def router(monkeypatch):
+    for name in ("ROUTER_MODE", "ROUTER_MIN_CONFIDENCE", "ROUTER_EMBEDDINGS"):
+        monkeypatch.delenv(name, raising=False)
+    ROUTER_STATS.clear()
+    return make_fast_path_router(DISPATCH)
+
+
+def test_greeting_and_closing_are_answered_without_the_llm(router):
+    context = SimpleNamespace(state={})
+    assert router(context, _user_request("hi")).content.parts[0].text == GREETING_REPLY
+    assert router(context, _user_request("thank you, bye")).content.parts[0].text == CLOSING_REPLY
+    assert ROUTER_STATS["greeting"] == ROUTER_STATS["closing"] == 1
+
+
+def test_clear_demand_question_is_dispatched_and_answer_relayed(router):
+    context = SimpleNamespace(state={})
+    message = "Forecast demand for T0002 next month"
+
+    call = router(context, _user_request(message)).content.parts[0].function_call
+    assert (call.name, call.args) == ("demand_predictor_agent", {"request": message})
+    assert context.state["fast_path_dispatch"] == "demand_predictor_agent"
+
+    # Second model call of the turn: the sub-agent's answer comes back verbatim
+    reply = router(context, _tool_result_request("demand_predictor_agent", "Demand: 120 units"))
+    assert reply.content.parts[0].text == "Demand: 120 units"
+    assert context.state["fast_path_dispatch"] == ""
+    assert ROUTER_STATS["demand"] == 1
+
+
+def test_mixed_message_falls_through_to_the_llm(router):
+    context = SimpleNamespace(state={})
+    assert router(context, _user_request("Any offers for T0002?")) is None
+    assert context.state == {}
+    assert ROUTER_STATS["llm"] == 1
+
+
+def test_min_confidence_setting(monkeypatch, router):
+    context = SimpleNamespace(state={})
+    assert router(context, _user_request("give me a summary")) is None
+
+    monkeypatch.setenv("ROUTER_MIN_CONFIDENCE", "0.5")
+    lenient = make_fast_path_router(DISPATCH)
+    call = lenient(context, _user_request("give me a summary")).content.parts[0].function_call
+    assert call.name == "demand_predictor_agent"
+
+
+def test_router_mode_off(monkeypatch):
+    monkeypatch.setenv("ROUTER_MODE", "off")
+    router = make_fast_path_router(DISPATCH)
+    assert router(SimpleNamespace(state={}), _user_request("hi")) is None
+
+
+def test_tool_results_are_not_reclassified(router):
+    # A function response for a sub-agent the router did not dispatch → the LLM handles it
+    context = SimpleNamespace(state={})
+    assert router(context, _tool_result_request("offers_agent", "10% off toys")) is None
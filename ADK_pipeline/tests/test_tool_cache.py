@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+
+from tools import tool_cache
+from tools.data_version import bump_data_version
+from tools.db_tools import normalise_tool_arguments
+from tools.tool_cache import TTLCache, cached_tool
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic() for TTL checks."""
+    now = [1000.0]
+    monkeypatch.setattr(tool_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+# ----------------------------------------------------------------
+# TTLCache: LRU eviction, TTL expiry, data-version invalidation
+# ----------------------------------------------------------------
+def test_lru_evicts_least_recently_used():
+    cache = TTLCache("test", max_entries=2)
+    cache.put("a", 1, data_version=1)
+    cache.put("b", 2, data_version=1)
+    assert cache.get("a", 1) == (True, 1)  # "a" is now the most recent
+
+    cache.put("c", 3, data_version=1)
+
+    assert cache.get("b", 1) == (False, None)
+    assert cache.get("a", 1) == (True, 1)
+    assert cache.get("c", 1) == (True, 3)
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache("test", ttl_seconds=60)
+    cache.put("a", 1, data_version=1)
+
+    clock[0] += 59
+    assert cache.get("a", 1) == (True, 1)
+    clock[0] += 1
+    assert cache.get("a", 1) == (False, None)
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_newer_data_version_invalidates_entry():
+    cache = TTLCache("test")
+    cache.put("a", 1, data_version=1)
+
+    assert cache.get("a", 2) == (False, None)
+    # The stale entry is gone, not just skipped
+    assert cache.get("a", 1) == (False, None)
+    stats = cache.stats()
+    assert (stats["invalidations"], stats["misses"], stats["hits"]) == (1, 2, 0)
+
+
+# ----------------------------------------------------------------
+# cached_tool against a tiny DB
+# ----------------------------------------------------------------
+def _counting_tool(calls):
+    def get_product_context_with_month(product_id: str, month_name: str = "", store_id: str = ""):
+        """Test tool."""
+        calls.append((product_id, month_name, store_id))
+        return {"product": product_id, "month": month_name, "store": store_id}
+
+    return get_product_context_with_month
+
+
+def test_normalised_arguments_share_one_entry(inventory_db):
+    calls = []
+    tool = cached_tool(_counting_tool(calls), normalise_tool_arguments)
+
+    first = tool("P0001", "february")
+    second = tool(" P0001 ", month_name="February ")
+    latest = tool("P0001")  # empty month → latest month with data for P0001
+
+    assert first == second == latest == {"product": "P0001", "month": "February", "store": ""}
+    assert calls == [("P0001", "February", "")]
+    assert tool.cache.stats()["hits"] == 2
+
+
+def test_data_version_bump_invalidates(inventory_db):
+    calls = []
+    tool = cached_tool(_counting_tool(calls), normalise_tool_arguments)
+    tool("P0001", "January", "S001")
+
+    engine = create_engine(inventory_db)
+    with engine.begin() as conn:
+        bump_data_version(conn)
+    engine.dispose()
+
+    tool("P0001", "January", "S001")
+    assert len(calls) == 2
+    assert tool.cache.stats()["invalidations"] == 1
+
+
+def test_payload_format_is_part_of_the_key(inventory_db, monkeypatch):
+    calls = []
+    tool = cached_tool(_counting_tool(calls), normalise_tool_arguments)
+    tool("P0001", "January")
+
+    monkeypatch.setenv("TOOL_RESPONSE_FORMAT", "compact")
+    tool("P0001", "January")
+    tool("P0001", "January")
+
+    assert len(calls) == 2
+    assert tool.cache.stats()["hits"] == 1
+
+
+def test_errors_are_not_cached(inventory_db):
+    calls = []
+
+    def get_product_context_with_month(product_id: str, month_name: str = "", store_id: str = ""):
+        """Test tool."""
+        calls.append(product_id)
+        return {"error": "boom"}
+
+    tool = cached_tool(get_product_context_with_month, normalise_tool_arguments)
+    tool("P0001", "January")
+    tool("P0001", "January")
+    assert len(calls) == 2
+
+
+def test_async_tool_is_cached(inventory_db):
+    calls = []
+
+    async def get_product_context_with_month(product_id: str, month_name: str = "", store_id: str = ""):
+        """Test tool."""
+        calls.append(product_id)
+        return {"product": product_id, "month": month_name}
+
+    tool = cached_tool(get_product_context_with_month, normalise_tool_arguments)
+
+    async def run():
+        return [await tool("P0002", "january"), await tool("P0002", "January")]
+
+    assert asyncio.run(run()) == [{"product": "P0002", "month": "January"}] * 2
+    assert calls == ["P0002"]
@@ -0,0 +1,74 @@
+from sqlalchemy import create_engine, text
+
+from conftest import inventory_rows, write_source
+from rds_sim.ingest import upsert_inventory
+
+
+def _scalar(db_url: str, sql: str, **params):
+    engine = create_engine(db_url)
+    with engine.connect() as conn:
+        value = conn.execute(text(sql), params).scalar()
+    engine.dispose()
+    return value
+
+
+def _execute(db_url: str, sql: str, **params):
+    engine = create_engine(db_url)
+    with engine.begin() as conn:
+        conn.execute(text(sql), params)
+    engine.dispose()
+
+
+def _data_version(db_url: str) -> int:
+    return _scalar(db_url, "SELECT value FROM inventory_meta WHERE key = 'data_version'")
+
+
+def _rollup_units(db_url: str, month: int):
+    return _scalar(db_url, """
+        SELECT units_sold_sum FROM monthly_product_store
+        WHERE "Product ID" = 'P0001' AND "Store ID" = 'S001' AND year = 2024 AND month = :month
+    """, month=month)
+
+
+def test_unchanged_rows_are_skipped(inventory_db, tmp_path):
+    version = _data_version(inventory_db)
+
+    stats = upsert_inventory(write_source(tmp_path / "same.csv", inventory_rows()), inventory_db)
+
+    assert (stats["rows_inserted"], stats["rows_updated"], stats["rows_unchanged"]) == (0, 0, 12)
+    assert stats["months_refreshed"] == []
+    # Nothing changed → no rollup refresh and no data-version bump (caches stay warm)
+    assert _data_version(inventory_db) == version
+
+
+def test_only_changed_months_are_refreshed(inventory_db, tmp_path):
+    # Sentinel in January's rollup: a refresh of January would overwrite it
+    _execute(inventory_db, "UPDATE monthly_product_store SET units_sold_sum = -1 WHERE month = 1")
+    february_before = _rollup_units(inventory_db, 2)
+
+    rows = [row for row in inventory_rows() if row["Date"] == "2024-02-15"]
+    changed = next(row for row in rows if row["Product ID"] == "P0001" and row["Store ID"] == "S001")
+    changed["Units Sold"] += 5
+    rows += inventory_rows(["2024-03-01"])
+
+    stats = upsert_inventory(write_source(tmp_path / "daily.csv", rows), inventory_db)
+
+    assert (stats["rows_inserted"], stats["rows_updated"], stats["rows_unchanged"]) == (4, 1, 3)
+    assert stats["months_refreshed"] == ["2024-02", "2024-03"]
+    assert _rollup_units(inventory_db, 1) == -1
+    assert _rollup_units(inventory_db, 2) == february_before + 5
+    assert _rollup_units(inventory_db, 3) == 10
+    assert _scalar(inventory_db, "SELECT COUNT(*) FROM inventory") == 16
+
+
+def test_last_duplicate_in_a_batch_wins(inventory_db, tmp_path):
+    first, second = inventory_rows(["2024-03-01"])[:1] * 2
+    second = {**second, "Units Sold": 42}
+
+    stats = upsert_inventory(write_source(tmp_path / "dupes.csv", [first, second]), inventory_db)
+
+    assert stats["rows_inserted"] == 1
+    assert _scalar(inventory_db, """
+        SELECT "Units Sold" FROM inventory
+        WHERE Date = '2024-03-01' AND "Product ID" = 'P0001' AND "Store ID" = 'S001'
+    """) == 42
@@ -0,0 +1,263 @@
+from tools.date_bounds import get_date_bounds
+from tools.db_engine import get_async_engine, get_backend_name
+from tools.db_tools import (
+    QUERY_INVENTORY_SQL,
+    _category_context_result,
+    _category_yoy_query,
+    _overall_rows_to_aggregates,
+    _overall_summary_result,
+    _overall_summary_yoy_query,
+    _batch_rows_to_aggregates,
+    _parse_month_name,
+    _product_context_result,
+    _product_yoy_query,
+    _products_batch_query,
+    _products_batch_result,
+    _resolve_batch_periods,
+    _rows_to_aggregates,
+    _apply_row_means,
+    _as_id_list,
+    _batch_row_mean_scopes,
+    _overall_row_mean_scopes,
+    _row_mean_scopes,
+    _row_means_query,
+)
+from tools.executor import run_blocking
+from tools import forecasting
+from tools.parquet_backend import get_parquet_inventory
+from tools.resident_inventory import get_resident_inventory
+from tools.row_means import group_mean, series_mean
+
+
+# ----------------------------------------------------------------
+# Async variants of the tools in tools/db_tools.py.
+# Same names, signatures, docstrings and outputs, so ADK builds identical
+# declarations; parallel function calls overlap instead of serialising.
+# - SQL backend   → statements shared with db_tools, run on the async engine
+# - resident/numpy and parquet lookups, date-bound refreshes → bounded executor
+# ----------------------------------------------------------------
+async def _fetch_rows(statement, params):
+    async with get_async_engine().connect() as conn:
+        result = await conn.execute(statement, params)
+        return result.all()
+
+
+async def _settle_row_means(engine, scoped: list, mean=series_mean):
+    """Async counterpart of db_tools._settle_row_means (averages on a rounding boundary)."""
+    for agg, scope, year, month in scoped:
+        _apply_row_means(agg, await _fetch_rows(*_row_means_query(engine, scope, year, month)), mean)
+
+
+async def _resolve_period(month_num, product_id: str = "", category: str = ""):
+    # get_date_bounds() may re-read the data version / reload bounds → keep it off the loop
+    bounds = await run_blocking(get_date_bounds)
+    return bounds.resolve(month_num, product_id=product_id, category=category)
+
+
+async def _product_yoy(product_id: str, store_id: str, current_year: int, month_num: int):
+    if get_backend_name() == "resident":
+        return await run_blocking(
+            lambda: get_resident_inventory().product_yoy(product_id, store_id, current_year, month_num)
+        )
+    if get_backend_name() == "parquet":
+        return await run_blocking(
+            lambda: get_parquet_inventory().product_yoy(product_id, store_id, current_year, month_num)
+        )
+    engine = get_async_engine()
+    rows = await _fetch_rows(*_product_yoy_query(engine, product_id, store_id, current_year, month_num))
+    aggregates = _rows_to_aggregates(rows)
+    await _settle_row_means(engine, _row_mean_scopes(aggregates, month_num, {"Product ID": product_id, "Store ID": store_id}))
+    return aggregates
+
+
+async def _category_yoy(category: str, store_id: str, current_year: int, month_num: int):
+    if get_backend_name() == "resident":
+        return await run_blocking(
+            lambda: get_resident_inventory().category_yoy(category, store_id, current_year, month_num)
+        )
+    if get_backend_name() == "parquet":
+        return await run_blocking(
+            lambda: get_parquet_inventory().category_yoy(category, store_id, current_year, month_num)
+        )
+    engine = get_async_engine()
+    rows = await _fetch_rows(*_category_yoy_query(engine, category, store_id, current_year, month_num))
+    aggregates = _rows_to_aggregates(rows)
+    await _settle_row_means(engine, _row_mean_scopes(aggregates, month_num, {"Category": category, "Store ID": store_id}))
+    return aggregates
+
+
+async def _overall_yoy(store_id: str, current_year: int, month_num: int):
+    if get_backend_name() == "resident":
+        return await run_blocking(
+            lambda: get_resident_inventory().overall_yoy(store_id, current_year, month_num)
+        )
+    if get_backend_name() == "parquet":
+        return await run_blocking(
+            lambda: get_parquet_inventory().overall_yoy(store_id, current_year, month_num)
+        )
+    engine = get_async_engine()
+    rows = await _fetch_rows(*_overall_summary_yoy_query(engine, store_id, current_year, month_num))
+    aggregates = _overall_rows_to_aggregates(rows)
+    await _settle_row_means(engine, _overall_row_mean_scopes(aggregates, month_num, store_id), mean=group_mean)
+    return aggregates
+
+
+async def _products_batch(periods: dict, store_ids: list):
+    if get_backend_name() == "resident":
+        return await run_blocking(lambda: get_resident_inventory().products_batch(periods, store_ids))
+    if get_backend_name() == "parquet":
+        return await run_blocking(lambda: get_parquet_inventory().products_batch(periods, store_ids))
+    engine = get_async_engine()
+    rows = await _fetch_rows(*_products_batch_query(engine, periods, store_ids))
+    aggregates = _batch_rows_to_aggregates(rows, periods)
+    await _settle_row_means(engine, _batch_row_mean_scopes(aggregates, periods))
+    return aggregates
+
+
+async def query_inventory(product_id: str):
+    """Fetch product info from local SQLite DB (simulated RDS)."""
+    async with get_async_engine().connect() as conn:
+        result = (await conn.execute(QUERY_INVENTORY_SQL, {"pid": product_id})).mappings().first()
+    if not result:
+        return {"error": f"No product found for {product_id}"}
+    return dict(result)
+
+
+async def get_product_context_with_month(product_id: str, month_name: str = "", store_id: str = ""):
+    """
+    Retrieves context for a product (and optional store) for a given month.
+    If month_name is omitted → use the latest month found in DB.
+    Returns both:
+        - current_month_data
+        - last_year_same_month_data
+    """
+    try:
+        # 1️⃣ Validate the requested month (None → latest available)
+        month_num = None
+        if month_name:
+            month_num = _parse_month_name(month_name)
+            if not month_num:
+                return {"error": f"Invalid month name '{month_name}'. Use full names (e.g., 'January')."}
+
+        # 2️⃣ Resolve period from the cached date bounds + fetch both years in one round trip
+        period = await _resolve_period(month_num, product_id=product_id)
+        if period is None:
+            return {"error": f"No data found for Product {product_id}"}
+
+        latest_year, month_num = period
+        aggregates = await _product_yoy(product_id, store_id, latest_year, month_num)
+
+        # 3️⃣ Build comparative result
+        return _product_context_result(product_id, store_id, latest_year, month_num, aggregates)
+
+    except Exception as e:
+        print(f"❌ Error fetching product context for {product_id}: {e}")
+        return {"error": str(e)}
+
+
+async def get_category_context_with_month(category: str, month_name: str = "", store_id: str = ""):
+    """
+    Retrieves category-level context for a given (or latest) month and compares it
+    with the same month of the previous year.
+    - If store_id is provided → filters to that store.
+    - If month_name is omitted → uses the latest month available in DB.
+    """
+    try:
+        # 1️⃣ Validate the requested month (None → latest available)
+        month_num = None
+        if month_name:
+            month_num = _parse_month_name(month_name)
+            if not month_num:
+                return {"error": f"Invalid month name '{month_name}'. Use full names (e.g., 'January')."}
+
+        # 2️⃣ Resolve period from the cached date bounds + fetch both current and last year contexts
+        period = await _resolve_period(month_num, category=category)
+        if period is None:
+            return {"error": f"No data found for category '{category}'."}
+
+        latest_year, month_num = period
+        aggregates = await _category_yoy(category, store_id, latest_year, month_num)
+
+        # 3️⃣ Build the output structure
+        return _category_context_result(category, store_id, latest_year, month_num, aggregates)
+
+    except Exception as e:
+        print(f"❌ Error fetching category context for {category}: {e}")
+        return {"error": str(e)}
+
+
+async def get_overall_category_summary(month_name: str = "", store_id: str = ""):
+    """
+    Gathers aggregated per-category data for a specified (or latest) month.
+    - If month_name is not given → uses latest available month in DB.
+    - If store_id is provided → filters summary to that store.
+    """
+    try:
+        # 1️⃣ Validate the requested month (None → latest available)
+        month_num = None
+        if month_name:
+            month_num = _parse_month_name(month_name)
+            if not month_num:
+                return {"error": f"Invalid month name '{month_name}'. Use full names (e.g., 'January')."}
+
+        # 2️⃣ Resolve period from the cached date bounds + fetch both summaries
+        period = await _resolve_period(month_num)
+        if period is None:
+            return {"error": "No inventory data found in the database."}
+
+        latest_year, month_num = period
+        aggregates = await _overall_yoy(store_id, latest_year, month_num)
+
+        # 3️⃣ Build result
+        return _overall_summary_result(store_id, latest_year, month_num, aggregates)
+
+    except Exception as e:
+        print(f"❌ Error computing overall category summary: {e}")
+        return {"error": str(e)}
+
+
+async def get_products_context_batch(product_ids: list[str], store_ids: list[str] = None, month_name: str = ""):
+    """
+    Retrieves current vs last-year context for several products (and optionally several stores)
+    for one month, in a single query. Use instead of repeated get_product_context calls.
+    - store_ids omitted → each product is aggregated across all stores.
+    - month_name omitted → each product's latest month found in DB.
+    Returns a compact result keyed by "<Product ID>" or "<Product ID>@<Store ID>".
+    """
+    try:
+        product_ids, store_ids = _as_id_list(product_ids), _as_id_list(store_ids)
+
+        # 1️⃣ Validate the requested month (None → latest available per product)
+        month_num = None
+        if month_name:
+            month_num = _parse_month_name(month_name)
+            if not month_num:
+                return {"error": f"Invalid month name '{month_name}'. Use full names (e.g., 'January')."}
+
+        # 2️⃣ Resolve each product's period from the cached date bounds
+        bounds = await run_blocking(get_date_bounds)
+        periods, missing = _resolve_batch_periods(product_ids, month_num, bounds)
+        if not periods:
+            return {"error": f"No data found for Products {', '.join(product_ids)}"}
+
+        # 3️⃣ One grouped query for every product × store × year
+        aggregates = await _products_batch(periods, store_ids)
+
+        # 4️⃣ Build compact keyed result
+        return _products_batch_result(periods, store_ids, aggregates, missing, month_name)
+
+    except Exception as e:
+        print(f"❌ Error fetching batch product context for {product_ids}: {e}")
+        return {"error": str(e)}
+
+
+async def forecast_demand(product_id: str, store_id: str = "", month_name: str = ""):
+    """
+    Forecasts monthly Units Sold for a product (optionally in one store) with baseline models
+    (seasonal naive, exponential smoothing, regression on price/discount/competitor pricing/seasonality).
+    - month_name omitted → the month after the latest data; otherwise the next occurrence of that month.
+    - store_id omitted → the product across all stores.
+    Returns the point forecast, a 95% interval, the chosen model and every model's forecast.
+    """
+    # Fits are cached per data version; the (re)fit and lookup are numpy work → bounded executor
+    return await run_blocking(forecasting.forecast_demand, product_id, store_id, month_name)
@@ -0,0 +1,216 @@
+import os
+
+
+# ----------------------------------------------------------------
+# Compact tool payloads (TOOL_RESPONSE_FORMAT=compact).
+# The full payloads repeat long human-readable keys and two complete year blocks;
+# every byte of them is re-sent to Gemini on each model call of the turn.
+# Compact form:
+# - short keys, explained once by COMPACT_LEGEND in the demand predictor instruction
+# - "cur" = current-year values, "d" = YoY deltas (current − last year) instead of a second block
+# - Category Details as a column list + rounded row arrays
+# Built from the full result, so both formats come from the same numbers.
+# ----------------------------------------------------------------
+PAYLOAD_FORMATS = ("full", "compact")
+
+SHORT_KEYS = {
+    "Product ID": "pid",
+    "Product Name": "name",
+    "Category": "cat",
+    "Store ID": "store",
+    "Scope": "store",
+    "Month": "mon",
+    "Year": "yr",
+    "Current Year": "yr",
+    "Comparison Year": "ly_yr",
+    "Regions": "reg",
+    "Distinct Regions": "reg",
+    "Total Categories": "cats",
+    "Total Products": "prods",
+    "Unique Products": "prods",
+    "Total Unique Products": "prods",
+    "Total Stores": "stores",
+    "Stores Count": "stores",
+    "Units Sold (Total)": "sold",
+    "Total Units Sold": "sold",
+    "Overall Units Sold": "sold",
+    "Units Ordered (Total)": "ord",
+    "Total Units Ordered": "ord",
+    "Overall Units Ordered": "ord",
+    "Inventory Level (Total)": "inv",
+    "Total Inventory": "inv",
+    "Overall Inventory": "inv",
+    "Average Price": "price",
+    "Average Discount": "disc",
+    "Average Competitor Pricing": "comp",
+    "Most Common Weather Condition": "wx",
+    "Most Common Seasonality": "season",
+}
+
+# Fields that identify the block rather than describe the month
+_IDENTITY = {"pid", "name", "cat", "store", "mon", "yr"}
+# Unit counts are whole numbers; prices / discounts keep 2 decimals
+_INTEGER_FIELDS = {"sold", "ord", "inv", "prods", "stores", "cats"}
+
+SUMMARY_COLUMNS = ["cat", "prods", "stores", "sold", "ord", "inv", "price", "disc", "comp"]
+
+COMPACT_LEGEND = (
+    "pid=Product ID, name=Product Name, cat=Category, store=Store ID, mon=Month, yr=Current Year, "
+    "ly_yr=Comparison Year, reg=Regions, cats=Total Categories, prods=Products, stores=Stores, "
+    "sold=Units Sold, ord=Units Ordered, inv=Inventory, price=Average Price, disc=Average Discount, "
+    "comp=Average Competitor Pricing, wx=Most Common Weather Condition, season=Most Common Seasonality. "
+    "cur=current-year values; d=YoY change (current minus last year) for numbers, and the last-year value "
+    "for a text/list field that changed (unchanged ones are omitted); ly=last-year values when the current "
+    "year has no data; note=missing-year message. Category tables: cols names the columns, rows holds the "
+    "current-year rows and d_rows the YoY change of each row (null where the category is new). "
+    "Product batches: res=results keyed by pid@store (or pid alone), each in the single-product shape; "
+    "missing=requested product IDs with no data for the month."
+)
+
+
+def get_payload_format() -> str:
+    """TOOL_RESPONSE_FORMAT: "full" (default, long keys and both years) or "compact"."""
+    value = os.environ.get("TOOL_RESPONSE_FORMAT", "").strip().lower() or "full"
+    return value if value in PAYLOAD_FORMATS else "full"
+
+
+def compact_legend_prompt() -> str:
+    """Instruction suffix explaining the compact keys ("" in full mode)."""
+    if get_payload_format() != "compact":
+        return ""
+    return f"\n\nTOOL PAYLOAD KEYS (compact format)\n{COMPACT_LEGEND}\n"
+
+
+# ----------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------
+def _number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _round(key: str, value):
+    if not _number(value):
+        return value
+    return int(round(value)) if key in _INTEGER_FIELDS else round(float(value), 2)
+
+
+def _shorten(block: dict, skip=_IDENTITY) -> dict:
+    """Short-keyed, rounded copy of a full-format block without identity fields."""
+    out = {}
+    for key, value in block.items():
+        short = SHORT_KEYS.get(key)
+        if short and short not in skip:
+            out[short] = _round(short, value)
+    return out
+
+
+def _deltas(current: dict, previous: dict) -> dict:
+    """Numeric fields → current − previous; other fields → previous value, only when it differs."""
+    out = {}
+    for key, value in current.items():
+        if key not in previous:
+            continue
+        before = previous[key]
+        if _number(value) and _number(before):
+            out[key] = _round(key, value - before)
+        elif value != before:
+            out[key] = before
+    return out
+
+
+def _yoy_blocks(current, previous) -> dict:
+    """{"cur", "d"} when both years exist, else {"cur"} / {"ly"} plus the missing-year note."""
+    out = {}
+    if isinstance(current, dict):
+        out["cur"] = _shorten(current)
+        if isinstance(previous, dict):
+            out["d"] = _deltas(out["cur"], _shorten(previous))
+    elif isinstance(previous, dict):
+        out["ly"] = _shorten(previous)
+    notes = [block for block in (current, previous) if isinstance(block, str)]
+    if notes:
+        out["note"] = " ".join(notes)
+    return out
+
+
+def _identity(*blocks) -> dict:
+    """Short identity fields, first block wins (parameters, then the year blocks)."""
+    out = {}
+    for block in blocks:
+        if not isinstance(block, dict):
+            continue
+        for key, value in block.items():
+            short = SHORT_KEYS.get(key)
+            if short and (short in _IDENTITY or short == "ly_yr") and short not in out and value not in (None, "N/A"):
+                out[short] = value
+    return out
+
+
+# ----------------------------------------------------------------
+# Per-tool compaction
+# ----------------------------------------------------------------
+def _compact_context(result: dict) -> dict:
+    """get_product_context / get_category_context."""
+    current, previous = result["Current Year Context"], result["Last Year Context"]
+    return {**_identity(result["Parameters Used"], current, previous), **_yoy_blocks(current, previous)}
+
+
+def _summary_rows(summary: dict) -> dict:
+    """Category Details of one year → {category: [rounded values in SUMMARY_COLUMNS order]}."""
+    rows = {}
+    for detail in summary["Category Details"]:
+        row = {SHORT_KEYS[key]: _round(SHORT_KEYS[key], value) for key, value in detail.items() if key in SHORT_KEYS}
+        rows[row["cat"]] = [row.get(column) for column in SUMMARY_COLUMNS]
+    return rows
+
+
+def _compact_overall_summary(result: dict) -> dict:
+    """get_overall_category_summary: totals as cur / d, Category Details as cols / rows / d_rows."""
+    current, previous = result["Current Year Summary"], result["Last Year Summary"]
+    out = {**_identity(result["Parameters Used"]), **_yoy_blocks(current, previous)}
+
+    table_source = current if isinstance(current, dict) else previous
+    if isinstance(table_source, dict):
+        rows = _summary_rows(table_source)
+        out["cols"] = SUMMARY_COLUMNS
+        out["rows"] = list(rows.values())
+        if isinstance(current, dict) and isinstance(previous, dict):
+            last_rows = _summary_rows(previous)
+            out["d_rows"] = [
+                [category] + [
+                    _round(column, value - before) if _number(value) and _number(before) else None
+                    for column, value, before in zip(SUMMARY_COLUMNS[1:], row[1:], last_rows[category][1:])
+                ]
+                if category in last_rows else [category] + [None] * (len(SUMMARY_COLUMNS) - 1)
+                for category, row in rows.items()
+            ]
+    return out
+
+
+def _compact_products_batch(result: dict) -> dict:
+    """get_products_context_batch: each entry in the context shape."""
+    entries = {}
+    for key, entry in result["Results"].items():
+        entries[key] = {**_identity(entry), **_yoy_blocks(entry["Current"], entry["Last Year"])}
+    out = {
+        "res": entries,
+        "mon": result["Parameters Used"]["Month"],
+    }
+    if "Products Without Data" in result:
+        out["missing"] = result["Products Without Data"]
+    return out
+
+
+_COMPACTORS = {
+    "product_context": _compact_context,
+    "category_context": _compact_context,
+    "overall_summary": _compact_overall_summary,
+    "products_batch": _compact_products_batch,
+}
+
+
+def format_tool_payload(kind: str, result: dict) -> dict:
+    """Returns result unchanged in full mode, or its compact form for the given tool kind."""
+    if get_payload_format() != "compact" or not isinstance(result, dict) or "error" in result:
+        return result
+    return _COMPACTORS[kind](result)
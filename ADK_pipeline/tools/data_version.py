@@ -0,0 +1,60 @@
+import os
+import threading
+import time
+
+from sqlalchemy import text
+
+from tools.db_engine import get_engine
+
+
+# ----------------------------------------------------------------
+# Data-version stamp: a counter in inventory_meta that every loader /
+# rollup refresh bumps, so caches can tell when the data changed.
+# ----------------------------------------------------------------
+META_DDL = """
+    CREATE TABLE IF NOT EXISTS inventory_meta (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+"""
+
+
+def bump_data_version(conn) -> int:
+    """Increments the data version inside the caller's write transaction and returns the new value."""
+    conn.execute(text(META_DDL))
+    conn.execute(text("""
+        INSERT INTO inventory_meta (key, value) VALUES ('data_version', 1)
+        ON CONFLICT (key) DO UPDATE SET value = inventory_meta.value + 1
+    """))
+    return int(conn.execute(text("SELECT value FROM inventory_meta WHERE key = 'data_version'")).scalar())
+
+
+def read_data_version(engine=None) -> int:
+    """Reads the current data version (0 if the DB predates the stamp)."""
+    try:
+        with (engine or get_engine()).connect() as conn:
+            value = conn.execute(text("SELECT value FROM inventory_meta WHERE key = 'data_version'")).scalar()
+        return int(value or 0)
+    except Exception:
+        return 0
+
+
+_cached_version = None
+_checked_at = 0.0
+_version_lock = threading.Lock()
+
+
+def get_data_version() -> int:
+    """
+    Data version of the serving DB, re-read at most every DATA_VERSION_CHECK_SECONDS (default 5s)
+    so hot paths don't pay a query per call.
+    """
+    global _cached_version, _checked_at
+    interval = float(os.environ.get("DATA_VERSION_CHECK_SECONDS", "5") or 5)
+    now = time.monotonic()
+    if _cached_version is None or now - _checked_at >= interval:
+        with _version_lock:
+            if _cached_version is None or now - _checked_at >= interval:
+                _cached_version = read_data_version()
+                _checked_at = now
+    return _cached_version
@@ -0,0 +1,98 @@
+import threading
+
+from sqlalchemy import text
+
+from tools.data_version import get_data_version
+from tools.db_engine import get_backend_name, get_engine
+from tools.parquet_backend import get_parquet_inventory
+from tools.resident_inventory import get_resident_inventory
+
+
+# ----------------------------------------------------------------
+# In-memory date bounds (yyyymm) per product, per category and overall
+# ----------------------------------------------------------------
+class DateBounds:
+    """
+    Earliest/latest yyyymm with data for every product, every category and the whole DB.
+    Built once per data version so resolving "latest month" / "latest year" is a dict lookup.
+    """
+
+    def __init__(self, product_bounds: dict, category_bounds: dict, data_version: int = 0):
+        self.product = product_bounds
+        self.category = category_bounds
+        self.data_version = data_version
+        all_bounds = list(category_bounds.values()) or list(product_bounds.values())
+        self.overall = (
+            (min(b[0] for b in all_bounds), max(b[1] for b in all_bounds)) if all_bounds else None
+        )
+
+    def bounds(self, product_id: str = "", category: str = ""):
+        """(min_yyyymm, max_yyyymm) for the product / category / whole DB, or None if unknown."""
+        if product_id:
+            return self.product.get(product_id)
+        if category:
+            return self.category.get(category)
+        return self.overall
+
+    def latest(self, product_id: str = "", category: str = ""):
+        bounds = self.bounds(product_id, category)
+        return bounds[1] if bounds else None
+
+    def resolve(self, month_num, product_id: str = "", category: str = ""):
+        """
+        Target (current_year, month_num) for a lookup:
+        - no month → latest year-month with data
+        - month    → that month in the latest year with data
+        Returns None when the product / category has no data.
+        """
+        latest = self.latest(product_id, category)
+        if latest is None:
+            return None
+        return latest // 100, month_num or latest % 100
+
+
+def _load_sql_bounds(engine):
+    """MIN/MAX period per product and per category from the (small) rollup tables."""
+    with engine.connect() as conn:
+        product_rows = conn.execute(text("""
+            SELECT "Product ID" AS key, MIN(year * 100 + month) AS first, MAX(year * 100 + month) AS last
+            FROM monthly_product_store
+            GROUP BY "Product ID"
+        """)).all()
+        category_rows = conn.execute(text("""
+            SELECT Category AS key, MIN(year * 100 + month) AS first, MAX(year * 100 + month) AS last
+            FROM monthly_category
+            GROUP BY Category
+        """)).all()
+    return (
+        {row.key: (int(row.first), int(row.last)) for row in product_rows},
+        {row.key: (int(row.first), int(row.last)) for row in category_rows},
+    )
+
+
+def load_date_bounds(data_version: int = 0) -> DateBounds:
+    """Builds DateBounds from the configured backend."""
+    if get_backend_name() == "resident":
+        product_bounds, category_bounds = get_resident_inventory().period_bounds()
+    elif get_backend_name() == "parquet":
+        product_bounds, category_bounds = get_parquet_inventory().period_bounds()
+    else:
+        product_bounds, category_bounds = _load_sql_bounds(get_engine())
+    return DateBounds(product_bounds, category_bounds, data_version)
+
+
+# ----------------------------------------------------------------
+# Process-wide bounds, refreshed only when the data version changes
+# ----------------------------------------------------------------
+_bounds = None
+_bounds_lock = threading.Lock()
+
+
+def get_date_bounds() -> DateBounds:
+    global _bounds
+    data_version = get_data_version()
+    if _bounds is None or _bounds.data_version != data_version:
+        with _bounds_lock:
+            if _bounds is None or _bounds.data_version != data_version:
+                _bounds = load_date_bounds(data_version)
+    return _bounds
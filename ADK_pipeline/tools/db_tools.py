@@ -1,26 +1,24 @@
 import numpy as np
-import pandas as pd
-from dotenv import load_dotenv
-from google.adk.agents import Agent
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.adk.models.lite_llm import LiteLlm
-from google.adk.tools import FunctionTool
-from google.genai import types
-from sqlalchemy import create_engine, text
-from collections import Counter
+from sqlalchemy import bindparam, text
 from datetime import datetime
 
+from tools.compact_payloads import format_tool_payload
+from tools.date_bounds import get_date_bounds
+from tools.db_engine import get_backend_name, get_engine, row_order_column
+from tools.parquet_backend import get_parquet_inventory
+from tools.resident_inventory import get_resident_inventory
+from tools.row_means import MEAN_COLUMNS, group_mean, needs_row_means, numpy_round, series_mean
+
+
+
+QUERY_INVENTORY_SQL = text("SELECT * FROM inventory WHERE [Product ID] = :pid")
 
 
 def query_inventory(product_id: str):
     """Fetch product info from local SQLite DB (simulated RDS)."""
-    engine = create_engine("sqlite:///data/db_files/inventory.db", echo=False)
+    engine = get_engine()
     with engine.connect() as conn:
-        result = conn.execute(
-            text("SELECT * FROM inventory WHERE [Product ID] = :pid"),
-            {"pid": product_id}
-        ).mappings().first()
+        result = conn.execute(QUERY_INVENTORY_SQL, {"pid": product_id}).mappings().first()
     if not result:
         return {"error": f"No product found for {product_id}"}
     return dict(result)
@@ -29,73 +27,332 @@ def query_inventory(product_id: str):
 
 
 # ----------------------------------------------------------------
-# Helper Function: fetch data for given product, month, year, store
+# Shared helpers
 # ----------------------------------------------------------------
-def _fetch_context_for_month(engine, product_id: str, store_id: str, year: int, month: int):
-    """Fetch aggregated product context for given year, month, and optional store."""
-    try:
-        with engine.connect() as conn:
-            df = pd.read_sql_query(
-                "SELECT * FROM inventory WHERE [Product ID] = :pid",
-                conn,
-                params={"pid": product_id}
-            )
-
-        if df.empty:
-            return None
-
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-        df = df.dropna(subset=["Date"])
-        df["Year"] = df["Date"].dt.year
-        df["Month"] = df["Date"].dt.month
-
-        # Filter by year-month
-        month_df = df[(df["Year"] == year) & (df["Month"] == month)]
-        if store_id:
-            month_df = month_df[month_df["Store ID"] == store_id]
-
-        if month_df.empty:
-            return None
-
-        # Aggregate numeric fields
-        total_inventory = month_df["Inventory Level"].sum()
-        total_sold = month_df["Units Sold"].sum()
-        total_ordered = month_df["Units Ordered"].sum()
-        avg_price = month_df["Price"].mean()
-        avg_discount = month_df["Discount"].mean()
-        avg_comp_price = month_df["Competitor Pricing"].mean()
-
-        # Mode helpers
-        def get_mode(values):
-            vals = [v for v in values if pd.notna(v)]
-            return Counter(vals).most_common(1)[0][0] if vals else None
-
-        season_mode = get_mode(month_df["Seasonality"])
-        weather_mode = get_mode(month_df["Weather Condition"])
-        regions = sorted(month_df["Region"].dropna().unique())
-
-        return {
+MONTH_NAMES = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+
+
+def _parse_month_name(month_name: str):
+    """Full month name → month number (1-12); None if not recognised."""
+    month_map = {m.lower(): i for i, m in enumerate(MONTH_NAMES, start=1)}
+    return month_map.get(month_name.strip().lower())
+
+
+def convert_numpy_types(obj):
+    """Recursively convert numpy scalar types to native Python types."""
+    if isinstance(obj, dict):
+        return {k: convert_numpy_types(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [convert_numpy_types(x) for x in obj]
+    elif isinstance(obj, (np.integer, np.int32, np.int64)):
+        return int(obj)
+    elif isinstance(obj, (np.floating, np.float32, np.float64)):
+        return float(obj)
+    else:
+        return obj
+
+
+# ----------------------------------------------------------------
+# Rollup SQL fragments (tables are built by rds_sim/rollups.py)
+# ----------------------------------------------------------------
+_ROLLUP_METRICS_SQL = """
+    SUM(r.row_count) AS row_count,
+    SUM(r.units_sold_sum) AS total_units_sold,
+    SUM(r.units_ordered_sum) AS total_units_ordered,
+    SUM(r.inventory_sum) AS total_inventory,
+    SUM(r.price_sum) / SUM(r.price_count) AS avg_price,
+    SUM(r.discount_sum) / SUM(r.discount_count) AS avg_discount,
+    SUM(r.comp_price_sum) / SUM(r.comp_price_count) AS avg_comp_price
+"""
+
+
+def _list_agg(engine, expr: str) -> str:
+    """Dialect-specific string aggregation ('|' separated)."""
+    if engine.dialect.name == "postgresql":
+        return f"STRING_AGG({expr}, '|')"
+    return f"GROUP_CONCAT({expr}, '|')"
+
+
+def _histogram_subqueries(engine, scope_sql: str, month_sql: str = ":month") -> str:
+    """
+    Correlated subqueries returning the Weather/Seasonality modes (ties → the value met first in
+    table order, as Counter.most_common did; earliest date where there is no row order)
+    and the '|' joined distinct regions for the outer row's year (and month_sql month).
+    """
+    def mode(attribute, alias):
+        return f"""(
+            SELECT v.value FROM monthly_value_counts v
+            WHERE {scope_sql} AND v.year = r.year AND v.month = {month_sql} AND v.attribute = '{attribute}'
+            GROUP BY v.value
+            ORDER BY SUM(v.cnt) DESC, MIN(v.first_row), MIN(v.first_seen), v.value
+            LIMIT 1
+        ) AS {alias}"""
+
+    regions = f"""(
+            SELECT {_list_agg(engine, "d.value")} FROM (
+                SELECT DISTINCT v.value FROM monthly_value_counts v
+                WHERE {scope_sql} AND v.year = r.year AND v.month = {month_sql} AND v.attribute = 'Region'
+            ) d
+        ) AS regions"""
+
+    return ",\n".join([mode("Weather Condition", "weather_mode"), mode("Seasonality", "season_mode"), regions])
+
+
+def _split_regions(value):
+    return sorted(value.split("|")) if value else []
+
+
+def _rows_to_aggregates(rows):
+    """Per-year result rows → {year: aggregates}."""
+    return {
+        int(row.year): {**row._mapping, "regions": _split_regions(row.regions)}
+        for row in rows
+        if row.row_count
+    }
+
+
+# ----------------------------------------------------------------
+# Averages on a 2-decimal rounding boundary → recomputed from the rows (tools/row_means.py)
+# ----------------------------------------------------------------
+def _row_means_query(engine, scope: dict, year: int, month: int):
+    """(statement, params) reading the averaged columns of one scope's rows in table order."""
+    scope = {column: value for column, value in scope.items() if value}
+    columns = ", ".join(f'"{column}"' for column in MEAN_COLUMNS.values())
+    scope_sql = "".join(f' AND "{column}" = :scope{i}' for i, column in enumerate(scope))
+    order = row_order_column(engine.dialect.name)
+    params = {"year": year, "month": month, **{f"scope{i}": value for i, value in enumerate(scope.values())}}
+
+    statement = text(f"""
+        SELECT {columns} FROM inventory
+        WHERE year = :year AND month = :month{scope_sql}
+        {f"ORDER BY {order}" if order else ""}
+    """)
+    return statement, params
+
+
+def _row_mean_scopes(aggregates: dict, month_num: int, scope: dict):
+    """[(aggregates, scope, year, month)] for the per-year aggregates with an average on a boundary."""
+    return [(agg, scope, year, month_num) for year, agg in aggregates.items() if needs_row_means(agg)]
+
+
+def _overall_row_mean_scopes(aggregates: dict, month_num: int, store_id: str):
+    return [
+        (row, {"Category": row["Category"], "Store ID": store_id}, year, month_num)
+        for year, agg in aggregates.items()
+        for row in agg["categories"]
+        if needs_row_means(row)
+    ]
+
+
+def _batch_row_mean_scopes(aggregates: dict, periods: dict):
+    return [
+        (agg, {"Product ID": product_id, "Store ID": store_id}, year, periods[product_id][1])
+        for (product_id, store_id, year), agg in aggregates.items()
+        if needs_row_means(agg)
+    ]
+
+
+def _apply_row_means(agg: dict, rows, mean=series_mean):
+    for position, key in enumerate(MEAN_COLUMNS):
+        agg[key] = mean([row[position] for row in rows])
+
+
+def _settle_row_means(engine, scoped: list, mean=series_mean):
+    """Replaces the averages of each scoped aggregates dict with the pandas mean of its rows."""
+    if not scoped:
+        return
+    with engine.connect() as conn:
+        for agg, scope, year, month in scoped:
+            statement, params = _row_means_query(engine, scope, year, month)
+            _apply_row_means(agg, conn.execute(statement, params).all(), mean)
+
+
+# ----------------------------------------------------------------
+# Backend dispatch (INVENTORY_BACKEND = sql | resident | parquet)
+# ----------------------------------------------------------------
+def _product_yoy(product_id: str, store_id: str, current_year: int, month_num: int):
+    if get_backend_name() == "resident":
+        return get_resident_inventory().product_yoy(product_id, store_id, current_year, month_num)
+    if get_backend_name() == "parquet":
+        return get_parquet_inventory().product_yoy(product_id, store_id, current_year, month_num)
+    return _fetch_product_yoy(get_engine(), product_id, store_id, current_year, month_num)
+
+
+def _category_yoy(category: str, store_id: str, current_year: int, month_num: int):
+    if get_backend_name() == "resident":
+        return get_resident_inventory().category_yoy(category, store_id, current_year, month_num)
+    if get_backend_name() == "parquet":
+        return get_parquet_inventory().category_yoy(category, store_id, current_year, month_num)
+    return _fetch_category_yoy(get_engine(), category, store_id, current_year, month_num)
+
+
+def _overall_yoy(store_id: str, current_year: int, month_num: int):
+    if get_backend_name() == "resident":
+        return get_resident_inventory().overall_yoy(store_id, current_year, month_num)
+    if get_backend_name() == "parquet":
+        return get_parquet_inventory().overall_yoy(store_id, current_year, month_num)
+    return _fetch_overall_summary_yoy(get_engine(), store_id, current_year, month_num)
+
+
+def _products_batch(periods: dict, store_ids: list):
+    if get_backend_name() == "resident":
+        return get_resident_inventory().products_batch(periods, store_ids)
+    if get_backend_name() == "parquet":
+        return get_parquet_inventory().products_batch(periods, store_ids)
+    return _fetch_products_batch(get_engine(), periods, store_ids)
+
+
+def _latest_period(product_id: str = "", category: str = ""):
+    """Latest yyyymm with data for a product, a category or (neither) the whole DB; None if unknown."""
+    return get_date_bounds().latest(product_id, category)
+
+
+def _normalise_value(value):
+    """Strips strings; lists of IDs are stripped and de-duplicated (order kept)."""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (list, tuple)):
+        return list(dict.fromkeys(v.strip() if isinstance(v, str) else v for v in value))
+    return value
+
+
+def _as_id_list(ids) -> list:
+    """A bare ID string → [ID] (iterating it would give one "ID" per character); None / "" → []."""
+    if isinstance(ids, str):
+        return [ids] if ids.strip() else []
+    return list(ids or [])
+
+
+def normalise_tool_arguments(arguments: dict) -> dict:
+    """
+    Canonical form of context-tool arguments (used as the tool-cache key):
+    IDs / category stripped, month name case-folded to its full name and an empty
+    month resolved to the latest month available for the product / category / DB.
+    """
+    arguments = {k: _normalise_value(_as_id_list(v) if k.endswith("_ids") else v) for k, v in arguments.items()}
+    if "month_name" not in arguments:
+        return arguments
+
+    month_num = _parse_month_name(arguments["month_name"]) if arguments["month_name"] else None
+    # Batch calls resolve an empty month per product, so it stays empty in the key
+    if month_num is None and not arguments["month_name"] and "product_ids" not in arguments:
+        latest = _latest_period(arguments.get("product_id", ""), arguments.get("category", ""))
+        month_num = latest % 100 if latest else None
+    if month_num:
+        arguments["month_name"] = MONTH_NAMES[month_num - 1]
+    return arguments
+
+
+def warm_up_backend():
+    """Loads the configured backend up front (the resident snapshot is otherwise built on first call)."""
+    if get_backend_name() == "resident":
+        get_resident_inventory()
+    elif get_backend_name() == "parquet":
+        get_parquet_inventory()
+    else:
+        with get_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+    get_date_bounds()
+
+
+
+# ----------------------------------------------------------------
+# YoY fetch: product (one query → both years of the resolved period)
+# ----------------------------------------------------------------
+def _product_yoy_query(engine, product_id: str, store_id: str, current_year: int, month_num: int):
+    """
+    (statement, params) aggregating the product for month_num of current_year and current_year - 1.
+    Shared by the sync fetch below and tools/async_db_tools.py.
+    """
+    store_sql = ' AND r."Store ID" = :sid' if store_id else ""
+    scope_sql = 'v."Product ID" = :pid' + (' AND v."Store ID" = :sid' if store_id else "")
+    params = {"pid": product_id, "sid": store_id, "month": month_num,
+              "cur_year": current_year, "prev_year": current_year - 1}
+
+    statement = text(f"""
+        SELECT
+            r.year,
+            MIN(r."Product Name") AS product_name,
+            MIN(r.Category) AS category,
+            {_ROLLUP_METRICS_SQL},
+            {_histogram_subqueries(engine, scope_sql)}
+        FROM monthly_product_store r
+        WHERE r."Product ID" = :pid AND r.month = :month
+            AND r.year IN (:cur_year, :prev_year){store_sql}
+        GROUP BY r.year
+    """)
+    return statement, params
+
+
+def _fetch_product_yoy(engine, product_id: str, store_id: str, current_year: int, month_num: int):
+    """
+    Aggregates the product for month_num of current_year and current_year - 1 in a single query.
+    Returns {year: aggregates} (years without data are absent).
+    """
+    statement, params = _product_yoy_query(engine, product_id, store_id, current_year, month_num)
+    with engine.connect() as conn:
+        rows = conn.execute(statement, params).all()
+    aggregates = _rows_to_aggregates(rows)
+    _settle_row_means(engine, _row_mean_scopes(aggregates, month_num, {"Product ID": product_id, "Store ID": store_id}))
+    return aggregates
+
+
+def _format_product_context(product_id: str, store_id: str, year: int, month_num: int, agg: dict):
+    """Shapes one year's product aggregates into the context dict the prompts expect."""
+    return {
+        "Product ID": product_id,
+        "Store ID": store_id or "All Stores",
+        "Year": year,
+        "Month": datetime(year, month_num, 1).strftime("%B"),
+        "Product Name": agg["product_name"],
+        "Category": agg["category"],
+        "Regions": agg["regions"],
+        "Inventory Level (Total)": round(float(agg["total_inventory"]), 2),
+        "Units Sold (Total)": round(float(agg["total_units_sold"]), 2),
+        "Units Ordered (Total)": round(float(agg["total_units_ordered"]), 2),
+        "Average Price": round(float(agg["avg_price"]), 2),
+        "Average Discount": round(float(agg["avg_discount"]), 2),
+        "Average Competitor Pricing": round(float(agg["avg_comp_price"]), 2),
+        "Most Common Weather Condition": agg["weather_mode"],
+        "Most Common Seasonality": agg["season_mode"]
+    }
+
+
+def _product_context_result(product_id: str, store_id: str, latest_year: int, month_num: int, aggregates: dict):
+    """Current vs last-year product context in the tool's output shape (shared with the async tools)."""
+    month_name = datetime(latest_year, month_num, 1).strftime("%B")
+    previous_year = latest_year - 1
+    current_data, previous_data = (
+        _format_product_context(product_id, store_id, year, month_num, aggregates[year])
+        if year in aggregates else None
+        for year in (latest_year, previous_year)
+    )
+
+    # Retrieve product name if available
+    product_name = current_data.get("Product Name") if current_data else (
+        previous_data.get("Product Name") if previous_data else None
+    )
+
+    # Build comparative result
+    result = {
+        "Current Year Context": current_data or f"No data found for {month_name} {latest_year}.",
+        "Last Year Context": previous_data or f"No data found for {month_name} {previous_year}.",
+        "Parameters Used": {
             "Product ID": product_id,
+            "Product Name": product_name or "N/A",
             "Store ID": store_id or "All Stores",
-            "Year": year,
-            "Month": datetime(year, month, 1).strftime("%B"),
-            "Product Name": month_df["Product Name"].iloc[0],
-            "Category": month_df["Category"].iloc[0],
-            "Regions": regions,
-            "Inventory Level (Total)": round(float(total_inventory), 2),
-            "Units Sold (Total)": round(float(total_sold), 2),
-            "Units Ordered (Total)": round(float(total_ordered), 2),
-            "Average Price": round(float(avg_price), 2),
-            "Average Discount": round(float(avg_discount), 2),
-            "Average Competitor Pricing": round(float(avg_comp_price), 2),
-            "Most Common Weather Condition": weather_mode,
-            "Most Common Seasonality": season_mode
+            "Month": month_name,
+            "Current Year": latest_year,
+            "Comparison Year": previous_year
         }
+    }
 
-    except Exception as e:
-        print(f"❌ Error fetching monthly context for {product_id}: {e}")
-        return None
-
+    # Convert all numpy types → native Python (compact keys when TOOL_RESPONSE_FORMAT=compact)
+    result = convert_numpy_types(result)
+    return format_tool_payload("product_context", result)
 
 
 # ----------------------------------------------------------------
@@ -109,83 +366,24 @@ def get_product_context_with_month(product_id: str, month_name: str = "", store_
         - current_month_data
         - last_year_same_month_data
     """
-
-    def convert_numpy_types(obj):
-        """Recursively convert numpy scalar types to native Python types."""
-        if isinstance(obj, dict):
-            return {k: convert_numpy_types(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [convert_numpy_types(x) for x in obj]
-        elif isinstance(obj, (np.integer, np.int32, np.int64)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float32, np.float64)):
-            return float(obj)
-        else:
-            return obj
-
     try:
-        engine = create_engine("sqlite:///data/db_files/inventory.db", echo=False)
-
-        # 1️⃣ Load all available dates for the product
-        with engine.connect() as conn:
-            df_dates = pd.read_sql_query(
-                "SELECT [Product ID], [Product Name], Date FROM inventory WHERE [Product ID] = :pid",
-                conn,
-                params={"pid": product_id}
-            )
-
-        if df_dates.empty:
-            return {"error": f"No data found for Product {product_id}"}
-
-        df_dates["Date"] = pd.to_datetime(df_dates["Date"], errors="coerce")
-        df_dates = df_dates.dropna(subset=["Date"])
-        df_dates["Year"] = df_dates["Date"].dt.year
-        df_dates["Month"] = df_dates["Date"].dt.month
-
-        # 2️⃣ Determine month and year context
+        # 1️⃣ Validate the requested month (None → latest available)
+        month_num = None
         if month_name:
-            month_map = {m.lower(): i for i, m in enumerate([
-                "January", "February", "March", "April", "May", "June",
-                "July", "August", "September", "October", "November", "December"
-            ], start=1)}
-            month_num = month_map.get(month_name.lower())
+            month_num = _parse_month_name(month_name)
             if not month_num:
                 return {"error": f"Invalid month name '{month_name}'. Use full names (e.g., 'January')."}
-            latest_year = int(df_dates["Year"].max())
-        else:
-            latest_row = df_dates.loc[df_dates["Date"].idxmax()]
-            latest_year = int(latest_row["Year"])
-            month_num = int(latest_row["Month"])
-            month_name = datetime(latest_year, month_num, 1).strftime("%B")
-
-        previous_year = latest_year - 1
-
-        # 3️⃣ Fetch current and previous year data
-        current_data = _fetch_context_for_month(engine, product_id, store_id, latest_year, month_num)
-        previous_data = _fetch_context_for_month(engine, product_id, store_id, previous_year, month_num)
-
-        # Retrieve product name if available
-        product_name = current_data.get("Product Name") if current_data else (
-            previous_data.get("Product Name") if previous_data else None
-        )
-
-        # 4️⃣ Build comparative result
-        result = {
-            "Current Year Context": current_data or f"No data found for {month_name} {latest_year}.",
-            "Last Year Context": previous_data or f"No data found for {month_name} {previous_year}.",
-            "Parameters Used": {
-                "Product ID": product_id,
-                "Product Name": product_name or "N/A",
-                "Store ID": store_id or "All Stores",
-                "Month": month_name,
-                "Current Year": latest_year,
-                "Comparison Year": previous_year
-            }
-        }
 
-        # 5️⃣ Convert all numpy types → native Python
-        result = convert_numpy_types(result)
-        return result
+        # 2️⃣ Resolve period from the cached date bounds + fetch both years in one round trip
+        period = get_date_bounds().resolve(month_num, product_id=product_id)
+        if period is None:
+            return {"error": f"No data found for Product {product_id}"}
+
+        latest_year, month_num = period
+        aggregates = _product_yoy(product_id, store_id, latest_year, month_num)
+
+        # 3️⃣ Build comparative result
+        return _product_context_result(product_id, store_id, latest_year, month_num, aggregates)
 
     except Exception as e:
         print(f"❌ Error fetching product context for {product_id}: {e}")
@@ -195,75 +393,92 @@ def get_product_context_with_month(product_id: str, month_name: str = "", store_
 
 
 # ------------------------------------------------------------
-# Helper: fetch category data for a specific year & month
+# YoY fetch: category (one query → both years of the resolved period)
 # ------------------------------------------------------------
-def _fetch_category_context_for_month(engine, category: str, store_id: str, year: int, month: int):
-    """Fetch aggregated context data for a given category, store, and year-month."""
-    try:
-        with engine.connect() as conn:
-            df = pd.read_sql_query(
-                "SELECT * FROM inventory WHERE Category = :cat",
-                conn,
-                params={"cat": category}
-            )
-
-        if df.empty:
-            return None
-
-        # Date normalization
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-        df = df.dropna(subset=["Date"])
-        df["Year"] = df["Date"].dt.year
-        df["Month"] = df["Date"].dt.month
-
-        month_df = df[(df["Year"] == year) & (df["Month"] == month)]
-        if store_id:
-            month_df = month_df[month_df["Store ID"] == store_id]
-
-        if month_df.empty:
-            return None
-
-        # Aggregate metrics
-        total_products = month_df["Product ID"].nunique()
-        total_stores = month_df["Store ID"].nunique()
-        total_units_sold = month_df["Units Sold"].sum()
-        total_units_ordered = month_df["Units Ordered"].sum()
-        total_inventory = month_df["Inventory Level"].sum()
-        avg_price = month_df["Price"].mean()
-        avg_discount = month_df["Discount"].mean()
-        avg_comp_price = month_df["Competitor Pricing"].mean()
-
-        # Mode helper
-        def get_mode(values):
-            vals = [v for v in values if pd.notna(v)]
-            return Counter(vals).most_common(1)[0][0] if vals else None
-
-        weather_mode = get_mode(month_df["Weather Condition"])
-        season_mode = get_mode(month_df["Seasonality"])
-        distinct_regions = sorted(month_df["Region"].dropna().unique())
-
-        return {
+def _category_yoy_query(engine, category: str, store_id: str, current_year: int, month_num: int):
+    """(statement, params) aggregating the category for month_num of current_year and current_year - 1."""
+    # Distinct product/store counts come pre-computed at the requested grain
+    rollup_table = "monthly_category_store" if store_id else "monthly_category"
+    store_sql = ' AND r."Store ID" = :sid' if store_id else ""
+    scope_sql = "v.Category = :cat" + (' AND v."Store ID" = :sid' if store_id else "")
+    params = {"cat": category, "sid": store_id, "month": month_num,
+              "cur_year": current_year, "prev_year": current_year - 1}
+
+    statement = text(f"""
+        SELECT
+            r.year,
+            SUM(r.product_count) AS total_products,
+            SUM(r.store_count) AS total_stores,
+            {_ROLLUP_METRICS_SQL},
+            {_histogram_subqueries(engine, scope_sql)}
+        FROM {rollup_table} r
+        WHERE r.Category = :cat AND r.month = :month
+            AND r.year IN (:cur_year, :prev_year){store_sql}
+        GROUP BY r.year
+    """)
+    return statement, params
+
+
+def _fetch_category_yoy(engine, category: str, store_id: str, current_year: int, month_num: int):
+    """
+    Aggregates the category for month_num of current_year and current_year - 1 in a single query.
+    Returns {year: aggregates} (years without data are absent).
+    """
+    statement, params = _category_yoy_query(engine, category, store_id, current_year, month_num)
+    with engine.connect() as conn:
+        rows = conn.execute(statement, params).all()
+    aggregates = _rows_to_aggregates(rows)
+    _settle_row_means(engine, _row_mean_scopes(aggregates, month_num, {"Category": category, "Store ID": store_id}))
+    return aggregates
+
+
+def _format_category_context(category: str, store_id: str, year: int, month_num: int, agg: dict):
+    """Shapes one year's category aggregates into the context dict the prompts expect."""
+    return {
+        "Category": category,
+        "Store ID": store_id or "All Stores",
+        "Year": year,
+        "Month": datetime(year, month_num, 1).strftime("%B"),
+        "Total Stores": agg["total_stores"],
+        "Total Products": agg["total_products"],
+        "Average Price": numpy_round(agg["avg_price"]),
+        "Average Discount": numpy_round(agg["avg_discount"]),
+        "Total Units Sold": int(agg["total_units_sold"]),
+        "Total Units Ordered": int(agg["total_units_ordered"]),
+        "Total Inventory": int(agg["total_inventory"]),
+        "Average Competitor Pricing": numpy_round(agg["avg_comp_price"]),
+        "Most Common Weather Condition": agg["weather_mode"],
+        "Most Common Seasonality": agg["season_mode"],
+        "Distinct Regions": agg["regions"]
+    }
+
+
+def _category_context_result(category: str, store_id: str, latest_year: int, month_num: int, aggregates: dict):
+    """Current vs last-year category context in the tool's output shape (shared with the async tools)."""
+    month_name = datetime(latest_year, month_num, 1).strftime("%B")
+    previous_year = latest_year - 1
+    current_data, previous_data = (
+        _format_category_context(category, store_id, year, month_num, aggregates[year])
+        if year in aggregates else None
+        for year in (latest_year, previous_year)
+    )
+
+    # Build the output structure
+    result = {
+        "Current Year Context": current_data or f"No data found for {month_name} {latest_year}.",
+        "Last Year Context": previous_data or f"No data found for {month_name} {previous_year}.",
+        "Parameters Used": {
             "Category": category,
             "Store ID": store_id or "All Stores",
-            "Year": year,
-            "Month": datetime(year, month, 1).strftime("%B"),
-            "Total Stores": total_stores,
-            "Total Products": total_products,
-            "Average Price": round(avg_price, 2),
-            "Average Discount": round(avg_discount, 2),
-            "Total Units Sold": int(total_units_sold),
-            "Total Units Ordered": int(total_units_ordered),
-            "Total Inventory": int(total_inventory),
-            "Average Competitor Pricing": round(avg_comp_price, 2),
-            "Most Common Weather Condition": weather_mode,
-            "Most Common Seasonality": season_mode,
-            "Distinct Regions": distinct_regions
+            "Month": month_name,
+            "Current Year": latest_year,
+            "Comparison Year": previous_year
         }
+    }
 
-    except Exception as e:
-        print(f"❌ Error fetching category data for {category}, {year}-{month}: {e}")
-        return None
-
+    # Convert all numpy types → native Python (compact keys when TOOL_RESPONSE_FORMAT=compact)
+    result = convert_numpy_types(result)
+    return format_tool_payload("category_context", result)
 
 
 def get_category_context_with_month(category: str, month_name: str = "", store_id: str = ""):
@@ -273,78 +488,24 @@ def get_category_context_with_month(category: str, month_name: str = "", store_i
     - If store_id is provided → filters to that store.
     - If month_name is omitted → uses the latest month available in DB.
     """
-
-    def convert_numpy_types(obj):
-        """Recursively convert numpy scalar types to native Python types."""
-        if isinstance(obj, dict):
-            return {k: convert_numpy_types(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [convert_numpy_types(x) for x in obj]
-        elif isinstance(obj, (np.integer, np.int32, np.int64)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float32, np.float64)):
-            return float(obj)
-        else:
-            return obj
-
     try:
-        engine = create_engine("sqlite:///data/db_files/inventory.db", echo=False)
-
-        # 1️⃣ Load all date info for the category
-        with engine.connect() as conn:
-            df_dates = pd.read_sql_query(
-                "SELECT Category, Date FROM inventory WHERE Category = :cat",
-                conn,
-                params={"cat": category}
-            )
-
-        if df_dates.empty:
-            return {"error": f"No data found for category '{category}'."}
-
-        df_dates["Date"] = pd.to_datetime(df_dates["Date"], errors="coerce")
-        df_dates = df_dates.dropna(subset=["Date"])
-        df_dates["Year"] = df_dates["Date"].dt.year
-        df_dates["Month"] = df_dates["Date"].dt.month
-
-        # 2️⃣ Determine target month/year
+        # 1️⃣ Validate the requested month (None → latest available)
+        month_num = None
         if month_name:
-            month_map = {m.lower(): i for i, m in enumerate([
-                "January", "February", "March", "April", "May", "June",
-                "July", "August", "September", "October", "November", "December"
-            ], start=1)}
-            month_num = month_map.get(month_name.lower())
+            month_num = _parse_month_name(month_name)
             if not month_num:
                 return {"error": f"Invalid month name '{month_name}'. Use full names (e.g., 'January')."}
 
-            latest_year = int(df_dates["Year"].max())
-        else:
-            latest_row = df_dates.loc[df_dates["Date"].idxmax()]
-            latest_year = int(latest_row["Year"])
-            month_num = int(latest_row["Month"])
-            month_name = datetime(latest_year, month_num, 1).strftime("%B")
-
-        previous_year = latest_year - 1
-
-        # 3️⃣ Fetch both current and last year contexts
-        current_data = _fetch_category_context_for_month(engine, category, store_id, latest_year, month_num)
-        previous_data = _fetch_category_context_for_month(engine, category, store_id, previous_year, month_num)
-
-        # 4️⃣ Build the output structure
-        result = {
-            "Current Year Context": current_data or f"No data found for {month_name} {latest_year}.",
-            "Last Year Context": previous_data or f"No data found for {month_name} {previous_year}.",
-            "Parameters Used": {
-                "Category": category,
-                "Store ID": store_id or "All Stores",
-                "Month": month_name,
-                "Current Year": latest_year,
-                "Comparison Year": previous_year
-            }
-        }
+        # 2️⃣ Resolve period from the cached date bounds + fetch both current and last year contexts
+        period = get_date_bounds().resolve(month_num, category=category)
+        if period is None:
+            return {"error": f"No data found for category '{category}'."}
+
+        latest_year, month_num = period
+        aggregates = _category_yoy(category, store_id, latest_year, month_num)
 
-        # 5️⃣ Convert all numpy types → native Python
-        result = convert_numpy_types(result)
-        return result
+        # 3️⃣ Build comparative result
+        return _category_context_result(category, store_id, latest_year, month_num, aggregates)
 
     except Exception as e:
         print(f"❌ Error fetching category context for {category}: {e}")
@@ -354,81 +515,117 @@ def get_category_context_with_month(category: str, month_name: str = "", store_i
 
 
 # ----------------------------------------------------------------
-# Helper: fetch summary for one month/year (optionally store-specific)
+# YoY fetch: per-category summary for both years in one query
 # ----------------------------------------------------------------
-def _fetch_overall_summary_for_month(engine, store_id: str, year: int, month: int):
-    """Fetches per-category summaries for a specific year and month, rounded to 2 decimals."""
-    try:
-        with engine.connect() as conn:
-            df = pd.read_sql_query("SELECT * FROM inventory", conn)
-
-        if df.empty:
-            return None
-
-        # Date preprocessing
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-        df = df.dropna(subset=["Date"])
-        df["Year"] = df["Date"].dt.year
-        df["Month"] = df["Date"].dt.month
-
-        # Filter by month/year
-        month_df = df[(df["Year"] == year) & (df["Month"] == month)]
-        if store_id:
-            month_df = month_df[month_df["Store ID"] == store_id]
-
-        if month_df.empty:
-            return None
-
-        # Group by category
-        grouped = month_df.groupby("Category").agg({
-            "Product ID": "nunique",
-            "Store ID": "nunique",
-            "Units Sold": "sum",
-            "Units Ordered": "sum",
-            "Inventory Level": "sum",
-            "Price": "mean",
-            "Discount": "mean",
-            "Competitor Pricing": "mean"
-        }).reset_index()
-
-        # Rename columns for clarity
-        grouped.rename(columns={
-            "Product ID": "Unique Products",
-            "Store ID": "Stores Count",
-            "Units Sold": "Total Units Sold",
-            "Units Ordered": "Total Units Ordered",
-            "Inventory Level": "Total Inventory",
-            "Price": "Average Price",
-            "Discount": "Average Discount",
-            "Competitor Pricing": "Average Competitor Pricing"
-        }, inplace=True)
-
-        # Round numeric columns to 2 decimals
-        numeric_cols = [
-            "Total Units Sold", "Total Units Ordered", "Total Inventory",
-            "Average Price", "Average Discount", "Average Competitor Pricing"
-        ]
-        for col in numeric_cols:
-            grouped[col] = grouped[col].round(2)
-
-        # Prepare summary
-        summary = {
-            "Year": year,
-            "Month": datetime(year, month, 1).strftime("%B"),
-            "Scope": f"Store {store_id}" if store_id else "All Stores Combined",
-            "Total Categories": int(len(grouped)),
-            "Total Unique Products": int(month_df["Product ID"].nunique()),
-            "Overall Units Sold": round(float(month_df["Units Sold"].sum()), 2),
-            "Overall Units Ordered": round(float(month_df["Units Ordered"].sum()), 2),
-            "Overall Inventory": round(float(month_df["Inventory Level"].sum()), 2),
-            "Category Details": grouped.to_dict(orient="records")
+def _overall_summary_yoy_query(engine, store_id: str, current_year: int, month_num: int):
+    """(statement, params) returning per-category rows for month_num of current_year and current_year - 1."""
+    rollup_table = "monthly_category_store" if store_id else "monthly_category"
+    store_sql = ' AND r."Store ID" = :sid' if store_id else ""
+    params = {"sid": store_id, "month": month_num, "cur_year": current_year, "prev_year": current_year - 1}
+
+    statement = text(f"""
+        SELECT
+            r.year, r.Category,
+            SUM(r.product_count) AS unique_products,
+            SUM(r.store_count) AS stores_count,
+            {_ROLLUP_METRICS_SQL},
+            (
+                SELECT COUNT(DISTINCT p."Product ID") FROM monthly_product_store p
+                WHERE p.year = r.year AND p.month = :month{store_sql.replace("r.", "p.")}
+            ) AS year_unique_products
+        FROM {rollup_table} r
+        WHERE r.month = :month AND r.year IN (:cur_year, :prev_year){store_sql}
+        GROUP BY r.year, r.Category
+        ORDER BY r.year, r.Category
+    """)
+    return statement, params
+
+
+def _overall_rows_to_aggregates(rows):
+    """Per-year, per-category result rows → {year: {"categories": [...], "unique_products": n}}."""
+    aggregates = {}
+    for row in rows:
+        if not row.row_count:
+            continue
+        year_agg = aggregates.setdefault(int(row.year), {
+            "categories": [],
+            "unique_products": row.year_unique_products
+        })
+        year_agg["categories"].append(dict(row._mapping))
+    return aggregates
+
+
+def _fetch_overall_summary_yoy(engine, store_id: str, current_year: int, month_num: int):
+    """
+    Returns per-category rows for month_num of current_year and current_year - 1 in a single query.
+    Returns {year: aggregates} (years without data are absent).
+    """
+    statement, params = _overall_summary_yoy_query(engine, store_id, current_year, month_num)
+    with engine.connect() as conn:
+        rows = conn.execute(statement, params).all()
+    aggregates = _overall_rows_to_aggregates(rows)
+    _settle_row_means(engine, _overall_row_mean_scopes(aggregates, month_num, store_id), mean=group_mean)
+    return aggregates
+
+
+def _format_overall_summary(store_id: str, year: int, month_num: int, agg: dict):
+    """Shapes one year's per-category aggregates into the summary dict the prompts expect."""
+    grouped = agg["categories"]
+
+    # Rename columns for clarity and round to 2 decimals
+    category_details = [
+        {
+            "Category": row["Category"],
+            "Unique Products": row["unique_products"],
+            "Stores Count": row["stores_count"],
+            "Total Units Sold": round(row["total_units_sold"], 2),
+            "Total Units Ordered": round(row["total_units_ordered"], 2),
+            "Total Inventory": round(row["total_inventory"], 2),
+            "Average Price": numpy_round(row["avg_price"]),
+            "Average Discount": numpy_round(row["avg_discount"]),
+            "Average Competitor Pricing": numpy_round(row["avg_comp_price"])
         }
+        for row in grouped
+    ]
+
+    return {
+        "Year": year,
+        "Month": datetime(year, month_num, 1).strftime("%B"),
+        "Scope": f"Store {store_id}" if store_id else "All Stores Combined",
+        "Total Categories": int(len(category_details)),
+        "Total Unique Products": int(agg["unique_products"]),
+        "Overall Units Sold": round(float(sum(row["total_units_sold"] for row in grouped)), 2),
+        "Overall Units Ordered": round(float(sum(row["total_units_ordered"] for row in grouped)), 2),
+        "Overall Inventory": round(float(sum(row["total_inventory"] for row in grouped)), 2),
+        "Category Details": category_details
+    }
+
+
+def _overall_summary_result(store_id: str, latest_year: int, month_num: int, aggregates: dict):
+    """Current vs last-year overall summary in the tool's output shape (shared with the async tools)."""
+    month_name = datetime(latest_year, month_num, 1).strftime("%B")
+    previous_year = latest_year - 1
+    current_summary, last_year_summary = (
+        _format_overall_summary(store_id, year, month_num, aggregates[year])
+        if year in aggregates else None
+        for year in (latest_year, previous_year)
+    )
+
+    # Build result
+    result = {
+        "Current Year Summary": current_summary or f"No data found for {month_name} {latest_year}.",
+        "Last Year Summary": last_year_summary or f"No data found for {month_name} {previous_year}.",
+        "Parameters Used": {
+            "Month": month_name,
+            "Current Year": latest_year,
+            "Comparison Year": previous_year,
+            "Store ID": store_id or "All Stores"
+        }
+    }
 
-        return summary
-
-    except Exception as e:
-        print(f"❌ Error fetching overall summary for {year}-{month}: {e}")
-        return None
+    # Convert NumPy types → native Python (compact keys when TOOL_RESPONSE_FORMAT=compact)
+    result = convert_numpy_types(result)
+    return format_tool_payload("overall_summary", result)
 
 
 # ----------------------------------------------------------------
@@ -441,75 +638,180 @@ def get_overall_category_summary(month_name: str = "", store_id: str = ""):
     - If month_name is not given → uses latest available month in DB.
     - If store_id is provided → filters summary to that store.
     """
+    try:
+        # 1️⃣ Validate the requested month (None → latest available)
+        month_num = None
+        if month_name:
+            month_num = _parse_month_name(month_name)
+            if not month_num:
+                return {"error": f"Invalid month name '{month_name}'. Use full names (e.g., 'January')."}
 
-    def convert_numpy_types(obj):
-        """Recursively convert numpy scalar types to native Python types."""
-        if isinstance(obj, dict):
-            return {k: convert_numpy_types(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [convert_numpy_types(x) for x in obj]
-        elif isinstance(obj, (np.integer, np.int32, np.int64)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float32, np.float64)):
-            return float(obj)
-        else:
-            return obj
+        # 2️⃣ Resolve period from the cached date bounds + fetch both summaries
+        period = get_date_bounds().resolve(month_num)
+        if period is None:
+            return {"error": "No inventory data found in the database."}
 
-    try:
-        engine = create_engine("sqlite:///data/db_files/inventory.db", echo=False)
+        latest_year, month_num = period
+        aggregates = _overall_yoy(store_id, latest_year, month_num)
 
-        # 1️⃣ Load date info
-        with engine.connect() as conn:
-            df_dates = pd.read_sql_query("SELECT Date FROM inventory", conn)
+        # 3️⃣ Build comparative result
+        return _overall_summary_result(store_id, latest_year, month_num, aggregates)
 
-        if df_dates.empty:
-            return {"error": "No inventory data found in the database."}
+    except Exception as e:
+        print(f"❌ Error computing overall category summary: {e}")
+        return {"error": str(e)}
 
-        df_dates["Date"] = pd.to_datetime(df_dates["Date"], errors="coerce")
-        df_dates = df_dates.dropna(subset=["Date"])
-        df_dates["Year"] = df_dates["Date"].dt.year
-        df_dates["Month"] = df_dates["Date"].dt.month
 
-        # 2️⃣ Determine month/year for current & comparison
-        if month_name:
-            month_map = {m.lower(): i for i, m in enumerate([
-                "January", "February", "March", "April", "May", "June",
-                "July", "August", "September", "October", "November", "December"
-            ], start=1)}
-            month_num = month_map.get(month_name.lower())
-            if not month_num:
-                return {"error": f"Invalid month name '{month_name}'. Use full names (e.g., 'January')."}
 
-            latest_year = int(df_dates["Year"].max())
-        else:
-            latest_row = df_dates.loc[df_dates["Date"].idxmax()]
-            latest_year = int(latest_row["Year"])
-            month_num = int(latest_row["Month"])
-            month_name = datetime(latest_year, month_num, 1).strftime("%B")
-
-        previous_year = latest_year - 1
-
-        # 3️⃣ Fetch summaries
-        current_summary = _fetch_overall_summary_for_month(engine, store_id, latest_year, month_num)
-        last_year_summary = _fetch_overall_summary_for_month(engine, store_id, previous_year, month_num)
-
-        # 4️⃣ Build result
-        result = {
-            "Current Year Summary": current_summary or f"No data found for {month_name} {latest_year}.",
-            "Last Year Summary": last_year_summary or f"No data found for {month_name} {previous_year}.",
-            "Parameters Used": {
-                "Month": month_name,
+
+# ----------------------------------------------------------------
+# Batch: many products × stores, current + last year, one query
+# ----------------------------------------------------------------
+def _products_batch_query(engine, periods: dict, store_ids: list):
+    """
+    (statement, params) aggregating every product (× store when store_ids is given) for the
+    resolved months of both years, grouped in one pass over monthly_product_store.
+    """
+    store_sql = ' AND r."Store ID" IN :sids' if store_ids else ""
+    store_group = ', r."Store ID"' if store_ids else ""
+    scope_sql = 'v."Product ID" = r."Product ID"' + (' AND v."Store ID" = r."Store ID"' if store_ids else "")
+    years = sorted({year for year, _ in periods.values()} | {year - 1 for year, _ in periods.values()})
+    params = {
+        "pids": list(periods),
+        "years": years,
+        "months": sorted({month for _, month in periods.values()}),
+    }
+    if store_ids:
+        params["sids"] = list(store_ids)
+
+    statement = text(f"""
+        SELECT
+            r."Product ID" AS product_id,
+            {'r."Store ID"' if store_ids else "''"} AS store_id,
+            r.year, r.month,
+            MIN(r."Product Name") AS product_name,
+            MIN(r.Category) AS category,
+            {_ROLLUP_METRICS_SQL},
+            {_histogram_subqueries(engine, scope_sql, month_sql="r.month")}
+        FROM monthly_product_store r
+        WHERE r."Product ID" IN :pids AND r.year IN :years AND r.month IN :months{store_sql}
+        GROUP BY r."Product ID"{store_group}, r.year, r.month
+    """).bindparams(*(bindparam(name, expanding=True) for name in params))
+    return statement, params
+
+
+def _batch_rows_to_aggregates(rows, periods: dict):
+    """Keeps rows matching each product's (current / previous year, month) → {(pid, sid, year): aggregates}."""
+    aggregates = {}
+    for row in rows:
+        current_year, month_num = periods[row.product_id]
+        if not row.row_count or row.month != month_num or row.year not in (current_year, current_year - 1):
+            continue
+        aggregates[(row.product_id, row.store_id, int(row.year))] = {
+            **row._mapping, "regions": _split_regions(row.regions)
+        }
+    return aggregates
+
+
+def _fetch_products_batch(engine, periods: dict, store_ids: list):
+    statement, params = _products_batch_query(engine, periods, store_ids)
+    with engine.connect() as conn:
+        rows = conn.execute(statement, params).all()
+    aggregates = _batch_rows_to_aggregates(rows, periods)
+    _settle_row_means(engine, _batch_row_mean_scopes(aggregates, periods))
+    return aggregates
+
+
+def _format_batch_metrics(agg: dict):
+    """One year's metrics for a batch entry (identity fields live on the entry itself)."""
+    return {
+        "Inventory Level (Total)": round(float(agg["total_inventory"]), 2),
+        "Units Sold (Total)": round(float(agg["total_units_sold"]), 2),
+        "Units Ordered (Total)": round(float(agg["total_units_ordered"]), 2),
+        "Average Price": round(float(agg["avg_price"]), 2),
+        "Average Discount": round(float(agg["avg_discount"]), 2),
+        "Average Competitor Pricing": round(float(agg["avg_comp_price"]), 2),
+        "Most Common Weather Condition": agg["weather_mode"],
+        "Most Common Seasonality": agg["season_mode"],
+        "Regions": agg["regions"]
+    }
+
+
+def _products_batch_result(periods: dict, store_ids: list, aggregates: dict, missing: list, month_name: str):
+    """Compact batch result keyed by "<Product ID>" or "<Product ID>@<Store ID>" (shared with the async tools)."""
+    results = {}
+    for product_id, (latest_year, month_num) in periods.items():
+        for store_id in store_ids or [""]:
+            current, previous = (aggregates.get((product_id, store_id, year)) for year in (latest_year, latest_year - 1))
+            named = current or previous
+            month = datetime(latest_year, month_num, 1).strftime("%B")
+            results[f"{product_id}@{store_id}" if store_id else product_id] = {
+                "Product Name": named["product_name"] if named else "N/A",
+                "Category": named["category"] if named else "N/A",
+                "Store ID": store_id or "All Stores",
+                "Month": month,
                 "Current Year": latest_year,
-                "Comparison Year": previous_year,
-                "Store ID": store_id or "All Stores"
+                "Comparison Year": latest_year - 1,
+                "Current": _format_batch_metrics(current) if current else f"No data found for {month} {latest_year}.",
+                "Last Year": _format_batch_metrics(previous) if previous else f"No data found for {month} {latest_year - 1}."
             }
+
+    result = {
+        "Results": results,
+        "Parameters Used": {
+            "Product IDs": list(periods),
+            "Store IDs": list(store_ids) if store_ids else "All Stores",
+            "Month": month_name or "Latest available per product"
         }
+    }
+    if missing:
+        result["Products Without Data"] = missing
+    return format_tool_payload("products_batch", convert_numpy_types(result))
+
+
+def _resolve_batch_periods(product_ids: list, month_num, bounds=None):
+    """{product_id: (year, month)} for products with data, plus the list of unknown products."""
+    bounds = bounds or get_date_bounds()
+    periods, missing = {}, []
+    for product_id in dict.fromkeys(product_ids):
+        period = bounds.resolve(month_num, product_id=product_id)
+        if period is None:
+            missing.append(product_id)
+        else:
+            periods[product_id] = period
+    return periods, missing
 
-        # 5️⃣ Convert NumPy types → native Python
-        result = convert_numpy_types(result)
-        return result
+
+def get_products_context_batch(product_ids: list[str], store_ids: list[str] = None, month_name: str = ""):
+    """
+    Retrieves current vs last-year context for several products (and optionally several stores)
+    for one month, in a single query. Use instead of repeated get_product_context calls.
+    - store_ids omitted → each product is aggregated across all stores.
+    - month_name omitted → each product's latest month found in DB.
+    Returns a compact result keyed by "<Product ID>" or "<Product ID>@<Store ID>".
+    """
+    try:
+        product_ids, store_ids = _as_id_list(product_ids), _as_id_list(store_ids)
+
+        # 1️⃣ Validate the requested month (None → latest available per product)
+        month_num = None
+        if month_name:
+            month_num = _parse_month_name(month_name)
+            if not month_num:
+                return {"error": f"Invalid month name '{month_name}'. Use full names (e.g., 'January')."}
+
+        # 2️⃣ Resolve each product's period from the cached date bounds
+        periods, missing = _resolve_batch_periods(product_ids, month_num)
+        if not periods:
+            return {"error": f"No data found for Products {', '.join(product_ids)}"}
+
+        # 3️⃣ One grouped query for every product × store × year
+        aggregates = _products_batch(periods, store_ids)
+
+        # 4️⃣ Build compact keyed result
+        return _products_batch_result(periods, store_ids, aggregates, missing, month_name)
 
     except Exception as e:
-        print(f"❌ Error computing overall category summary: {e}")
+        print(f"❌ Error fetching batch product context for {product_ids}: {e}")
         return {"error": str(e)}
 
@@ -0,0 +1,42 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ----------------------------------------------------------------
+# Bounded thread pool for blocking work called from async tools
+# (pandas / numpy aggregation, embeddings, sync SDK calls)
+# ----------------------------------------------------------------
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Process-wide executor sized by TOOL_EXECUTOR_WORKERS (default: min(8, CPUs + 4)),
+    so concurrent tool calls cannot spawn unbounded threads.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                default_workers = min(8, (os.cpu_count() or 1) + 4)
+                workers = int(os.environ.get("TOOL_EXECUTOR_WORKERS", "") or default_workers)
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tool-worker")
+    return _executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Runs func(*args, **kwargs) on the bounded executor without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -0,0 +1,590 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from tools.data_version import get_data_version
+from tools.db_engine import get_backend_name, get_engine
+from tools.db_tools import MONTH_NAMES, _normalise_value, _parse_month_name, convert_numpy_types
+from tools.parquet_backend import get_parquet_inventory
+from tools.resident_inventory import get_resident_inventory
+
+
+# ----------------------------------------------------------------
+# Baseline demand forecaster: monthly Units Sold per (Product ID, Store ID)
+# and per Product ID across stores, from the monthly rollups (INVENTORY_BACKEND=sql)
+# or the rows of the resident snapshot / Parquet dataset.
+# Three models are fitted for every series at once with numpy:
+# - seasonal naive        → same month last year
+# - exponential smoothing → level with a per-series alpha picked on one-step errors
+# - regression            → ridge on Price / Discount / Competitor Pricing / Seasonality
+# The model with the lowest backtest MAE over each series' last BACKTEST_MONTHS
+# observed months is reported, with a 95% interval from its residuals.
+# Fits are cached per data version, so a forecast is a lookup plus a few vector ops.
+# ----------------------------------------------------------------
+MODEL_NAMES = ["Seasonal Naive", "Exponential Smoothing", "Regression"]
+SES_ALPHAS = np.round(np.arange(0.1, 1.0, 0.1), 2)
+BACKTEST_MONTHS = 6
+RIDGE_LAMBDA = 1e-3
+Z_95 = 1.96
+
+SUM_COLUMNS = [
+    "units_sold_sum", "price_sum", "price_count", "discount_sum", "discount_count", "comp_price_sum", "comp_price_count"
+]
+
+_MONTHLY_SQL = text(f"""
+    SELECT "Product ID" AS product_id, "Store ID" AS store_id, year, month, {", ".join(SUM_COLUMNS)}
+    FROM monthly_product_store
+""")
+
+_SEASON_SQL = text("""
+    SELECT "Product ID" AS product_id, "Store ID" AS store_id, year, month, value, cnt, first_seen, first_row
+    FROM monthly_value_counts
+    WHERE attribute = 'Seasonality'
+""")
+
+
+# ----------------------------------------------------------------
+# Monthly history → dense panels (series × months)
+# ----------------------------------------------------------------
+MONTH_KEYS = ["product_id", "store_id", "year", "month"]
+
+# inventory columns → history frame columns (row_order: position in table order, mode tie-breaks)
+HISTORY_COLUMNS = {
+    "Product ID": "product_id", "Store ID": "store_id", "Date": "date", "row_order": "row_order",
+    "Units Sold": "units_sold", "Price": "price", "Discount": "discount",
+    "Competitor Pricing": "comp_price", "Seasonality": "season",
+}
+
+
+def load_monthly_sums(engine=None):
+    """(sums, season_counts) frames at product × store × month grain from the rollup tables."""
+    with (engine or get_engine()).connect() as conn:
+        sums = pd.DataFrame(conn.execute(_MONTHLY_SQL).mappings().all())
+        seasons = pd.DataFrame(conn.execute(_SEASON_SQL).mappings().all())
+    return sums, seasons
+
+
+def aggregate_monthly_rows(rows: pd.DataFrame):
+    """
+    Monthly partial sums (with units_sold_count) and Seasonality counts for daily rows in the
+    HISTORY_COLUMNS layout; partials of several chunks add up (batch_forecast.py).
+    """
+    grouped = rows.groupby(MONTH_KEYS, as_index=False)
+    sums = grouped.agg(
+        units_sold_sum=("units_sold", "sum"), units_sold_count=("units_sold", "count"),
+        price_sum=("price", "sum"), price_count=("price", "count"),
+        discount_sum=("discount", "sum"), discount_count=("discount", "count"),
+        comp_price_sum=("comp_price", "sum"), comp_price_count=("comp_price", "count"),
+    )
+    seasons = (
+        rows.dropna(subset=["season"])
+        .groupby(MONTH_KEYS + ["season"], as_index=False)
+        .agg(cnt=("date", "size"), first_seen=("date", "min"), first_row=("row_order", "min"))
+        .rename(columns={"season": "value"})
+    )
+    return sums, seasons
+
+
+def finish_monthly_sums(sums: pd.DataFrame) -> pd.DataFrame:
+    """SQL SUM of only NULLs is NULL, pandas gives 0 → match the rollups; keeps the load_monthly_sums() columns."""
+    sums.loc[sums["units_sold_count"] == 0, "units_sold_sum"] = np.nan
+    return sums[MONTH_KEYS + SUM_COLUMNS]
+
+
+def monthly_sums_from_rows(rows: pd.DataFrame):
+    """(sums, seasons) in the load_monthly_sums() layout from inventory rows (resident / parquet backends)."""
+    rows = rows.rename(columns=HISTORY_COLUMNS)
+    if "date" not in rows:
+        rows["date"] = pd.NaT
+    sums, seasons = aggregate_monthly_rows(rows)
+    return finish_monthly_sums(sums), seasons
+
+
+_DATA_END_SQL = text("SELECT MAX(Date) FROM inventory WHERE year = :year AND month = :month")
+
+
+def sql_month_end(engine):
+    """month_end(year, month) → latest Date of that month in `inventory` (None when it has no rows)."""
+
+    def month_end(year: int, month: int):
+        with engine.connect() as conn:
+            return conn.execute(_DATA_END_SQL, {"year": year, "month": month}).scalar()
+
+    return month_end
+
+
+def drop_partial_month(sums: pd.DataFrame, seasons: pd.DataFrame, month_end):
+    """
+    Removes the latest month from (sums, seasons) when the data stops before its last day
+    (e.g. loaded through the 14th), so a truncated month never becomes the SES level, the
+    naive base or "Last Observed". That month is then the next one forecast.
+    month_end(year, month) → the month's latest date (sql_month_end or a backend's month_end).
+    """
+    if not len(sums):
+        return sums, seasons
+    year, month = divmod(int((sums["year"].astype(int) * 12 + sums["month"].astype(int) - 1).max()), 12)
+    month += 1
+    data_end = month_end(year, month)
+    if data_end is None or pd.isna(data_end):
+        return sums, seasons
+    data_end = pd.Timestamp(data_end)
+    if data_end.day >= data_end.days_in_month:
+        return sums, seasons
+
+    print(f"⚠️ {MONTH_NAMES[month - 1]} {year} only has data through {data_end.date()} → left out of the forecast base")
+
+    def complete(frame):
+        if not len(frame):
+            return frame
+        return frame[~((frame["year"].astype(int) == year) & (frame["month"].astype(int) == month))]
+
+    return complete(sums), complete(seasons)
+
+
+def load_history():
+    """
+    (sums, seasons) for the forecaster from the configured backend (INVENTORY_BACKEND), latest
+    partial month dropped: sql → the rollup tables, resident / parquet → their rows.
+    """
+    if get_backend_name() in ("resident", "parquet"):
+        source = get_resident_inventory() if get_backend_name() == "resident" else get_parquet_inventory()
+        return drop_partial_month(*monthly_sums_from_rows(source.history_rows()), source.month_end)
+    engine = get_engine()
+    return drop_partial_month(*load_monthly_sums(engine), sql_month_end(engine))
+
+
+def monthly_series(sums: pd.DataFrame, seasons: pd.DataFrame, keys: list) -> pd.DataFrame:
+    """
+    One row per series key × month: units, mean price / discount / competitor price and the
+    Seasonality mode (count DESC, first in table order, earliest first_seen, then value — same tie-break
+    as the tools).
+    """
+    group = keys + ["year", "month"]
+    monthly = sums.groupby(group, as_index=False)[SUM_COLUMNS].sum(min_count=1)
+    monthly["units"] = monthly["units_sold_sum"].astype(float)
+    for name in ("price", "discount", "comp_price"):
+        monthly[name] = monthly[f"{name}_sum"].astype(float) / monthly[f"{name}_count"].replace(0, np.nan)
+
+    if len(seasons):
+        counts = seasons.groupby(group + ["value"], as_index=False).agg(
+            cnt=("cnt", "sum"), first_row=("first_row", "min"), first_seen=("first_seen", "min")
+        )
+        counts = counts.sort_values(group + ["cnt", "first_row", "first_seen", "value"],
+                                    ascending=[True] * len(group) + [False, True, True, True])
+        modes = counts.drop_duplicates(group)[group + ["value"]].rename(columns={"value": "season"})
+        monthly = monthly.merge(modes, on=group, how="left")
+    else:
+        monthly["season"] = None
+    return monthly[group + ["units", "price", "discount", "comp_price", "season"]]
+
+
+class Panel:
+    """
+    Dense monthly arrays for many series:
+    keys[s] → series key tuple; column t ↔ period index base + t (year * 12 + month - 1).
+    """
+
+    def __init__(self, monthly: pd.DataFrame, keys: list, seasons: list = None):
+        period = (monthly["year"].astype(int) * 12 + monthly["month"].astype(int) - 1).to_numpy()
+        self.base = int(period.min()) if len(period) else 0
+        self.n_periods = int(period.max()) - self.base + 1 if len(period) else 0
+
+        key_frame = monthly[keys].astype(str)
+        codes, uniques = pd.factorize(pd.MultiIndex.from_frame(key_frame), sort=True)
+        self.keys = [tuple(key) for key in uniques]
+        self.lookup = {key: i for i, key in enumerate(self.keys)}
+        shape = (len(self.keys), self.n_periods)
+        columns = period - self.base
+
+        def dense(values):
+            array = np.full(shape, np.nan)
+            array[codes, columns] = values
+            return array
+
+        self.units = dense(monthly["units"].to_numpy(float))
+        self.price = dense(monthly["price"].to_numpy(float))
+        self.discount = dense(monthly["discount"].to_numpy(float))
+        self.comp_price = dense(monthly["comp_price"].to_numpy(float))
+
+        self.season_labels = seasons or sorted(monthly["season"].dropna().unique().tolist())
+        season_codes = monthly["season"].map({label: i for i, label in enumerate(self.season_labels)})
+        self.season = np.full(shape, -1, dtype=np.int16)
+        self.season[codes, columns] = season_codes.fillna(-1).to_numpy(np.int16)
+
+        observed = ~np.isnan(self.units)
+        self.last_observed = np.where(observed.any(axis=1), self.n_periods - 1 - np.argmax(observed[:, ::-1], axis=1), -1)
+
+    def period_label(self, t: int) -> str:
+        year, month = divmod(self.base + int(t), 12)
+        return f"{MONTH_NAMES[month]} {year}"
+
+    def features(self, price, discount, comp_price, season):
+        """Design matrix [..., k]: intercept, Price, Discount, Competitor Pricing, Seasonality one-hot (first dropped)."""
+        one_hot = [(season == i).astype(float) for i in range(1, len(self.season_labels))]
+        return np.stack([np.ones_like(price), price, discount, comp_price] + one_hot, axis=-1)
+
+
+# ----------------------------------------------------------------
+# Bulk fitting (every series at once)
+# ----------------------------------------------------------------
+def _ridge(X, y, mask):
+    """Per-series ridge coefficients [S, k] over the masked months; NaN when too few points."""
+    weights = mask[..., None] * np.nan_to_num(X)
+    y = np.where(mask, y, 0.0)
+    k = X.shape[-1]
+    XtX = np.einsum("stk,stl->skl", weights, np.nan_to_num(X)) + RIDGE_LAMBDA * np.eye(k)
+    Xty = np.einsum("stk,st->sk", weights, y)
+    beta = np.linalg.solve(XtX, Xty[..., None])[..., 0]
+    beta[mask.sum(axis=1) < k + 2] = np.nan
+    return beta
+
+
+def _rms(errors):
+    with np.errstate(invalid="ignore"):
+        return np.sqrt(np.nanmean(errors ** 2, axis=1)) if errors.size else np.zeros(len(errors))
+
+
+def fit_panel(panel: Panel) -> dict:
+    """Fits the three models for every series; returns per-series parameter arrays."""
+    Y = panel.units
+    S, T = Y.shape
+    observed = ~np.isnan(Y)
+
+    # Backtest window: the BACKTEST_MONTHS months up to each series' last observation
+    t_index = np.arange(T)[None, :]
+    holdout = observed & (t_index > (panel.last_observed[:, None] - BACKTEST_MONTHS))
+
+    # 1️⃣ Seasonal naive: y[t] ≈ y[t - 12]
+    naive_pred = np.full_like(Y, np.nan)
+    naive_pred[:, 12:] = Y[:, :-12]
+    naive_err = Y - naive_pred
+
+    # 2️⃣ Simple exponential smoothing, all alphas in one pass over time
+    alphas = SES_ALPHAS[None, :]
+    level = np.full((S, len(SES_ALPHAS)), np.nan)
+    ses_err = np.full((S, len(SES_ALPHAS), T), np.nan)
+    for t in range(T):
+        y = Y[:, t][:, None]
+        has_value = ~np.isnan(y)
+        update = has_value & ~np.isnan(level)
+        ses_err[:, :, t] = np.where(update, y - level, np.nan)
+        level = np.where(update, level + alphas * (y - level), np.where(has_value & np.isnan(level), y, level))
+    with np.errstate(invalid="ignore"):
+        mse = np.nanmean(ses_err ** 2, axis=2)
+    best_alpha = np.argmin(np.where(np.isnan(mse), np.inf, mse), axis=1)
+    rows = np.arange(S)
+    ses_level = level[rows, best_alpha]
+    ses_err = ses_err[rows, best_alpha, :]
+
+    # 3️⃣ Regression on price / discount / competitor pricing / seasonality
+    X = panel.features(panel.price, panel.discount, panel.comp_price, panel.season)
+    usable = observed & ~np.isnan(X).any(axis=-1)
+    beta = _ridge(X, Y, usable)
+    beta_train = _ridge(X, Y, usable & ~holdout)
+    reg_err = Y - np.einsum("stk,sk->st", np.nan_to_num(X), beta)
+    reg_err[~usable] = np.nan
+    backtest_reg_err = Y - np.einsum("stk,sk->st", np.nan_to_num(X), beta_train)
+    backtest_reg_err[~(usable & holdout)] = np.nan
+    n_usable = usable.sum(axis=1)
+    dof = np.maximum(n_usable - X.shape[-1], 1)
+
+    # Backtest MAE per model over the holdout months → chosen model per series
+    with np.errstate(invalid="ignore"):
+        mae = np.stack([
+            np.nanmean(np.abs(np.where(holdout, naive_err, np.nan)), axis=1),
+            np.nanmean(np.abs(np.where(holdout, ses_err, np.nan)), axis=1),
+            np.nanmean(np.abs(backtest_reg_err), axis=1),
+        ], axis=1)
+        sigma = np.stack([
+            _rms(naive_err),
+            _rms(ses_err),
+            np.sqrt(np.nansum(reg_err ** 2, axis=1) / dof),
+        ], axis=1)
+    # Series too short for any backtest → exponential smoothing (defined from one observation)
+    chosen = np.where(np.isnan(mae).all(axis=1), 1, np.argmin(np.where(np.isnan(mae), np.inf, mae), axis=1))
+    # Without residuals, fall back to the spread of the series itself
+    with np.errstate(invalid="ignore"):
+        spread = np.nan_to_num(np.nanstd(Y, axis=1))
+    sigma = np.where(np.isnan(sigma), spread[:, None], sigma)
+
+    return {
+        "alpha": SES_ALPHAS[best_alpha],
+        "level": ses_level,
+        "beta": beta,
+        "mae": mae,
+        "sigma": sigma,
+        "chosen": chosen,
+    }
+
+
+# ----------------------------------------------------------------
+# Forecasts (vectorised over series)
+# ----------------------------------------------------------------
+def _same_month_back(panel: Panel, series, target):
+    """(column, years back) of the latest observed same-month period before each target; column -1 if none."""
+    column = np.full(len(series), -1)
+    years_back = np.zeros(len(series), dtype=int)
+    for k in range(1, 6):
+        candidate = target - 12 * k
+        valid = (column < 0) & (candidate >= 0) & (candidate <= panel.last_observed[series])
+        valid[valid] &= ~np.isnan(panel.units[series[valid], candidate[valid]])
+        column[valid], years_back[valid] = candidate[valid], k
+    return column, years_back
+
+
+def forecast_panel(panel: Panel, fitted: dict, series, target) -> dict:
+    """
+    Forecasts for series[i] at period column target[i] (beyond its last observation).
+    Returns arrays: models [n, 3], point, low, high, chosen, same_month.
+    """
+    series, target = np.asarray(series), np.asarray(target)
+    n = len(series)
+    horizon = target - panel.last_observed[series]
+    column, years_back = _same_month_back(panel, series, target)
+    has_same_month = column >= 0
+    safe_column = np.where(has_same_month, column, 0)
+
+    same_month = np.where(has_same_month, panel.units[series, safe_column], np.nan)
+    models = np.full((n, 3), np.nan)
+    models[:, 0] = same_month
+    models[:, 1] = fitted["level"][series]
+
+    # Regression exogenous values: same month last year, else the last observed month
+    exog_column = np.where(has_same_month, safe_column, np.maximum(panel.last_observed[series], 0))
+    X = panel.features(
+        panel.price[series, exog_column], panel.discount[series, exog_column],
+        panel.comp_price[series, exog_column], panel.season[series, exog_column]
+    )
+    models[:, 2] = np.einsum("sk,sk->s", X, fitted["beta"][series])
+
+    chosen = fitted["chosen"][series].copy()
+    # Chosen model unavailable for this target (e.g. no same-month history) → exponential smoothing
+    chosen[np.isnan(models[np.arange(n), chosen])] = 1
+    point = np.maximum(models[np.arange(n), chosen], 0.0)
+
+    # Interval widens with horizon: SES σ²(1 + (h-1)α²), seasonal naive σ√k, regression σ
+    sigma = fitted["sigma"][series, chosen]
+    alpha = fitted["alpha"][series]
+    scale = np.select(
+        [chosen == 0, chosen == 1],
+        [np.sqrt(np.maximum(years_back, 1)), np.sqrt(1 + np.maximum(horizon - 1, 0) * alpha ** 2)],
+        default=1.0,
+    )
+    half_width = Z_95 * sigma * scale
+    return {
+        "models": models,
+        "point": point,
+        "low": np.maximum(point - half_width, 0.0),
+        "high": point + half_width,
+        "chosen": chosen,
+        "horizon": horizon,
+        "same_month": same_month,
+    }
+
+
+def target_column(panel: Panel, series: int, month_num=None) -> int:
+    """Next month after the series' last observation, or the next occurrence of month_num."""
+    last = int(panel.last_observed[series])
+    if not month_num:
+        return last + 1
+    last_month = (panel.base + last) % 12 + 1
+    return last + ((month_num - last_month - 1) % 12) + 1
+
+
+# ----------------------------------------------------------------
+# Forecast rows: one flat record per series × target month.
+# Same columns as the precomputed `forecasts` table (batch_forecast.py),
+# so live and precomputed answers go through forecast_payload alike.
+# ----------------------------------------------------------------
+MODEL_KEYS = ["naive", "ses", "regression"]
+FORECAST_COLUMNS = (
+    ["Product ID", "Store ID", "year", "month", "horizon", "forecast_units", "low", "high", "model"]
+    + [f"{key}_units" for key in MODEL_KEYS]
+    + [f"{key}_mae" for key in MODEL_KEYS]
+    + ["same_month_units", "last_year", "last_month", "last_units"]
+)
+
+
+def forecast_columns(panel: Panel, fitted: dict, series, target) -> dict:
+    """FORECAST_COLUMNS → arrays for series[i] at period column target[i] ("Store ID" is "" for product panels)."""
+    series, target = np.asarray(series, dtype=int), np.asarray(target, dtype=int)
+    result = forecast_panel(panel, fitted, series, target)
+    period = panel.base + target
+    last = panel.last_observed[series]
+    last_period = panel.base + last
+    keys = [panel.keys[s] for s in series]
+
+    frame = {
+        "Product ID": [key[0] for key in keys],
+        "Store ID": [key[1] if len(key) > 1 else "" for key in keys],
+        "year": period // 12,
+        "month": period % 12 + 1,
+        "horizon": result["horizon"],
+        "forecast_units": result["point"],
+        "low": result["low"],
+        "high": result["high"],
+        "model": [MODEL_NAMES[c] for c in result["chosen"]],
+    }
+    for i, key in enumerate(MODEL_KEYS):
+        frame[f"{key}_units"] = result["models"][:, i]
+    for i, key in enumerate(MODEL_KEYS):
+        frame[f"{key}_mae"] = fitted["mae"][series, i]
+    frame["same_month_units"] = result["same_month"]
+    frame["last_year"] = last_period // 12
+    frame["last_month"] = last_period % 12 + 1
+    frame["last_units"] = panel.units[series, last]
+    return frame
+
+
+def forecast_frame(panel: Panel, fitted: dict, series, target) -> pd.DataFrame:
+    return pd.DataFrame(forecast_columns(panel, fitted, series, target), columns=FORECAST_COLUMNS)
+
+
+def forecast_payload(row) -> dict:
+    """Tool payload for one forecast row (a FORECAST_COLUMNS mapping)."""
+
+    def units(value):
+        return None if pd.isna(value) else int(round(max(float(value), 0.0)))
+
+    def mae(value):
+        return None if pd.isna(value) else round(float(value), 2)
+
+    return {
+        "Product ID": row["Product ID"],
+        "Store ID": row["Store ID"] or "All Stores",
+        "Forecast Period": f"{MONTH_NAMES[int(row['month']) - 1]} {int(row['year'])}",
+        "Horizon (months)": int(row["horizon"]),
+        "Forecast Units Sold": units(row["forecast_units"]),
+        "Interval (95%)": {"Low": units(row["low"]), "High": units(row["high"])},
+        "Model": row["model"],
+        "Model Forecasts": {name: units(row[f"{key}_units"]) for name, key in zip(MODEL_NAMES, MODEL_KEYS)},
+        "Backtest MAE": {name: mae(row[f"{key}_mae"]) for name, key in zip(MODEL_NAMES, MODEL_KEYS)},
+        "Last Observed": {
+            "Period": f"{MONTH_NAMES[int(row['last_month']) - 1]} {int(row['last_year'])}",
+            "Units Sold (Total)": units(row["last_units"]),
+        },
+        "Same Month Last Year Units Sold": units(row["same_month_units"]),
+    }
+
+
+# ----------------------------------------------------------------
+# Process-wide forecaster, refitted only when the data version changes
+# ----------------------------------------------------------------
+class DemandForecaster:
+    """Fitted models for every product × store series and every product across stores."""
+
+    def __init__(self, sums: pd.DataFrame, seasons: pd.DataFrame, data_version: int = 0):
+        self.data_version = data_version
+        store_monthly = monthly_series(sums, seasons, ["product_id", "store_id"])
+        product_monthly = monthly_series(sums, seasons, ["product_id"])
+        labels = sorted(store_monthly["season"].dropna().unique().tolist())
+        self.panels = {
+            "store": Panel(store_monthly, ["product_id", "store_id"], labels),
+            "product": Panel(product_monthly, ["product_id"], labels),
+        }
+        self.fits = {name: fit_panel(panel) for name, panel in self.panels.items()}
+
+    def forecast(self, product_id: str, store_id: str = "", month_num=None):
+        """Forecast dict for one series, or None if the product (in that store) has no history."""
+        scope = "store" if store_id else "product"
+        panel, fitted = self.panels[scope], self.fits[scope]
+        series = panel.lookup.get((product_id, store_id) if store_id else (product_id,))
+        if series is None:
+            return None
+        columns = forecast_columns(panel, fitted, [series], [target_column(panel, series, month_num)])
+        return forecast_payload({name: values[0] for name, values in columns.items()})
+
+
+_forecaster = None
+_forecaster_lock = threading.Lock()
+
+
+def get_demand_forecaster() -> DemandForecaster:
+    global _forecaster
+    data_version = get_data_version()
+    if _forecaster is None or _forecaster.data_version != data_version:
+        with _forecaster_lock:
+            if _forecaster is None or _forecaster.data_version != data_version:
+                _forecaster = DemandForecaster(*load_history(), data_version)
+    return _forecaster
+
+
+# ----------------------------------------------------------------
+# Precomputed forecasts (batch_forecast.py → `forecasts` table)
+# FORECAST_SOURCE=precomputed → product × store asks are answered from the table
+# when it holds rows for the current data version; anything else is computed live.
+# ----------------------------------------------------------------
+FORECASTS_TABLE = "forecasts"
+
+_PRECOMPUTED_SQL = f"""
+    SELECT {", ".join(f'"{column}"' for column in FORECAST_COLUMNS)}
+    FROM {FORECASTS_TABLE}
+    WHERE "Product ID" = :product_id AND "Store ID" = :store_id AND data_version = :data_version
+"""
+
+
+def get_forecast_source() -> str:
+    return os.environ.get("FORECAST_SOURCE", "").strip().lower() or "live"
+
+
+def lookup_precomputed_forecast(product_id: str, store_id: str, month_num=None):
+    """Forecast dict from the batch table, or None if it has no current row for this series / month."""
+    sql = _PRECOMPUTED_SQL + (" AND month = :month" if month_num else " AND horizon = 1") + " ORDER BY horizon LIMIT 1"
+    params = {"product_id": product_id, "store_id": store_id, "data_version": get_data_version(), "month": month_num}
+    try:
+        with get_engine().connect() as conn:
+            row = conn.execute(text(sql), params).mappings().first()
+    except SQLAlchemyError:
+        # Table not built yet
+        return None
+    return forecast_payload(row) if row else None
+
+
+def normalise_forecast_arguments(arguments: dict) -> dict:
+    """Cache-key form of forecast arguments; an empty month stays empty (it means "next month")."""
+    arguments = {k: _normalise_value(v) for k, v in arguments.items()}
+    month_num = _parse_month_name(arguments.get("month_name") or "")
+    if month_num:
+        arguments["month_name"] = MONTH_NAMES[month_num - 1]
+    return arguments
+
+
+# ----------------------------------------------------------------
+# FUNCTION TOOL
+# ----------------------------------------------------------------
+def forecast_demand(product_id: str, store_id: str = "", month_name: str = ""):
+    """
+    Forecasts monthly Units Sold for a product (optionally in one store) with baseline models
+    (seasonal naive, exponential smoothing, regression on price/discount/competitor pricing/seasonality).
+    - month_name omitted → the month after the latest data; otherwise the next occurrence of that month.
+    - store_id omitted → the product across all stores.
+    Returns the point forecast, a 95% interval, the chosen model and every model's forecast.
+    """
+    try:
+        # 1️⃣ Validate the requested month (None → next month)
+        month_num = None
+        if month_name:
+            month_num = _parse_month_name(month_name)
+            if not month_num:
+                return {"error": f"Invalid month name '{month_name}'. Use full names (e.g., 'January')."}
+
+        # 2️⃣ Precomputed batch forecast if enabled, else the fitted models for the current data version
+        result = None
+        if store_id and get_forecast_source() == "precomputed":
+            result = lookup_precomputed_forecast(product_id, store_id, month_num)
+        if result is None:
+            result = get_demand_forecaster().forecast(product_id, store_id, month_num)
+        if result is None:
+            scope = f" in Store {store_id}" if store_id else ""
+            return {"error": f"No sales history found for Product {product_id}{scope}"}
+
+        # 3️⃣ Native types for the tool payload
+        return convert_numpy_types(result)
+
+    except Exception as e:
+        print(f"❌ Error forecasting demand for {product_id}: {e}")
+        return {"error": str(e)}
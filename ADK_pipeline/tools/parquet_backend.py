@@ -0,0 +1,351 @@
+# Parquet / Arrow columnar copy of `inventory` (INVENTORY_BACKEND=parquet).
+# Export or refresh from ADK_pipeline/:
+#   python -m tools.parquet_backend                      → full export of the inventory table
+#   python -m tools.parquet_backend --months 2024-01     → rewrite only the listed month partitions
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+from tools.data_version import get_data_version, read_data_version
+from tools.db_engine import create_db_engine, get_db_url, row_order_column
+from tools.row_means import group_mean, series_mean
+
+
+# ----------------------------------------------------------------
+# Dataset layout: <path>/year=YYYY/month=M/*.parquet (hive partitioning)
+# A month-scoped lookup reads only its partitions (predicate pushdown on
+# year / month) and only the columns it aggregates (column pushdown).
+# ----------------------------------------------------------------
+DEFAULT_PARQUET_PATH = "data/parquet/inventory"
+META_FILE = "_meta.json"
+
+TEXT_COLUMNS = ["Date", "Store ID", "Product ID", "Category", "Region", "Weather Condition", "Seasonality",
+                "Product Name"]
+INTEGER_COLUMNS = ["Units Sold", "Units Ordered", "Inventory Level"]
+FLOAT_COLUMNS = ["Price", "Discount", "Competitor Pricing"]
+PARTITION_COLUMNS = ["year", "month"]
+# Position of the row in the `inventory` table (SQLite rowid) → reads come back in table order, so
+# mode ties break like Counter.most_common and means sum in the same order as the pandas tools
+ROW_ORDER_COLUMN = "row_order"
+
+# Columns each lookup needs besides its filters
+_METRIC_COLUMNS = INTEGER_COLUMNS + FLOAT_COLUMNS
+_MODE_COLUMNS = ["Date", ROW_ORDER_COLUMN, "Weather Condition", "Seasonality", "Region"]
+
+
+def get_parquet_path() -> str:
+    return os.environ.get("INVENTORY_PARQUET_PATH", "").strip() or DEFAULT_PARQUET_PATH
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    fields = [pa.field(name, pa.string()) for name in TEXT_COLUMNS]
+    fields += [pa.field(name, pa.int64()) for name in INTEGER_COLUMNS]
+    fields += [pa.field(name, pa.float64()) for name in FLOAT_COLUMNS]
+    fields += [pa.field(ROW_ORDER_COLUMN, pa.int64())]
+    fields += [pa.field(name, pa.int32()) for name in PARTITION_COLUMNS]
+    return pa.schema(fields)
+
+
+# ----------------------------------------------------------------
+# Export: inventory table → partitioned dataset
+# ----------------------------------------------------------------
+def _write_rows(engine, target: str, where_sql: str = "", params: dict = None, chunk_size: int = 200_000) -> int:
+    """Streams inventory rows (ordered by month, so chunks map to few partitions) into target."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    schema = _arrow_schema()
+    row_order = row_order_column(engine.dialect.name)
+    columns = ", ".join(
+        f"{row_order or 'NULL'} AS {name}" if name == ROW_ORDER_COLUMN else f'"{name}"' for name in schema.names
+    )
+    order_sql = f"ORDER BY year, month, {row_order}" if row_order else "ORDER BY year, month"
+    statement = text(f"SELECT {columns} FROM inventory {where_sql} {order_sql}")
+    partitioning = ds.partitioning(pa.schema([schema.field(name) for name in PARTITION_COLUMNS]), flavor="hive")
+    rows = 0
+    with engine.connect() as conn:
+        stream = conn.execution_options(stream_results=True)
+        for i, chunk in enumerate(pd.read_sql(statement, stream, params=params or {}, chunksize=chunk_size)):
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            ds.write_dataset(
+                table, target, format="parquet", partitioning=partitioning,
+                basename_template=f"part-{int(time.time())}-{i}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+            rows += len(chunk)
+    return rows
+
+
+def _write_meta(path: str, data_version: int, **details):
+    """Stamps the dataset with the DB data version it was exported at (other keys are kept)."""
+    meta_path = os.path.join(path, META_FILE)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = {}
+    meta.update(details, data_version=data_version,
+                exported_at=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def export_parquet_dataset(db_url: str = "", path: str = "", periods=None, chunk_size: int = 200_000) -> dict:
+    """
+    Writes `inventory` as a year / month partitioned Parquet dataset.
+    - periods=None → full export into a fresh directory, swapped in when complete.
+    - periods=[(year, month), ...] → only those partitions are deleted and rewritten
+      (run after `rds_sim.ingest --mode upsert` / `rds_sim.rollups --months`).
+    """
+    started = time.perf_counter()
+    engine = create_db_engine(db_url or get_db_url(), read_only=False)
+    path = path or get_parquet_path()
+    data_version = read_data_version(engine)
+
+    if periods is None:
+        staging, retired = path + ".tmp", path + ".old"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        rows = _write_rows(engine, staging, chunk_size=chunk_size)
+        _write_meta(staging, data_version, rows=rows)
+        shutil.rmtree(retired, ignore_errors=True)
+        if os.path.exists(path):
+            os.replace(path, retired)
+        os.replace(staging, path)
+        shutil.rmtree(retired, ignore_errors=True)
+    else:
+        rows = 0
+        os.makedirs(path, exist_ok=True)
+        for year, month in sorted(set(periods)):
+            shutil.rmtree(os.path.join(path, f"year={int(year)}", f"month={int(month)}"), ignore_errors=True)
+            rows += _write_rows(engine, path, "WHERE year = :year AND month = :month",
+                                {"year": int(year), "month": int(month)}, chunk_size)
+        _write_meta(path, data_version, rewritten_months=[f"{y}-{m:02d}" for y, m in sorted(set(periods))])
+    engine.dispose()
+
+    stats = {"rows": rows, "data_version": data_version, "seconds": round(time.perf_counter() - started, 3)}
+    print(f"✅ Parquet dataset written ({path}) → {stats}")
+    return stats
+
+
+# ----------------------------------------------------------------
+# Aggregation helpers (same semantics as the rollup SQL in tools/db_tools.py)
+# ----------------------------------------------------------------
+def _metric_totals(frame: pd.DataFrame, mean=series_mean) -> dict:
+    """Sums and averages of the rows (mean=group_mean for per-category groupby rows)."""
+    def total(column):
+        values = frame[column].dropna()
+        if not len(values):
+            return None
+        return int(values.sum()) if column in INTEGER_COLUMNS else float(values.sum())
+
+    return {
+        "row_count": int(len(frame)),
+        "total_units_sold": total("Units Sold"),
+        "total_units_ordered": total("Units Ordered"),
+        "total_inventory": total("Inventory Level"),
+        "avg_price": mean(frame["Price"].to_numpy()),
+        "avg_discount": mean(frame["Discount"].to_numpy()),
+        "avg_comp_price": mean(frame["Competitor Pricing"].to_numpy()),
+    }
+
+
+def _mode(frame: pd.DataFrame, column: str):
+    """Most frequent value (ties → first in table order, like Counter.most_common; else earliest date)."""
+    order = ROW_ORDER_COLUMN if ROW_ORDER_COLUMN in frame else "Date"
+    valid = frame[list(dict.fromkeys([column, "Date", order]))].dropna(subset=[column])
+    if valid.empty:
+        return None
+    counts = valid.groupby(column, sort=False).agg(
+        cnt=("Date", "size"), first_row=(order, "min"), first_seen=("Date", "min")
+    ).reset_index()
+    counts = counts.sort_values(["cnt", "first_row", "first_seen", column], ascending=[False, True, True, True])
+    return counts.iloc[0][column]
+
+
+def _profile(frame: pd.DataFrame) -> dict:
+    """Metric totals, Weather / Seasonality modes and distinct regions of the rows."""
+    return {
+        **_metric_totals(frame),
+        "weather_mode": _mode(frame, "Weather Condition"),
+        "season_mode": _mode(frame, "Seasonality"),
+        "regions": sorted(frame["Region"].dropna().unique().tolist()),
+    }
+
+
+def _first(values: pd.Series):
+    """MIN() of the non-null values."""
+    values = values.dropna()
+    return values.min() if len(values) else None
+
+
+# ----------------------------------------------------------------
+# Backend (same method names / return shapes as ResidentInventory)
+# ----------------------------------------------------------------
+class ParquetInventory:
+    """Reads the partitioned dataset with year / month predicates and only the needed columns."""
+
+    def __init__(self, path: str = ""):
+        import pyarrow.dataset as ds
+
+        self.path = path or get_parquet_path()
+        self.dataset = ds.dataset(self.path, format="parquet", partitioning="hive")
+        self.has_row_order = ROW_ORDER_COLUMN in self.dataset.schema.names
+        self.data_version = 0
+        try:
+            with open(os.path.join(self.path, META_FILE), encoding="utf-8") as f:
+                self.meta = json.load(f)
+        except (OSError, ValueError):
+            self.meta = {}
+
+    def _read(self, columns: list, years, months, filters: dict) -> pd.DataFrame:
+        """Rows of the year / month partitions matching filters ({column: value or list}, empty → no filter)."""
+        import pyarrow.dataset as ds
+
+        condition = ds.field("year").isin(sorted(years)) & ds.field("month").isin(sorted(months))
+        for column, value in filters.items():
+            if not value:
+                continue
+            field = ds.field(column)
+            condition &= field.isin(list(value)) if isinstance(value, (list, tuple, set)) else (field == value)
+        needed = [c for c in dict.fromkeys(columns + PARTITION_COLUMNS) if c != ROW_ORDER_COLUMN or self.has_row_order]
+        frame = self.dataset.to_table(columns=needed, filter=condition).to_pandas()
+        if ROW_ORDER_COLUMN in frame:
+            frame = frame.sort_values(ROW_ORDER_COLUMN, kind="stable", ignore_index=True)
+        return frame
+
+    def period_bounds(self):
+        """({product_id: (first, last)}, {category: (first, last)}) yyyymm bounds (three-column scan)."""
+        frame = self.dataset.to_table(columns=["Product ID", "Category"] + PARTITION_COLUMNS).to_pandas()
+        frame["period"] = frame["year"].astype(int) * 100 + frame["month"].astype(int)
+        bounds = []
+        for column in ("Product ID", "Category"):
+            grouped = frame.dropna(subset=[column]).groupby(column)["period"].agg(["min", "max"])
+            bounds.append({key: (int(row["min"]), int(row["max"])) for key, row in grouped.iterrows()})
+        return tuple(bounds)
+
+    def history_rows(self) -> pd.DataFrame:
+        """Every row with the columns the forecaster aggregates (tools/forecasting.py)."""
+        columns = ["Product ID", "Store ID", "Date", "Units Sold", "Price", "Discount", "Competitor Pricing",
+                   "Seasonality", ROW_ORDER_COLUMN]
+        needed = [c for c in columns + PARTITION_COLUMNS if c != ROW_ORDER_COLUMN or self.has_row_order]
+        frame = self.dataset.to_table(columns=needed).to_pandas()
+        if ROW_ORDER_COLUMN not in frame:
+            frame[ROW_ORDER_COLUMN] = float("nan")
+        return frame
+
+    def month_end(self, year: int, month: int):
+        """Latest Date in the year / month partition (None if it has no rows)."""
+        dates = self._read(["Date"], (year,), (month,), {})["Date"].dropna()
+        return dates.max() if len(dates) else None
+
+    def product_yoy(self, product_id: str, store_id: str, current_year: int, month_num: int):
+        columns = ["Product ID", "Store ID", "Product Name", "Category"] + _METRIC_COLUMNS + _MODE_COLUMNS
+        frame = self._read(columns, (current_year, current_year - 1), (month_num,),
+                           {"Product ID": product_id, "Store ID": store_id})
+        aggregates = {}
+        for year, rows in frame.groupby("year"):
+            aggregates[int(year)] = {
+                "product_name": _first(rows["Product Name"]),
+                "category": _first(rows["Category"]),
+                **_profile(rows),
+            }
+        return aggregates
+
+    def products_batch(self, periods: dict, store_ids: list):
+        """{(product_id, store_id, year): aggregates} for every product × store ("" → all stores)."""
+        columns = ["Product ID", "Store ID", "Product Name", "Category"] + _METRIC_COLUMNS + _MODE_COLUMNS
+        years = {year for year, _ in periods.values()} | {year - 1 for year, _ in periods.values()}
+        months = {month for _, month in periods.values()}
+        frame = self._read(columns, years, months, {"Product ID": list(periods), "Store ID": list(store_ids)})
+
+        aggregates = {}
+        group_keys = ["Product ID", "Store ID", "year", "month"] if store_ids else ["Product ID", "year", "month"]
+        for key, rows in frame.groupby(group_keys):
+            product_id, year, month = key[0], int(key[-2]), int(key[-1])
+            store_id = key[1] if store_ids else ""
+            current_year, month_num = periods[product_id]
+            if month != month_num or year not in (current_year, current_year - 1):
+                continue
+            aggregates[(product_id, store_id, year)] = {
+                "product_name": _first(rows["Product Name"]),
+                "category": _first(rows["Category"]),
+                **_profile(rows),
+            }
+        return aggregates
+
+    def category_yoy(self, category: str, store_id: str, current_year: int, month_num: int):
+        columns = ["Category", "Product ID", "Store ID"] + _METRIC_COLUMNS + _MODE_COLUMNS
+        frame = self._read(columns, (current_year, current_year - 1), (month_num,),
+                           {"Category": category, "Store ID": store_id})
+        aggregates = {}
+        for year, rows in frame.groupby("year"):
+            aggregates[int(year)] = {
+                "total_products": int(rows["Product ID"].nunique()),
+                "total_stores": int(rows["Store ID"].nunique()),
+                **_profile(rows),
+            }
+        return aggregates
+
+    def overall_yoy(self, store_id: str, current_year: int, month_num: int):
+        columns = ["Category", "Product ID", "Store ID", ROW_ORDER_COLUMN] + _METRIC_COLUMNS
+        frame = self._read(columns, (current_year, current_year - 1), (month_num,), {"Store ID": store_id})
+        aggregates = {}
+        for year, year_rows in frame.groupby("year"):
+            aggregates[int(year)] = {
+                "categories": [
+                    {
+                        "Category": category,
+                        "unique_products": int(rows["Product ID"].nunique()),
+                        "stores_count": int(rows["Store ID"].nunique()),
+                        **_metric_totals(rows, mean=group_mean),
+                    }
+                    for category, rows in year_rows.groupby("Category")
+                ],
+                "unique_products": int(year_rows["Product ID"].nunique()),
+            }
+        return aggregates
+
+
+# ----------------------------------------------------------------
+# Process-wide dataset handle, reopened when the data version changes
+# ----------------------------------------------------------------
+_parquet_inventory = None
+_parquet_lock = threading.Lock()
+
+
+def get_parquet_inventory() -> ParquetInventory:
+    global _parquet_inventory
+    data_version = get_data_version()
+    if _parquet_inventory is None or _parquet_inventory.data_version != data_version:
+        with _parquet_lock:
+            if _parquet_inventory is None or _parquet_inventory.data_version != data_version:
+                _parquet_inventory = ParquetInventory()
+                _parquet_inventory.data_version = data_version
+                exported = _parquet_inventory.meta.get("data_version")
+                if exported != data_version:
+                    print(f"⚠️ Parquet dataset is at data version {exported}, DB at {data_version} "
+                          f"→ run python -m tools.parquet_backend")
+                elif not _parquet_inventory.has_row_order:
+                    print("⚠️ Parquet dataset has no row_order column (mode ties fall back to the date) "
+                          "→ run python -m tools.parquet_backend")
+    return _parquet_inventory
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the inventory table as a partitioned Parquet dataset.")
+    parser.add_argument("--db-url", default="", help="Database URL (defaults to INVENTORY_DB_URL / local SQLite)")
+    parser.add_argument("--path", default="", help=f"Dataset directory (default INVENTORY_PARQUET_PATH / "
+                                                    f"{DEFAULT_PARQUET_PATH})")
+    parser.add_argument("--months", nargs="*", default=None, help="YYYY-MM partitions to rewrite; omit for all")
+    args = parser.parse_args()
+    periods = [(int(m[:4]), int(m[5:7])) for m in args.months] if args.months else None
+    export_parquet_dataset(args.db_url, args.path, periods)
@@ -0,0 +1,364 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from tools.data_version import get_data_version
+from tools.db_engine import get_engine, row_order_column
+from tools.row_means import group_mean, on_rounding_boundary, series_mean
+
+
+# ----------------------------------------------------------------
+# Columns held in the resident snapshot
+# ----------------------------------------------------------------
+CODED_COLUMNS = {
+    "product": "Product ID",
+    "store": "Store ID",
+    "category": "Category",
+    "region": "Region",
+    "weather": "Weather Condition",
+    "season": "Seasonality",
+    "name": "Product Name",
+}
+
+METRIC_COLUMNS = {
+    "units_sold": "Units Sold",
+    "units_ordered": "Units Ordered",
+    "inventory": "Inventory Level",
+    "price": "Price",
+    "discount": "Discount",
+    "comp_price": "Competitor Pricing",
+}
+
+# Averaged metrics stay float64: float32 copies shift means sitting on a 2-decimal boundary
+AVERAGED_METRICS = ("price", "discount", "comp_price")
+
+# yyyymm fits in 20 bits, so (key code, yyyymm) pairs pack into one int64 sort key
+_PERIOD_BITS = 20
+
+
+def _smallest_int_dtype(n_values: int):
+    return np.int16 if n_values < np.iinfo(np.int16).max else np.int32
+
+
+class ResidentInventory:
+    """
+    Read-only columnar snapshot of the `inventory` table.
+    - strings → sorted categorical codes (code order == alphabetical order)
+    - Date → int32 yyyymm (lookups); rows stay in table order (mode tie-breaks)
+    - metrics → float32 (averaged metrics → float64)
+    Rows are reachable through sorted (key, yyyymm) indexes for products, categories and periods,
+    so every lookup is a binary search followed by vectorised numpy aggregation.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        dates = pd.to_datetime(df["Date"], errors="coerce")
+        df = df[dates.notna()]
+        dates = dates[dates.notna()]
+
+        self.n_rows = len(df)
+        self.data_version = 0
+        self.yyyymm = (dates.dt.year * 100 + dates.dt.month).to_numpy(np.int32)
+        # Latest date per yyyymm (a partly loaded month is left out of the forecast base)
+        self.period_end = pd.Series(dates.to_numpy()).groupby(self.yyyymm).max().to_dict()
+
+        self.codes, self.labels = {}, {}
+        for key, column in CODED_COLUMNS.items():
+            codes, uniques = pd.factorize(df[column], sort=True)
+            self.codes[key] = codes.astype(_smallest_int_dtype(len(uniques)))
+            self.labels[key] = np.asarray(uniques, dtype=object)
+        self.lookup = {key: {label: i for i, label in enumerate(labels)} for key, labels in self.labels.items()}
+
+        self.metrics, self.integer_metrics = {}, set()
+        for key, column in METRIC_COLUMNS.items():
+            values = pd.to_numeric(df[column], errors="coerce")
+            if pd.api.types.is_integer_dtype(values.dtype):
+                self.integer_metrics.add(key)
+            dtype = np.float64 if key in AVERAGED_METRICS else np.float32
+            self.metrics[key] = values.to_numpy(dtype, na_value=np.nan)
+
+        # Sorted indexes: (product, yyyymm), (category, yyyymm), (yyyymm)
+        self.index = {key: self._build_index(self.codes[key]) for key in ("product", "category")}
+        self.index["period"] = self._build_index(np.zeros(self.n_rows, dtype=np.int16))
+
+        # Earliest / latest yyyymm per product and category (served through tools/date_bounds.py)
+        self.first_period, self.latest_period = {}, {}
+        for key in ("product", "category"):
+            first = np.full(len(self.labels[key]), np.iinfo(np.int32).max, dtype=np.int32)
+            latest = np.zeros(len(self.labels[key]), dtype=np.int32)
+            valid = self.codes[key] >= 0
+            np.minimum.at(first, self.codes[key][valid], self.yyyymm[valid])
+            np.maximum.at(latest, self.codes[key][valid], self.yyyymm[valid])
+            self.first_period[key], self.latest_period[key] = first, latest
+
+    @classmethod
+    def from_engine(cls, engine):
+        """Loads the snapshot from the `inventory` table of the given engine."""
+        columns = ["Date", *CODED_COLUMNS.values(), *METRIC_COLUMNS.values()]
+        select_sql = "SELECT " + ", ".join(f'"{c}"' for c in columns) + " FROM inventory"
+        row_order = row_order_column(engine.dialect.name)
+        if row_order:
+            select_sql += f" ORDER BY {row_order}"
+        with engine.connect() as conn:
+            df = pd.read_sql_query(select_sql, conn)
+        return cls(df)
+
+    # ----------------------------------------------------------------
+    # Index helpers
+    # ----------------------------------------------------------------
+    def _build_index(self, key_codes):
+        keys = (key_codes.astype(np.int64) << _PERIOD_BITS) | self.yyyymm.astype(np.int64)
+        order = np.argsort(keys, kind="stable")
+        return order.astype(np.int32), keys[order]
+
+    def _rows(self, index_name: str, code: int, yyyymm: int):
+        order, keys = self.index[index_name]
+        key = (np.int64(code) << _PERIOD_BITS) | np.int64(yyyymm)
+        start, end = np.searchsorted(keys, key, "left"), np.searchsorted(keys, key, "right")
+        return order[start:end]
+
+    def _filter_store(self, rows, store_id: str):
+        if not store_id:
+            return rows
+        store_code = self.lookup["store"].get(store_id)
+        if store_code is None:
+            return rows[:0]
+        return rows[self.codes["store"][rows] == store_code]
+
+    # ----------------------------------------------------------------
+    # Aggregation helpers
+    # ----------------------------------------------------------------
+    def _metric_totals(self, rows):
+        totals = {}
+        for key in ("units_sold", "units_ordered", "inventory"):
+            total = self.metrics[key][rows].sum(dtype=np.float64)
+            if total != total:  # NaN present → fall back to the NaN-aware sum
+                total = np.nansum(self.metrics[key][rows], dtype=np.float64)
+            totals[key] = int(total) if key in self.integer_metrics else float(total)
+        means = {}
+        for key in AVERAGED_METRICS:
+            values = self.metrics[key][rows]
+            valid = ~np.isnan(values)
+            n_valid = np.count_nonzero(valid)
+            means[key] = float(values[valid].sum() / n_valid) if n_valid else None
+            if on_rounding_boundary(means[key]):
+                means[key] = series_mean(values)
+        return {
+            "row_count": int(len(rows)),
+            "total_units_sold": totals["units_sold"],
+            "total_units_ordered": totals["units_ordered"],
+            "total_inventory": totals["inventory"],
+            "avg_price": means["price"],
+            "avg_discount": means["discount"],
+            "avg_comp_price": means["comp_price"],
+        }
+
+    def _group_distinct(self, group_codes, key: str, rows, n_groups: int):
+        """Distinct count of `key` within each group (unique (group, key) pairs → bincount)."""
+        n_keys = max(len(self.labels[key]), 1)
+        pairs = np.unique(group_codes.astype(np.int64) * n_keys + self.codes[key][rows])
+        return np.bincount(pairs // n_keys, minlength=n_groups)
+
+    def _category_breakdown(self, rows):
+        """Per-category totals for the rows using bincount aggregation (one pass per metric)."""
+        group_codes = self.codes["category"][rows]
+        n_groups = len(self.labels["category"])
+        row_counts = np.bincount(group_codes, minlength=n_groups)
+
+        sums, means = {}, {}
+        for key in ("units_sold", "units_ordered", "inventory"):
+            values = self.metrics[key][rows].astype(np.float64)
+            sums[key] = np.bincount(group_codes, weights=np.nan_to_num(values), minlength=n_groups)
+        for key in AVERAGED_METRICS:
+            values = self.metrics[key][rows]
+            valid = ~np.isnan(values)
+            totals = np.bincount(group_codes, weights=np.where(valid, values, 0.0), minlength=n_groups)
+            counts = np.bincount(group_codes, weights=valid, minlength=n_groups)
+            means[key] = np.divide(totals, counts, out=np.full(n_groups, np.nan), where=counts > 0)
+            for code in np.flatnonzero([on_rounding_boundary(mean) for mean in means[key]]):
+                means[key][code] = group_mean(values[group_codes == code])
+
+        products = self._group_distinct(group_codes, "product", rows, n_groups)
+        stores = self._group_distinct(group_codes, "store", rows, n_groups)
+
+        def metric_sum(key, code):
+            return int(sums[key][code]) if key in self.integer_metrics else float(sums[key][code])
+
+        return [
+            {
+                "Category": self.labels["category"][code],
+                "row_count": int(row_counts[code]),
+                "unique_products": int(products[code]),
+                "stores_count": int(stores[code]),
+                "total_units_sold": metric_sum("units_sold", code),
+                "total_units_ordered": metric_sum("units_ordered", code),
+                "total_inventory": metric_sum("inventory", code),
+                "avg_price": float(means["price"][code]),
+                "avg_discount": float(means["discount"][code]),
+                "avg_comp_price": float(means["comp_price"][code]),
+            }
+            for code in np.flatnonzero(row_counts)
+        ]
+
+    def _mode(self, key: str, rows):
+        """Most frequent label (ties → the label met first in table order, like Counter.most_common)."""
+        codes = self.codes[key][rows]
+        valid = codes >= 0
+        if not valid.any():
+            return None
+        codes = codes[valid]
+        n_labels = len(self.labels[key])
+        counts = np.bincount(codes, minlength=n_labels)
+        first_row = np.full(n_labels, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first_row, codes, rows[valid])
+        best = np.lexsort((first_row, -counts))[0]
+        return self.labels[key][best]
+
+    def _first_label(self, key: str, rows):
+        """Alphabetically first non-null label in the rows (matches MIN() in SQL)."""
+        codes = self.codes[key][rows]
+        codes = codes[codes >= 0]
+        return self.labels[key][codes.min()] if len(codes) else None
+
+    def _distinct_labels(self, key: str, rows):
+        codes = self.codes[key][rows]
+        present = np.flatnonzero(np.bincount(codes[codes >= 0], minlength=1))
+        return [self.labels[key][c] for c in present]
+
+    def _n_distinct(self, key: str, rows):
+        codes = self.codes[key][rows]
+        return int(np.count_nonzero(np.bincount(codes[codes >= 0], minlength=1)))
+
+    # ----------------------------------------------------------------
+    # YoY lookups (same return shape as the SQL _fetch_*_yoy helpers)
+    # ----------------------------------------------------------------
+    def period_bounds(self):
+        """({product_id: (first, last)}, {category: (first, last)}) yyyymm bounds."""
+        return tuple(
+            {
+                label: (int(self.first_period[key][code]), int(self.latest_period[key][code]))
+                for code, label in enumerate(self.labels[key])
+            }
+            for key in ("product", "category")
+        )
+
+    def product_yoy(self, product_id: str, store_id: str, current_year: int, month_num: int):
+        product_code = self.lookup["product"].get(product_id)
+        aggregates = {}
+        if product_code is None:
+            return aggregates
+
+        for year in (current_year, current_year - 1):
+            rows = self._filter_store(self._rows("product", product_code, year * 100 + month_num), store_id)
+            if not len(rows):
+                continue
+            aggregates[year] = {
+                "product_name": self._first_label("name", rows),
+                "category": self._first_label("category", rows),
+                **self._metric_totals(rows),
+                "weather_mode": self._mode("weather", rows),
+                "season_mode": self._mode("season", rows),
+                "regions": self._distinct_labels("region", rows),
+            }
+        return aggregates
+
+    def products_batch(self, periods: dict, store_ids: list):
+        """{(product_id, store_id, year): aggregates} for every product × store ("" → all stores)."""
+        aggregates = {}
+        for product_id, (current_year, month_num) in periods.items():
+            for store_id in store_ids or [""]:
+                for year, agg in self.product_yoy(product_id, store_id, current_year, month_num).items():
+                    aggregates[(product_id, store_id, year)] = agg
+        return aggregates
+
+    def category_yoy(self, category: str, store_id: str, current_year: int, month_num: int):
+        category_code = self.lookup["category"].get(category)
+        aggregates = {}
+        if category_code is None:
+            return aggregates
+
+        for year in (current_year, current_year - 1):
+            rows = self._filter_store(self._rows("category", category_code, year * 100 + month_num), store_id)
+            if not len(rows):
+                continue
+            aggregates[year] = {
+                "total_products": self._n_distinct("product", rows),
+                "total_stores": self._n_distinct("store", rows),
+                **self._metric_totals(rows),
+                "weather_mode": self._mode("weather", rows),
+                "season_mode": self._mode("season", rows),
+                "regions": self._distinct_labels("region", rows),
+            }
+        return aggregates
+
+    def overall_yoy(self, store_id: str, current_year: int, month_num: int):
+        aggregates = {}
+        for year in (current_year, current_year - 1):
+            rows = self._filter_store(self._rows("period", 0, year * 100 + month_num), store_id)
+            if not len(rows):
+                continue
+            aggregates[year] = {
+                "categories": self._category_breakdown(rows),
+                "unique_products": self._n_distinct("product", rows),
+            }
+        return aggregates
+
+    # ----------------------------------------------------------------
+    # Forecast history (tools/forecasting.py)
+    # ----------------------------------------------------------------
+    def history_rows(self) -> pd.DataFrame:
+        """Every row with the columns the forecaster aggregates (no day dates → ties break on row order)."""
+        def labels(key):
+            return pd.Categorical.from_codes(self.codes[key], categories=self.labels[key]).astype(object)
+
+        return pd.DataFrame({
+            "Product ID": labels("product"),
+            "Store ID": labels("store"),
+            "Seasonality": labels("season"),
+            "year": self.yyyymm // 100,
+            "month": self.yyyymm % 100,
+            "row_order": np.arange(self.n_rows),
+            **{METRIC_COLUMNS[key]: self.metrics[key].astype(np.float64)
+               for key in ("units_sold", "price", "discount", "comp_price")},
+        })
+
+    def month_end(self, year: int, month: int):
+        """Latest date loaded for the month (None if it has no rows)."""
+        return self.period_end.get(year * 100 + month)
+
+    def memory_bytes(self) -> int:
+        """Approximate resident size of the arrays (excluding label strings)."""
+        arrays = [self.yyyymm, *self.codes.values(), *self.metrics.values()]
+        arrays += [a for pair in self.index.values() for a in pair]
+        return int(sum(a.nbytes for a in arrays))
+
+
+# ----------------------------------------------------------------
+# Process-wide snapshot
+# ----------------------------------------------------------------
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def get_resident_inventory(engine=None):
+    """
+    Returns the process-wide snapshot, loading it from the DB on first use
+    and reloading it when the data version stamp changes.
+    """
+    global _snapshot
+    data_version = get_data_version()
+    if _snapshot is None or _snapshot.data_version != data_version:
+        with _snapshot_lock:
+            if _snapshot is None or _snapshot.data_version != data_version:
+                _snapshot = ResidentInventory.from_engine(engine or get_engine())
+                _snapshot.data_version = data_version
+                print(f"Resident inventory loaded → {_snapshot.n_rows} rows, "
+                      f"{_snapshot.memory_bytes() / 1e6:.1f} MB")
+    return _snapshot
+
+
+def reset_resident_inventory():
+    """Drops the snapshot so the next call reloads it (e.g. after a DB refresh)."""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+
+# ----------------------------------------------------------------
+# Averages exactly as the pandas tools computed them
+# - product context  → Series.mean(), then round(float(x), 2)
+# - category context → Series.mean(), then round(np.float64(x), 2) (numpy rounding)
+# - overall summary  → groupby("Category").mean(), then Series.round(2) (numpy rounding)
+# Rollup sums and bincount totals add the same values in another order, so their mean can
+# differ in the last bits. That only changes the rounded figure when the mean sits on a
+# 2-decimal boundary (x.xx5); those means are recomputed from the rows in table order here.
+# ----------------------------------------------------------------
+MEAN_COLUMNS = {"avg_price": "Price", "avg_discount": "Discount", "avg_comp_price": "Competitor Pricing"}
+
+# Summation-order noise is ~1e-12 on these magnitudes; anything this close to x.xx5 is treated as a tie
+_BOUNDARY_TOLERANCE = 1e-6
+
+
+def on_rounding_boundary(value) -> bool:
+    """True when value * 100 is within float noise of a .5, i.e. the 2-decimal rounding could flip."""
+    if value is None or value != value:
+        return False
+    fraction = abs(float(value)) * 100 % 1
+    return abs(fraction - 0.5) < _BOUNDARY_TOLERANCE
+
+
+def needs_row_means(aggregates: dict) -> bool:
+    """True when any average of the aggregates has to be recomputed from its rows."""
+    return any(on_rounding_boundary(aggregates.get(key)) for key in MEAN_COLUMNS)
+
+
+def series_mean(values):
+    """Series.mean() of values given in table order (None when every value is null)."""
+    mean = pd.Series(values, dtype="float64").mean()
+    return None if pd.isna(mean) else float(mean)
+
+
+def group_mean(values):
+    """groupby().mean() of one group given in table order (None when every value is null)."""
+    values = pd.Series(values, dtype="float64")
+    if not len(values):
+        return None
+    mean = values.groupby(np.zeros(len(values), dtype=np.int8)).mean().iloc[0]
+    return None if pd.isna(mean) else float(mean)
+
+
+def numpy_round(value):
+    """round(np.float64(value), 2) / Series.round(2): numpy rounds value * 100 half-to-even."""
+    return float(np.round(value, 2)) if value is not None else None
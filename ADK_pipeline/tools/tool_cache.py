@@ -0,0 +1,155 @@
+import copy
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from tools.compact_payloads import get_payload_format
+from tools.data_version import get_data_version
+from tools.executor import run_blocking
+
+
+# ----------------------------------------------------------------
+# Size-bounded LRU cache with per-entry TTL and hit/miss counters
+# ----------------------------------------------------------------
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after ttl_seconds.
+    Entries are stamped with the data version they were computed against;
+    a lookup under a newer version counts as an invalidation and a miss.
+    """
+
+    def __init__(self, name: str, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def get(self, key, data_version):
+        """Returns (found, value)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            value, stored_version, expires_at = entry
+            if stored_version != data_version:
+                del self._entries[key]
+                self.invalidations += 1
+                self.misses += 1
+                return False, None
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def put(self, key, value, data_version):
+        with self._lock:
+            self._entries[key] = (value, data_version, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+_caches = {}
+
+
+def get_tool_cache_stats() -> dict:
+    """Hit/miss counters for every tool cache, keyed by tool name (for metrics scraping / logs)."""
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def clear_tool_caches():
+    for cache in _caches.values():
+        cache.clear()
+
+
+# ----------------------------------------------------------------
+# Decorator for FunctionTool callables
+# ----------------------------------------------------------------
+def cached_tool(func, normalise=None):
+    """
+    Wraps a tool function with a TTL + LRU result cache.
+    - normalise(arguments: dict) → dict canonicalises the bound arguments; the normalised
+      arguments form the cache key and are also what the wrapped function receives.
+    - The active TOOL_RESPONSE_FORMAT is part of the key, so a full payload is never served
+      as a compact one (or the other way round) after the setting changes.
+    - Results carrying an "error" key are never cached.
+    - Coroutine functions get an async wrapper; normalise() then runs on the bounded executor.
+    Settings: TOOL_CACHE_ENABLED, TOOL_CACHE_MAX_ENTRIES, TOOL_CACHE_TTL_SECONDS.
+    The wrapper keeps the function's name, docstring and signature so ADK builds the same declaration.
+    """
+    if os.environ.get("TOOL_CACHE_ENABLED", "1").strip().lower() in ("0", "false", "no", "off"):
+        return func
+
+    cache = TTLCache(
+        func.__name__,
+        max_entries=int(os.environ.get("TOOL_CACHE_MAX_ENTRIES", "1024") or 1024),
+        ttl_seconds=float(os.environ.get("TOOL_CACHE_TTL_SECONDS", "300") or 300),
+    )
+    _caches[func.__name__] = cache
+    signature = inspect.signature(func)
+
+    def bind_arguments(args, kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        if normalise is not None:
+            arguments = normalise(arguments)
+        key = (get_payload_format(),) + tuple(sorted((name, repr(value)) for name, value in arguments.items()))
+        return arguments, key, get_data_version()
+
+    def store(key, result, data_version):
+        if not (isinstance(result, dict) and "error" in result):
+            cache.put(key, copy.deepcopy(result), data_version)
+        return result
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            arguments, key, data_version = await run_blocking(bind_arguments, args, kwargs)
+            found, value = cache.get(key, data_version)
+            if found:
+                return copy.deepcopy(value)
+            return store(key, await func(**arguments), data_version)
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            arguments, key, data_version = bind_arguments(args, kwargs)
+            found, value = cache.get(key, data_version)
+            if found:
+                return copy.deepcopy(value)
+            return store(key, func(**arguments), data_version)
+
+    wrapper.cache = cache
+    return wrapper
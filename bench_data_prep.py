@@ -0,0 +1,180 @@
+# Row-wise data_prep.ipynb steps vs the vectorised data_prep module on a synthetic frame.
+#   python bench_data_prep.py [--rows 1000000] [--products 2000] [--baseline-products 20]
+# The per-product notebook loops scan the whole frame once per product, so they are timed
+# on --baseline-products products and extrapolated to all of them.
+# LLM calls are replaced by instant local namers, so only the data preparation is timed.
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import data_prep
+
+
+CATEGORIES = ["Clothing", "Electronics", "Furniture", "Groceries", "Toys"]
+REGIONS = ["East", "North", "South", "West"]
+WEATHER = ["Cloudy", "Rainy", "Snowy", "Sunny"]
+SEASONS = ["Autumn", "Spring", "Summer", "Winter"]
+
+
+def synthetic_frame(n_rows, n_products, seed=7):
+    """Inventory-shaped frame; IDs carry stray whitespace / lower case like hand-edited sheets."""
+    rng = np.random.default_rng(seed)
+    product_ids = np.array([f"P{i:04d}" for i in range(1, n_products + 1)], dtype=object)
+    product_ids[::7] = np.char.lower(product_ids[::7].astype(str)).astype(object)
+    product_ids[::11] = [f" {pid} " for pid in product_ids[::11]]
+    product_category = rng.choice(CATEGORIES, n_products)
+
+    product = rng.integers(0, n_products, n_rows)
+    return pd.DataFrame({
+        "Product ID": product_ids[product],
+        "Category": product_category[product],
+        "Region": rng.choice(REGIONS, n_rows),
+        "Price": rng.uniform(10, 100, n_rows).round(2),
+        "Discount": rng.choice([0, 5, 10, 15, 20], n_rows),
+        "Weather Condition": rng.choice(WEATHER, n_rows),
+        "Seasonality": rng.choice(SEASONS, n_rows),
+        "Holiday/Promotion": rng.integers(0, 2, n_rows),
+        "Demand Forecast": rng.uniform(50, 200, n_rows).round(2),
+    })
+
+
+def fake_namer(product_id, category, product_data):
+    return f"{category} Item {product_id}"
+
+
+def fake_reflector(product_id, name, product_data, category, pass_num=1):
+    return f"{name} v{pass_num}"
+
+
+# -----------------------------------------------
+#  Notebook implementations (baseline)
+# -----------------------------------------------
+def notebook_update_product_ids(df, prefix_mapping):
+    def generate_new_id(row):
+        old_id = str(row["Product ID"])
+        category = row["Category"]
+        prefix = prefix_mapping.get(category, "X")
+        return prefix + old_id[1:] if old_id else None
+
+    df["New Product ID"] = df.apply(generate_new_id, axis=1)
+    df["Product ID"] = df["New Product ID"]
+    return df
+
+
+def notebook_gather_product_data(df, product_id):
+    df["Product ID"] = df["Product ID"].astype(str).str.strip().str.upper()
+    product_id = str(product_id).strip().upper()
+
+    sub_df = df[df["Product ID"] == product_id].copy()
+    if sub_df.empty:
+        return ""
+
+    category = sub_df["Category"].iloc[0]
+    avg_price = round(sub_df["Price"].mean(), 2)
+    avg_discount = round(sub_df["Discount"].mean(), 2)
+    common_weather = sub_df["Weather Condition"].mode()[0]
+    common_season = sub_df["Seasonality"].mode()[0]
+    holiday_count = sub_df["Holiday/Promotion"].sum()
+    regions = ", ".join(sub_df["Region"].unique())
+
+    return (
+        f"Category: {category}, Avg Price: {avg_price}, Avg Discount: {avg_discount}%, "
+        f"Common Weather: {common_weather}, Common Season: {common_season}, "
+        f"Holiday/Promotion Frequency: {holiday_count}, Active Regions: {regions}."
+    )
+
+
+def notebook_reflection_by_product(df, num_passes=2, max_products=None):
+    """Loop of multiple_pass_reflection_by_product (without its prints), first max_products products."""
+    results = []
+    unique_products = df["Product ID"].astype(str).str.strip().str.upper().unique()
+    for pid in unique_products[:max_products]:
+        pid_key = str(pid).strip().upper()
+        category = df.loc[df["Product ID"].astype(str).str.strip().str.upper() == pid_key, "Category"].iloc[0]
+        product_data = notebook_gather_product_data(df, pid_key)
+        name = fake_namer(pid_key, category, product_data)
+        for i in range(num_passes):
+            name = fake_reflector(pid_key, name, product_data, category, pass_num=i+1)
+        results.append({"Product ID": pid_key, "Category": category, f"RefinedName_{num_passes}": name.strip()})
+    return pd.DataFrame(results), len(unique_products)
+
+
+def notebook_assign_product_names(main_df, product_names_df):
+    df = main_df.copy()
+    df["Product ID"] = df["Product ID"].astype(str).str.strip().str.upper()
+    product_names_df["Product ID"] = product_names_df["Product ID"].astype(str).str.strip().str.upper()
+    name_col = [col for col in product_names_df.columns if col.startswith("RefinedName_")][-1]
+    df["Product Name"] = df["Product ID"].map(dict(zip(product_names_df["Product ID"], product_names_df[name_col])))
+    return df
+
+
+# -----------------------------------------------
+#  Benchmark
+# -----------------------------------------------
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def quietly(func, *args, **kwargs):
+    """Runs a data_prep function with its progress prints suppressed."""
+    import contextlib
+    import io
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def report(step, before, after, note=""):
+    print(f"{step:<34} {before:>10.2f}s {after:>9.3f}s {before / max(after, 1e-9):>8.1f}x  {note}")
+
+
+def run(n_rows, n_products, baseline_products):
+    df = synthetic_frame(n_rows, n_products)
+    prefix_map = quietly(data_prep.create_prefix_mapping, sorted(df["Category"].unique()))
+    print(f"Synthetic frame: {len(df):,} rows, {df['Product ID'].nunique():,} products\n")
+    print(f"{'step':<34} {'notebook':>11} {'module':>10} {'speedup':>9}")
+
+    # 1️⃣ Product ID rewrite
+    expected, before = timed(notebook_update_product_ids, df.copy(), prefix_map)
+    updated, after = timed(data_prep.update_product_ids_in_df, df.copy(), prefix_map, output_path=None)
+    assert updated["Product ID"].equals(expected["Product ID"]), "Product ID rewrite differs"
+    report("update_product_ids_in_df", before, after)
+
+    # 2️⃣ Per-product context + naming loop (extrapolated baseline)
+    (sample, total_products), sampled = timed(notebook_reflection_by_product, updated.copy(),
+                                              max_products=baseline_products)
+    before = sampled / max(len(sample), 1) * total_products
+    (names_df, _), after = timed(quietly, data_prep.multiple_pass_reflection_by_product, updated,
+                                 generate_name=fake_namer, reflect_name=fake_reflector)
+    assert names_df.head(len(sample)).equals(sample), "multiple_pass_reflection_by_product differs"
+    report("multiple_pass_reflection_by_product", before, after,
+           f"(baseline: {len(sample)} products × {total_products / max(len(sample), 1):.0f})")
+
+    # 3️⃣ gather_product_data for every product
+    contexts, after = timed(data_prep.build_product_contexts, updated)
+    scratch = updated.copy()
+    started = time.perf_counter()
+    for product_id in sample["Product ID"]:
+        assert contexts[product_id] == notebook_gather_product_data(scratch, product_id), product_id
+    before = (time.perf_counter() - started) / max(len(sample), 1) * total_products
+    report("gather_product_data (all products)", before, after)
+
+    # 4️⃣ Name assignment
+    expected, before = timed(notebook_assign_product_names, updated, names_df.copy())
+    assigned, after = timed(quietly, data_prep.assign_product_names_to_main_df, updated, names_df)
+    assert assigned["Product Name"].equals(expected["Product Name"]), "name assignment differs"
+    report("assign_product_names_to_main_df", before, after)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Notebook vs vectorised data_prep steps.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--baseline-products", type=int, default=20,
+                        help="Products run through the per-product notebook loop before extrapolating")
+    args = parser.parse_args()
+    run(args.rows, args.products, args.baseline_products)
@@ -0,0 +1,393 @@
+import json
+import os
+
+import pandas as pd
+
+
+# ------------------------------------------------------------------
+#  Data preparation steps from data_prep.ipynb as a reusable module.
+#  Row-wise work is replaced by column operations:
+#  - Product IDs are normalised once per distinct value, not per row / per product
+#  - per-product context comes from one groupby over the frame
+#  - names are assigned with a map
+#  Benchmark (synthetic 1M rows): python bench_data_prep.py
+# ------------------------------------------------------------------
+
+
+# -----------------------------------------------
+#  Utility: Get Unique Categories
+# -----------------------------------------------
+def get_unique_categories(df, category_col="Category"):
+    if category_col not in df.columns:
+        raise ValueError(f"Column '{category_col}' not found in DataFrame.")
+    unique_cats = sorted(df[category_col].dropna().unique().tolist())
+    print(f"Found {len(unique_cats)} unique categories: {unique_cats}")
+    return unique_cats
+
+
+# -----------------------------------------------
+#  Utility: Create Prefix Mapping
+# -----------------------------------------------
+def create_prefix_mapping(categories):
+    mapping = {}
+    used = set()
+
+    for cat in categories:
+        prefix = cat[0].upper()
+        # Handle duplicate starting letters:
+        if prefix in used:
+            for ch in cat[1:].upper():
+                if ch not in used and ch.isalpha():
+                    prefix = ch
+                    break
+        used.add(prefix)
+        mapping[cat] = prefix
+
+    print("Category → Prefix mapping:")
+    for k, v in mapping.items():
+        print(f"   {k:15s} → {v}")
+    return mapping
+
+
+def save_prefix_mapping(mapping, path="category_prefix_map.json"):
+    with open(path, "w") as f:
+        json.dump(mapping, f, indent=4)
+    print(f"Prefix mapping saved to {path}")
+
+
+def load_prefix_mapping(path="category_prefix_map.json"):
+    with open(path, "r") as f:
+        mapping = json.load(f)
+    print(f"Loaded prefix mapping from {path}")
+    return mapping
+
+
+# -----------------------------------------------
+#  Utility: Saving df to xlsx
+# -----------------------------------------------
+def save_dataframe_to_xlsx(df, base_filename):
+    output_path = f"{base_filename}.xlsx"
+    df.to_excel(output_path, index=False)
+    print(f"File saved successfully → {output_path}")
+    return output_path
+
+
+# -----------------------------------------------
+#  Utility: Normalising Product IDs
+# -----------------------------------------------
+def normalise_product_ids(values):
+    """
+    `astype(str).str.strip().str.upper()` of a Product ID column, computed once per
+    distinct value (a few thousand products instead of every row) and broadcast back.
+    """
+    values = pd.Series(values)
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    normalised = pd.Series(uniques).astype(str).str.strip().str.upper()
+    return normalised.take(codes).set_axis(values.index).rename(values.name)
+
+
+# -----------------------------------------------
+#  Utility: Updating Product Ids
+# -----------------------------------------------
+def update_product_ids_in_df(df, prefix_mapping, output_path="input_data_with_new_pids"):
+    """
+    Replaces the first character of every Product ID with its category prefix
+    ('X' when the category is not in prefix_mapping). Saves to <output_path>.xlsx
+    unless output_path is None.
+    """
+    old_ids = df["Product ID"].astype(str)
+    prefixes = df["Category"].map(prefix_mapping).fillna("X")
+
+    # Create new column:
+    df["New Product ID"] = (prefixes + old_ids.str[1:]).where(old_ids != "", None)
+
+    # Update original Product ID column:
+    df["Product ID"] = df["New Product ID"]
+
+    # Save updated DataFrame as new Excel:
+    if output_path is not None:
+        save_dataframe_to_xlsx(df, output_path)
+        print(f"Product IDs updated and saved to {output_path}.xlsx")
+    return df
+
+
+# ------------------------------------
+#  Node: Gather Product specific rows
+# ------------------------------------
+def _group_mode(keys, values):
+    """Most frequent value per key (ties → smallest value, as Series.mode()[0])."""
+    pairs = pd.DataFrame({"key": keys, "value": values}).dropna()
+    counts = pairs.groupby(["key", "value"], sort=False).size().reset_index(name="cnt")
+    counts = counts.sort_values(["key", "cnt", "value"], ascending=[True, False, True], kind="stable")
+    return counts.drop_duplicates("key").set_index("key")["value"]
+
+
+def _first_categories(df, keys):
+    """Category of the first row of every normalised Product ID (first-appearance order)."""
+    first = ~keys.duplicated() & keys.notna()
+    return df.loc[first, "Category"].set_axis(keys[first])
+
+
+def build_product_context_table(df):
+    """
+    One row per normalised Product ID with the values gather_product_data summarises:
+    first Category, mean Price / Discount, Weather / Seasonality modes, Holiday/Promotion
+    count and the regions in order of appearance. Single pass over the frame.
+    """
+    keys = normalise_product_ids(df["Product ID"])
+    grouped = df.groupby(keys, sort=False)
+
+    table = pd.DataFrame({
+        "category": _first_categories(df, keys),
+        "avg_price": grouped["Price"].mean().round(2),
+        "avg_discount": grouped["Discount"].mean().round(2),
+        "holiday_count": grouped["Holiday/Promotion"].sum(),
+    })
+    table["common_weather"] = _group_mode(keys, df["Weather Condition"])
+    table["common_season"] = _group_mode(keys, df["Seasonality"])
+
+    regions = pd.DataFrame({"key": keys, "region": df["Region"]}).dropna().drop_duplicates()
+    table["regions"] = regions.groupby("key", sort=False)["region"].agg(lambda r: ", ".join(map(str, r)))
+    table.index.name = "Product ID"
+    return table
+
+
+def format_product_context(context):
+    """Compact descriptive string for one row of build_product_context_table()."""
+    return (
+        f"Category: {context['category']}, Avg Price: {context['avg_price']}, "
+        f"Avg Discount: {context['avg_discount']}%, "
+        f"Common Weather: {context['common_weather']}, Common Season: {context['common_season']}, "
+        f"Holiday/Promotion Frequency: {context['holiday_count']}, Active Regions: {context['regions']}."
+    )
+
+
+def build_product_contexts(df):
+    """{normalised Product ID: context string} for every product in the frame."""
+    return {
+        product_id: format_product_context(context)
+        for product_id, context in build_product_context_table(df).to_dict("index").items()
+    }
+
+
+def gather_product_data(df, product_id, product_contexts=None):
+    """
+    Summarizes the overall seasonal, weather, and holiday context
+    for a product by lightly aggregating its data across all stores and months.
+    Returns a compact descriptive string ("" if the product has no rows).
+    Pass product_contexts (from build_product_contexts) to look it up instead of scanning df;
+    df itself is never modified.
+    """
+    product_id = str(product_id).strip().upper()
+    if product_contexts is not None:
+        return product_contexts.get(product_id, "")
+
+    sub_df = df[normalise_product_ids(df["Product ID"]) == product_id]
+    if sub_df.empty:
+        return ""
+    return build_product_contexts(sub_df).get(product_id, "")
+
+
+# -----------------------------
+#  Node: Generate Product Names
+# -----------------------------
+_llm = None
+
+
+def get_llm():
+    """GPT-4o-mini chat model used for naming (created on first use)."""
+    global _llm
+    if _llm is None:
+        from dotenv import load_dotenv
+        from langchain_openai import ChatOpenAI
+
+        load_dotenv()
+        openai_key = os.getenv("OPENAI_API_KEY")
+        if not openai_key:
+            raise ValueError("❌ OPENAI_API_KEY not found in .env file")
+        _llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7, api_key=openai_key)
+    return _llm
+
+
+def generate_name_for_product(product_id, category, product_data):
+    """
+    Generates a complete, market-ready product name that uniquely identifies
+    a tangible product (not just its category), using all aggregated data.
+    """
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    prompt = f"""
+    You are an expert product naming specialist working for a global retail brand.
+
+    You will generate a **unique, object-specific product name** for Product ID {product_id}.
+    The goal is to make it sound like a real, purchasable item — not a generic category or set.
+
+    **Product Context:**
+    {product_data}
+
+    Create a **realistic, distinctive, and descriptive product name** that:
+    1. Clearly identifies what the product actually is — a tangible object a person can buy,
+       such as "wooden chess board", "foldable camping chair", "aroma diffuser lamp".
+       Avoid generic classes like "set", "groceries", "furniture", or "electronics".
+    2. Includes a creative or premium-sounding brand prefix, descriptor, or style element
+       (e.g., “AuroraCraft”, “LuxeGlow”, “HarvestBloom”).
+    3. Optionally reflects the category "{category}" and contextual cues
+       (season, weather, holidays, promotions, or regional traits).
+    4. Feels authentic to modern branding — professional, elegant, concise, and memorable.
+    5. Is **2–5 words long** and sounds like something seen in an online store or catalog.
+    6. Avoid any vague or collective names ("set", "bundle", "pack", "groceries") unless it is a specific item name.
+    7. Make the name sound **unique** — as if it belongs to one particular SKU or product variant.
+
+    Output only the final product name — no explanations, no punctuation, no quotes.
+    """
+
+    result = get_llm().invoke([
+        SystemMessage(content="You are a creative branding and product naming specialist."),
+        HumanMessage(content=prompt)
+    ])
+    return result.content.strip()
+
+
+# -------------------------------------
+#  Node: Reflection for product name
+# -------------------------------------
+def reflect_product_name(product_id, name, product_data, category, pass_num=1):
+    """
+    Refines and improves a previously generated product name,
+    ensuring it describes a specific, tangible product rather than a generic type.
+    """
+    from langchain_core.messages import HumanMessage
+
+    prompt = f"""
+    Reflection Pass {pass_num}:
+
+    Product ID: {product_id}
+    Category: {category}
+    Current product name: "{name}"
+
+    **Product Context:**
+    {product_data}
+
+    Reflect on and refine this product name.
+
+    Your goal is to improve it so that it:
+    1. Describes a **specific physical product**, not a general type or collection.
+       For example, "AuroraCraft Wooden Chess Board" is valid, but "Chess Set" or "Groceries" is not.
+    2. Keeps brand realism — something that could appear in a store listing.
+    3. Uses 2–5 words with a clear brand-style prefix, material, or feature (e.g., "Luxe", "Glow", "Forge", "Pure", "Flex").
+    4. Incorporates contextual cues — seasonal, promotional, or regional if relevant — subtly, not explicitly.
+    5. Sounds elegant, marketable, and memorable.
+    6. Avoids vague, plural, or abstract phrasing ("set", "groceries", "furniture", "electronics").
+    7. Stays concise, professional, and polished.
+
+    Suggest ONE improved version that fulfills these conditions.
+
+    Output only the final improved product name — no explanations or punctuation.
+    """
+
+    response = get_llm().invoke([HumanMessage(content=prompt)])
+    return response.content.strip()
+
+
+# -----------------------------------------------
+#  Node: Reflection pipeline for multiple pass
+# -----------------------------------------------
+def multiple_pass_reflection_by_product(df, num_passes=2, product_name_map=None, force_regenerate=False,
+                                        generate_name=generate_name_for_product, reflect_name=reflect_product_name):
+    """
+    Generates and reflects product names for unique Product IDs,
+    maintaining a persistent map of Product ID → Final Name.
+
+    If a product already exists in the map and `force_regenerate=True`,
+    or its cached name is empty/invalid, the name is recreated.
+    Product IDs are normalised once and the contexts of all products that need a
+    name come from one groupby (build_product_contexts) instead of a scan per product.
+    """
+    results = []
+    keys = normalise_product_ids(df["Product ID"])
+    first_rows = _first_categories(df, keys)
+    print(f"🧩 Found {len(first_rows)} unique products")
+
+    # Initialize the cache if not provided
+    if product_name_map is None:
+        product_name_map = {}
+
+    def needs_name(pid_key):
+        existing_name = product_name_map.get(pid_key, "").strip()
+        return force_regenerate or not existing_name or existing_name.lower() in ["", "nan", "none"]
+
+    to_generate = {pid_key for pid_key in first_rows.index if needs_name(pid_key)}
+    product_contexts = build_product_contexts(df[keys.isin(to_generate)]) if to_generate else {}
+
+    for pid_key, category in first_rows.items():
+        if pid_key not in to_generate:
+            existing_name = product_name_map[pid_key].strip()
+            print(f"⚙️ Skipping {pid_key} — existing name: {existing_name}")
+            results.append({
+                "Product ID": pid_key,
+                "Category": category,
+                f"RefinedName_{num_passes}": existing_name
+            })
+            continue
+
+        # 🧠 (Re)generate new name
+        print(f"\n🔹 Processing Product ID: {pid_key} (Regenerate: True)")
+
+        product_data = product_contexts.get(pid_key, "")
+        print(f"\n📘 product_data for {pid_key}:\n{product_data}\n")
+
+        # Generate base name
+        name = generate_name(pid_key, category, product_data)
+        print("🪄 Initial Name:", name)
+
+        # Multi-pass reflection
+        for i in range(num_passes):
+            name = reflect_name(pid_key, name, product_data, category, pass_num=i+1)
+            print(f"💬 Reflection {i+1}:", name)
+
+        final_name = name.strip()
+        product_name_map[pid_key] = final_name  # ✅ Update the cache
+
+        results.append({
+            "Product ID": pid_key,
+            "Category": category,
+            f"RefinedName_{num_passes}": final_name
+        })
+
+    print(f"\n✅ Completed. Finalized names for {len(product_name_map)} products.\n")
+    return pd.DataFrame(results), product_name_map
+
+
+# -----------------------------------------------
+#  Utility: Updating product names
+# -----------------------------------------------
+def assign_product_names_to_main_df(main_df, product_names_df):
+    """
+    Returns a copy of main_df with a new 'Product Name' column, assigned from
+    product_names_df by normalised Product ID with a map (no merge, inputs unchanged).
+    """
+    df = main_df.copy()
+
+    # --- Normalize Product IDs for consistency ---
+    df["Product ID"] = normalise_product_ids(df["Product ID"])
+    name_ids = normalise_product_ids(product_names_df["Product ID"])
+
+    # --- Auto-detect final name column from reflection results ---
+    name_cols = [col for col in product_names_df.columns if col.startswith("RefinedName_")]
+    if not name_cols:
+        raise ValueError("❌ No 'RefinedName_X' column found in product_names_df.")
+    name_col = name_cols[-1]  # use the most recent reflection pass
+
+    # --- Build Product ID → Name mapping dictionary ---
+    name_map = dict(zip(name_ids, product_names_df[name_col]))
+
+    # --- Create new column and update values based on Product ID ---
+    df["Product Name"] = df["Product ID"].map(name_map)
+
+    # --- Debug summary ---
+    filled = df["Product Name"].notna().sum()
+    total = len(df)
+    print(f" Assigned product names to {filled}/{total} rows using Product ID mapping.")
+    print(f" New column added: 'Product Name'")
+
+    return df